@@ -0,0 +1,89 @@
+"""
+Concurrency benchmark for the API read paths.
+
+Compares the synchronous MangaScraperDB read methods, called from coroutines the way the routes used to,
+against AsyncMangaScraperDB under parallel load. For each concurrency level it reports request throughput
+and the worst event loop stall, measured by a ticker coroutine that should wake every 10 ms.
+
+Run from the backend_scraper directory against a populated database:
+    python -m benchmarks.bench_async_reads --requests 200 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Any
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+READ_METHODS = ["get_frontend_data", "get_bookmarks_data", "get_supported_websites", "get_website_paths"]
+
+
+async def measure(call: Callable[[], Awaitable[Any]], total_requests: int, concurrency: int) -> Dict[str, float]:
+    """
+    Issue total_requests calls with at most concurrency in flight while timing event loop stalls.
+
+    Args:
+        call (Callable[[], Awaitable[Any]]): Coroutine factory performing one request
+        total_requests (int): Number of requests to issue
+        concurrency (int): Number of requests in flight at once
+
+    Returns:
+        Dict[str, float]: Requests per second and the largest event loop stall in milliseconds
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    max_stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_stall
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_stall = max(max_stall, time.perf_counter() - started - 0.01)
+
+    async def one_request():
+        async with semaphore:
+            await call()
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await tick_task
+    return {"requests_per_second": total_requests / elapsed, "max_loop_stall_ms": max_stall * 1000}
+
+
+async def main(total_requests: int, concurrency_levels: List[int], method: str):
+    sync_db = MangaScraperDB()
+    async_db = AsyncMangaScraperDB(max_size=max(concurrency_levels))
+
+    # Both layers must return identical output before their speed is worth comparing
+    sync_result = getattr(sync_db, method)()
+    async_result = await getattr(async_db, method)()
+    assert sync_result == async_result, f"{method} output differs between the sync and async layers"
+    print(f"{method}: {len(sync_result)} rows, outputs identical")
+
+    async def sync_call():
+        return getattr(sync_db, method)()
+
+    async def async_call():
+        return await getattr(async_db, method)()
+
+    print(f"{'layer':<8}{'concurrency':>12}{'req/s':>12}{'max stall ms':>15}")
+    for concurrency in concurrency_levels:
+        for layer, call in (("sync", sync_call), ("async", async_call)):
+            result = await measure(call, total_requests, concurrency)
+            print(f"{layer:<8}{concurrency:>12}{result['requests_per_second']:>12.1f}{result['max_loop_stall_ms']:>15.1f}")
+
+    sync_db.close_connection()
+    await async_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrency levels to test")
+    parser.add_argument("--method", choices=READ_METHODS, default="get_frontend_data", help="Read method to benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.method))
@@ -0,0 +1,56 @@
+"""
+Parsing benchmark over the HTML archive.
+
+Times BeautifulSoup parsing plus each website's parse_html on every archived page, without any network traffic,
+so parser changes can be compared on the same real pages. Pages of unsupported websites are skipped.
+
+Run from the backend_scraper directory against an archive filled by scraping with HTML_ARCHIVE_DIR set:
+    python -m benchmarks.bench_parse --archive-dir ./html_archive --repeat 5
+"""
+import argparse
+import time
+import bs4
+from typing import Dict, List
+from src.html_archive import HtmlArchive
+from src.manga_scraper import MangaScraper, MangaKakalotScraper, vizScraper, webtoonScraper
+
+SCRAPERS = {"chapmanganato": MangaKakalotScraper, "viz": vizScraper, "webtoons": webtoonScraper}
+
+
+def main(archive_dir: str, repeat: int):
+    archive = HtmlArchive(archive_dir)
+    timings: Dict[str, List[float]] = {site: [] for site in SCRAPERS}
+    page_bytes = {site: 0 for site in SCRAPERS}
+
+    for url, content in archive.iter_pages():
+        site = next((name for name in SCRAPERS if name in MangaScraper.get_base_url(url)), None)
+        if site is None:
+            continue
+        scraper = SCRAPERS[site]([])
+        page_bytes[site] += len(content)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            soup = bs4.BeautifulSoup(content, 'html.parser')
+            try:
+                scraper.parse_html(soup, scraper.base_url, url)
+            except Exception:
+                pass # Search and listing pages are archived too, only the parse time matters here
+            timings[site].append(time.perf_counter() - started)
+
+    print(f"{'website':<16}{'pages':>8}{'MB':>10}{'ms/page':>10}{'MB/s':>10}")
+    for site, site_timings in timings.items():
+        if not site_timings:
+            continue
+        total = sum(site_timings)
+        megabytes = page_bytes[site] / 1e6
+        print(f"{site:<16}{len(site_timings) // repeat:>8}{megabytes:>10.2f}"
+              f"{total / len(site_timings) * 1000:>10.2f}{megabytes * repeat / total:>10.2f}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive-dir", required=True, help="Directory of the HTML archive")
+    parser.add_argument("--repeat", type=int, default=5, help="Times each page is parsed")
+    args = parser.parse_args()
+    main(args.archive_dir, args.repeat)
@@ -0,0 +1,97 @@
+"""
+Memory and throughput benchmark for the records held by a refresh.
+
+Builds the refresh targets and scraped records for a synthetic library both ways: pydantic MangaRecord targets
+with create_record dicts, as the refresh used to, and the slotted RefreshTarget and ScrapeResult records it uses now.
+Reports build time and the memory retained by each, measured with tracemalloc. No database or network is used.
+
+Run from the backend_scraper directory:
+    python -m benchmarks.bench_refresh_records --series 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+from data_models.manga_records import MangaRecord
+from data_models.refresh_records import RefreshTarget, ScrapeResult
+
+WEBSITES = ["https://chapmanganato.to/", "https://www.webtoons.com/", "https://www.viz.com/"]
+GENRES = ["Action", "Fantasy", "Romance", "Comedy"]
+
+
+def website_path_rows(series: int) -> List[Dict[str, Any]]:
+    """
+    Rows in the get_website_paths() format, as returned by MangaScraperDB.get_website_paths
+    """
+    return [{
+        "manga_path_id": f"00000000-0000-4000-8000-{index:012d}",
+        "manga_id": f"00000000-0000-4000-9000-{index:012d}",
+        "manga_name": f"Series {index}",
+        "full_path": f"{WEBSITES[index % len(WEBSITES)]}manga-{index}"
+    } for index in range(series)]
+
+
+def scraped_record(index: int) -> Dict[str, Any]:
+    """
+    A record as returned by create_record. The website URL is built per record, as the scrapers do.
+    """
+    website_url = "".join(["https://", WEBSITES[index % len(WEBSITES)][8:]])
+    return {
+        "manga_name": f"Series {index}",
+        "manga_path": f"/manga-{index}",
+        "chapter_url": f"{website_url}manga-{index}/chapter-{index % 500}",
+        "date_checked": "2024-01-01 00:00:00",
+        "number_of_pages": 0,
+        "chapter_url_status": 200,
+        "manga_thumbnail_url": f"https://img.example.com/{index}.jpg",
+        "website_url": website_url,
+        "chapter_number": str(index % 500),
+        "genres": [genre for genre in GENRES[:index % len(GENRES) + 1]]
+    }
+
+
+def build_pydantic(rows: List[Dict[str, Any]]) -> Tuple[list, list]:
+    targets = [MangaRecord(id=row["manga_path_id"], lastChecked="N/A", link=row["full_path"], status='Good',
+                           title=row["manga_name"]) for row in rows]
+    records = [scraped_record(index) for index in range(len(rows))]
+    return targets, records
+
+
+def build_slotted(rows: List[Dict[str, Any]]) -> Tuple[list, list]:
+    targets = [RefreshTarget(id=row["manga_path_id"], link=row["full_path"], title=row["manga_name"]) for row in rows]
+    records = [ScrapeResult.from_record(scraped_record(index)) for index in range(len(rows))]
+    return targets, records
+
+
+def measure(build: Callable[[List[Dict[str, Any]]], Tuple[list, list]], rows: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Time a build and measure the memory its result retains
+
+    Returns:
+        Dict[str, float]: Records built per second and retained megabytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"records_per_second": len(rows) / elapsed, "retained_mb": retained / 2 ** 20}
+
+
+def main(series: int):
+    rows = website_path_rows(series)
+    print(f"{'representation':<32}{'records/s':>12}{'retained MB':>14}")
+    for name, build in (("MangaRecord + dict", build_pydantic), ("RefreshTarget + ScrapeResult", build_slotted)):
+        result = measure(build, rows)
+        print(f"{name:<32}{result['records_per_second']:>12.0f}{result['retained_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=100000, help="Manga paths in the synthetic library")
+    args = parser.parse_args()
+    main(args.series)
@@ -0,0 +1,173 @@
+"""
+Latency benchmark for the stored procs and the MangaScraperDB read methods.
+
+Each case runs --iterations times after --warmup untimed calls, and the report lists p50, p95 and max latency
+and the number of rows returned. Point lookups alternate between the most popular series and the long tail,
+since their cost depends on how many chapter rows a series has.
+delete_manga_record is timed inside a transaction that is rolled back, so the library is left as it was.
+
+Reports can be saved with --json and compared against a previous run with --compare, e.g. before and after
+changing a stored proc or an index. Seed the database first with benchmarks.seed_library.
+
+Run from the backend_scraper directory:
+    python -m benchmarks.bench_stored_procs --iterations 50 --json after.json --compare before.json
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+from src.manga_scraper_db import MangaScraperDB
+
+
+def measure(call: Callable[[int], int], iterations: int, warmup: int) -> Dict[str, float]:
+    """
+    Time a benchmark case
+
+    Args:
+        call (Callable[[int], int]): Runs the case once for the given iteration and returns the rows it produced
+        iterations (int): Timed runs
+        warmup (int): Untimed runs before timing, to fill caches and plan the queries
+
+    Returns:
+        Dict[str, float]: Latency percentiles in milliseconds and rows returned by the last run
+    """
+    for i in range(warmup):
+        call(i)
+    timings = []
+    rows = 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        rows = call(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+        "rows": rows
+    }
+
+
+def load_samples(ms_db: MangaScraperDB) -> Dict[str, Any]:
+    """
+    Pick the arguments for the point lookups: chapter URLs of the largest and smallest series,
+    a manga to delete, a common genre and a search query taken from an existing title
+    """
+    with ms_db.conn.cursor() as cur:
+        cur.execute("""
+            (SELECT manga_id, website_id, manga_path_id, chapter_url FROM manga_chapter_url_store
+             WHERE manga_path_id = (SELECT manga_path_id FROM manga_chapter_url_store
+                                    GROUP BY manga_path_id ORDER BY COUNT(*) DESC LIMIT 1)
+             ORDER BY chapter_number DESC LIMIT 1)
+            UNION ALL
+            (SELECT manga_id, website_id, manga_path_id, chapter_url FROM manga_chapter_url_store
+             WHERE manga_path_id = (SELECT manga_path_id FROM manga_chapter_url_store
+                                    GROUP BY manga_path_id ORDER BY COUNT(*) ASC LIMIT 1)
+             LIMIT 1)
+        """)
+        chapters = [tuple(str(value) for value in row) for row in cur.fetchall()]
+        cur.execute("SELECT genre FROM manga_genre_table GROUP BY genre ORDER BY COUNT(*) DESC LIMIT 1")
+        genre = cur.fetchone()
+        cur.execute("SELECT manga_id, manga_name FROM manga_table ORDER BY manga_id LIMIT 1")
+        manga = cur.fetchone()
+    ms_db.conn.rollback()
+    if not chapters or genre is None or manga is None:
+        raise SystemExit("The database is empty, seed it first with benchmarks.seed_library")
+    return {
+        "chapters": chapters,
+        "genre": genre[0],
+        "manga_id": str(manga[0]),
+        "query": manga[1].split()[0]
+    }
+
+
+def build_cases(ms_db: MangaScraperDB, samples: Dict[str, Any]) -> Dict[str, Callable[[int], int]]:
+    """
+    Benchmark cases by name, stored procs first and then the MangaScraperDB methods wrapping them
+    """
+    chapters = samples["chapters"]
+
+    def sql(query: str, params: Callable[[int], tuple] = lambda i: ()) -> Callable[[int], int]:
+        def call(i: int) -> int:
+            with ms_db.conn.cursor() as cur:
+                cur.execute(query, params(i))
+                rows = cur.rowcount
+            ms_db.conn.rollback()
+            return rows
+        return call
+
+    def delete_rolled_back(i: int) -> int:
+        with ms_db.conn.cursor() as cur:
+            cur.execute("CALL delete_manga_record(%s)", (samples["manga_id"],))
+        ms_db.conn.rollback()
+        return 0
+
+    def method(fn: Callable[[int], Any]) -> Callable[[int], int]:
+        def call(i: int) -> int:
+            result = fn(i)
+            return len(result) if isinstance(result, list) else int(bool(result))
+        return call
+
+    return {
+        "proc get_manga_data": sql("SELECT * FROM get_manga_data()"),
+        "proc get_manga_bookmarks": sql("SELECT * FROM get_manga_bookmarks()"),
+        "proc get_website_paths": sql("SELECT * FROM get_website_paths()"),
+        "proc get_genres": sql("SELECT * FROM get_genres()"),
+        "proc get_manga_data_by_genres": sql("SELECT * FROM get_manga_data_by_genres(%s::varchar[])",
+                                             lambda i: ([samples["genre"]],)),
+        "proc search_manga": sql("SELECT * FROM search_manga(%s, %s, %s)", lambda i: (samples["query"], 20, 0)),
+        "proc check_chapter_url_exists": sql("SELECT check_chapter_url_exists(%s, %s, %s, %s)",
+                                             lambda i: chapters[i % len(chapters)]),
+        "proc delete_manga_record (rolled back)": delete_rolled_back,
+        "db get_frontend_data": method(lambda i: ms_db.get_frontend_data()),
+        "db get_bookmarks_data": method(lambda i: ms_db.get_bookmarks_data()),
+        "db get_website_paths": method(lambda i: ms_db.get_website_paths()),
+        "db get_genres": method(lambda i: ms_db.get_genres()),
+        "db get_frontend_data_by_genres": method(lambda i: ms_db.get_frontend_data_by_genres([samples["genre"]])),
+        "db search_manga": method(lambda i: ms_db.search_manga(samples["query"])),
+        "db is_chapter_url_exists": method(lambda i: ms_db.is_chapter_url_exists(*chapters[i % len(chapters)]))
+    }
+
+
+def print_report(report: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]):
+    header = f"{'case':<42}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'rows':>9}"
+    if baseline:
+        header += f"{'p50 change':>12}"
+    print(header)
+    for name, result in report.items():
+        line = f"{name:<42}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['max_ms']:>10.2f}{result['rows']:>9}"
+        previous = (baseline or {}).get(name)
+        if previous and previous["p50_ms"]:
+            line += f"{(result['p50_ms'] / previous['p50_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main(iterations: int, warmup: int, cases: List[str], json_path: Optional[str], compare_path: Optional[str]):
+    ms_db = MangaScraperDB()
+    samples = load_samples(ms_db)
+    all_cases = build_cases(ms_db, samples)
+    selected = {name: call for name, call in all_cases.items() if not cases or any(case in name for case in cases)}
+
+    report = {name: measure(call, iterations, warmup) for name, call in selected.items()}
+    ms_db.close_connection()
+
+    baseline = None
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = json.load(f)["results"]
+    print_report(report, baseline)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"iterations": iterations, "samples": samples, "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30, help="Timed runs per case")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per case before timing")
+    parser.add_argument("--cases", nargs="*", default=[], help="Only run cases whose name contains one of these")
+    parser.add_argument("--json", dest="json_path", help="Save the report to this file")
+    parser.add_argument("--compare", dest="compare_path", help="Previous --json report to compare against")
+    args = parser.parse_args()
+    main(args.iterations, args.warmup, args.cases, args.json_path, args.compare_path)
@@ -0,0 +1,231 @@
+"""
+HTTP load test for the API.
+
+Starts main.py under uvicorn against the configured (seeded) database with a stubbed scraper, drives mixed traffic
+for a fixed duration and reports throughput, latency percentiles and error rates per endpoint:
+    - pollers calling /get_data in a loop, like open frontends
+    - bursts of concurrent /insert_record calls adding manga
+    - overlapping /refresh_data calls, which should join the refresh already in flight
+
+The scraper is stubbed with an HTML archive of generated manganato pages that the app reads in offline mode
+(HTML_ARCHIVE_DIR and HTML_ARCHIVE_OFFLINE), so runs are repeatable and no website is contacted. Pages are served
+instantly, so scrape-bound latencies are a lower bound. 429 responses from admission control are counted apart from
+errors. Reports can be saved with --json and compared against a previous run with --compare.
+
+Run from the backend_scraper directory against a database seeded with benchmarks.seed_library:
+    python -m benchmarks.load_test --duration 60 --pollers 16 --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from src.html_archive import HtmlArchive
+
+STUB_URL = "https://chapmanganato.to/manga-lt{index}"
+
+
+def stub_page(index: int) -> str:
+    """
+    A manga page in the layout MangaKakalotScraper parses
+    """
+    url = STUB_URL.format(index=index)
+    return (
+        '<html><body>'
+        f'<div class="story-info-left"><span class="info-image"><img src="https://img.example.com/lt{index}.jpg"></span></div>'
+        f'<div class="story-info-right"><h1>Load Test Series {index}</h1>'
+        '<table><tr><td class="table-label"><i class="info-genres"></i>Genres :</td>'
+        '<td class="table-value"><a class="a-h">Action</a> - <a class="a-h">Fantasy</a></td></tr></table></div>'
+        f'<ul class="row-content-chapter"><li><a class="chapter-name text-nowrap" href="{url}/chapter-{index % 300 + 1}">'
+        f'Chapter {index % 300 + 1}</a></li></ul>'
+        '</body></html>'
+    )
+
+
+def build_stub_archive(root: str, series: int):
+    """
+    Write the pages of the stubbed series into an archive the app can read offline
+    """
+    archive = HtmlArchive(root)
+    for index in range(series):
+        archive.put(STUB_URL.format(index=index), stub_page(index).encode("utf-8"))
+    archive.close()
+
+
+def start_server(port: int, archive_dir: str, startup_timeout: float) -> subprocess.Popen:
+    """
+    Start the app under uvicorn with the stubbed scraper and wait until it reports ready
+    """
+    env = dict(os.environ, HTML_ARCHIVE_DIR=archive_dir, HTML_ARCHIVE_OFFLINE="1")
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              env=env)
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/readyz", timeout=1).status_code == 200:
+                return server
+        except requests.ConnectionError:
+            if server.poll() is not None:
+                raise SystemExit("The server exited during startup")
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("The server did not start in time")
+
+
+class Recorder:
+    """
+    Collects (endpoint, status code, latency) samples from the traffic threads
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[str, int, float]] = []
+
+    def request(self, session: requests.Session, endpoint: str, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=300, **kwargs)
+            status_code = response.status_code
+        except requests.RequestException:
+            response, status_code = None, 0 # Connection errors and timeouts
+        with self._lock:
+            self.samples.append((endpoint, status_code, (time.perf_counter() - started) * 1000))
+        return response
+
+    def report(self, duration: float) -> Dict[str, Dict[str, float]]:
+        """
+        Throughput, latency percentiles and error rates per endpoint. 429 responses are not counted as errors.
+        """
+        by_endpoint: Dict[str, List[Tuple[int, float]]] = {}
+        with self._lock:
+            for endpoint, status_code, latency in self.samples:
+                by_endpoint.setdefault(endpoint, []).append((status_code, latency))
+
+        report = {}
+        for endpoint, samples in sorted(by_endpoint.items()):
+            latencies = sorted(latency for _, latency in samples)
+            errors = sum(1 for status_code, _ in samples if status_code == 0 or status_code >= 500)
+            rejected = sum(1 for status_code, _ in samples if status_code == 429)
+            report[endpoint] = {
+                "requests": len(samples),
+                "rps": len(samples) / duration,
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                "error_rate": errors / len(samples),
+                "rejected_rate": rejected / len(samples)
+            }
+        return report
+
+
+def run_traffic(base_url: str, args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Drive the mixed traffic until the duration has passed
+
+    Returns:
+        Dict[str, Dict[str, float]]: The report per endpoint
+    """
+    recorder = Recorder()
+    stop = threading.Event()
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+
+    def poller():
+        session = requests.Session()
+        while not stop.is_set():
+            recorder.request(session, "GET /get_data", "GET", f"{base_url}/get_data")
+            stop.wait(args.poll_interval)
+
+    def insert_once():
+        with rng_lock:
+            index = rng.randrange(args.series)
+        record = {"id": f"new_{index}", "link": STUB_URL.format(index=index), "status": "Good",
+                  "title": f"Load Test Series {index}"}
+        recorder.request(requests.Session(), "POST /insert_record", "POST", f"{base_url}/insert_record",
+                         json={"manga_records": [record]})
+
+    def inserter():
+        while not stop.wait(args.burst_interval):
+            burst = [threading.Thread(target=insert_once) for _ in range(args.burst_size)]
+            for thread in burst:
+                thread.start()
+            for thread in burst:
+                thread.join()
+
+    def refresher():
+        session = requests.Session()
+        while not stop.wait(args.refresh_interval):
+            recorder.request(session, "GET /refresh_data", "GET", f"{base_url}/refresh_data",
+                             params={"deadline_seconds": args.refresh_deadline})
+
+    threads = [threading.Thread(target=poller) for _ in range(args.pollers)]
+    threads.append(threading.Thread(target=inserter))
+    threads += [threading.Thread(target=refresher) for _ in range(args.refreshers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.perf_counter() - started)
+
+
+def print_report(report: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]):
+    header = f"{'endpoint':<22}{'requests':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'429s':>8}"
+    if baseline:
+        header += f"{'p95 change':>12}"
+    print(header)
+    for endpoint, result in report.items():
+        line = (f"{endpoint:<22}{result['requests']:>9}{result['rps']:>9.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['error_rate']:>8.1%}{result['rejected_rate']:>8.1%}")
+        previous = (baseline or {}).get(endpoint)
+        if previous and previous["p95_ms"]:
+            line += f"{(result['p95_ms'] / previous['p95_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory() as archive_dir:
+        build_stub_archive(archive_dir, args.series)
+        server = start_server(args.port, archive_dir, args.startup_timeout)
+        try:
+            report = run_traffic(f"http://127.0.0.1:{args.port}", args)
+        finally:
+            server.terminate()
+            server.wait()
+
+    baseline = None
+    if args.compare_path:
+        with open(args.compare_path) as f:
+            baseline = json.load(f)["results"]
+    print_report(report, baseline)
+    if args.json_path:
+        settings = {key: value for key, value in vars(args).items() if key not in ("json_path", "compare_path")}
+        with open(args.json_path, "w") as f:
+            json.dump({"settings": settings, "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic")
+    parser.add_argument("--port", type=int, default=8765, help="Port the app is started on")
+    parser.add_argument("--series", type=int, default=200, help="Stubbed series available to /insert_record")
+    parser.add_argument("--pollers", type=int, default=8, help="Clients polling /get_data")
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="Seconds each poller waits between requests")
+    parser.add_argument("--burst-size", type=int, default=12, help="Concurrent /insert_record calls per burst")
+    parser.add_argument("--burst-interval", type=float, default=5, help="Seconds between insert bursts")
+    parser.add_argument("--refreshers", type=int, default=3, help="Clients calling /refresh_data, so refreshes overlap")
+    parser.add_argument("--refresh-interval", type=float, default=10, help="Seconds each refresher waits between calls")
+    parser.add_argument("--refresh-deadline", type=float, default=20, help="deadline_seconds sent with /refresh_data")
+    parser.add_argument("--startup-timeout", type=float, default=30, help="Seconds to wait for the app to start")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the inserted series")
+    parser.add_argument("--json", dest="json_path", help="Save the report to this file")
+    parser.add_argument("--compare", dest="compare_path", help="Previous --json report to compare against")
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+"""
+Synthetic library seeder for benchmarks.
+
+Fills the schema from database/create with a library of configurable size and realistic skew:
+    - chapter counts follow a Zipf-like curve, so a few popular series have thousands of chapter rows
+      and the long tail has a handful
+    - series are spread over several websites, popular ones are carried by more of them
+    - refreshes store the same thumbnail again, so many manga have duplicate thumbnail rows
+    - some series have alternate names in manga_name_mappings and one to four genres
+
+Rows are loaded with COPY in chunks, so millions of chapter rows load in minutes without holding them in memory.
+Seeding is deterministic for a given --seed, so benchmark runs on different machines see the same data.
+
+Run from the backend_scraper directory against an empty database (see database/delete/delete_all.sql):
+    python -m benchmarks.seed_library --manga 10000 --max-chapters 2000
+"""
+import argparse
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Sequence
+from src.manga_scraper_db import MangaScraperDB
+
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Horror", "Isekai", "Martial arts",
+          "Mystery", "Romance", "School life", "Sci fi", "Slice of life", "Sports", "Supernatural"]
+WORDS = ["Battle", "Heavens", "Solo", "Leveling", "Tower", "God", "Demon", "Sword", "Return", "Legend", "Martial",
+         "Peak", "King", "Shadow", "Villain", "Academy", "Dragon", "Emperor", "Hunter", "Reaper", "Star", "Moon"]
+COPY_CHUNK_ROWS = 50000
+
+
+def uuids(rng: random.Random, count: int) -> List[str]:
+    """
+    Deterministic UUIDs drawn from the seeded generator
+    """
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(count)]
+
+
+def copy_rows(conn, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """
+    Load rows into a table with COPY, one chunk at a time
+
+    Args:
+        conn: Open psycopg2 connection
+        table (str): Target table
+        columns (Sequence[str]): Target columns
+        rows (Iterable[Sequence]): Row values, None becomes NULL
+
+    Returns:
+        int: Number of rows loaded
+    """
+    def flush(buffer: io.StringIO):
+        buffer.seek(0)
+        with conn.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+    total = 0
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join("\\N" if value is None else str(value) for value in row) + "\n")
+        total += 1
+        if total % COPY_CHUNK_ROWS == 0:
+            flush(buffer)
+            buffer = io.StringIO()
+    if buffer.tell():
+        flush(buffer)
+    conn.commit()
+    return total
+
+
+def main(manga_count: int, website_count: int, max_chapters: int, skew: float, seed: int):
+    rng = random.Random(seed)
+    ms_db = MangaScraperDB()
+    conn = ms_db.conn
+    started = time.perf_counter()
+    now = datetime(2024, 1, 1)
+
+    website_ids = uuids(rng, website_count)
+    websites = [(website_id, f"site{index}", f"https://site{index}.example.com/", "Good", now)
+                for index, website_id in enumerate(website_ids)]
+    copy_rows(conn, "website_table", ["website_id", "website_name", "website_url", "website_status", "date_checked"], websites)
+
+    manga_ids = uuids(rng, manga_count)
+    names = [f"{' '.join(rng.sample(WORDS, rng.randint(2, 4)))} {index}" for index in range(manga_count)]
+    copy_rows(conn, "manga_table", ["manga_id", "manga_name"], zip(manga_ids, names))
+
+    # Popularity rank decides chapter counts and how many websites carry a series
+    ranks = list(range(1, manga_count + 1))
+    rng.shuffle(ranks)
+    paths = [] # (manga_path_id, manga_id, website_id, chapter count)
+    for manga_id, rank in zip(manga_ids, ranks):
+        chapters = max(1, int(max_chapters / rank ** skew))
+        site_count = min(website_count, 1 + int(website_count * (1 - rank / manga_count) ** 4))
+        for website_id in rng.sample(website_ids, site_count):
+            paths.append((str(uuid.UUID(int=rng.getrandbits(128), version=4)), manga_id, website_id, chapters))
+    copy_rows(conn, "manga_path_table", ["manga_path_id", "manga_id", "website_id", "manga_path"],
+              ((path_id, manga_id, website_id, f"/manga/{path_id[:8]}") for path_id, manga_id, website_id, _ in paths))
+
+    def chapter_rows() -> Iterator[tuple]:
+        for path_id, manga_id, website_id, chapters in paths:
+            for number in range(1, chapters + 1):
+                date_checked = now - timedelta(days=chapters - number)
+                yield (uuid.UUID(int=rng.getrandbits(128), version=4), manga_id, website_id, path_id,
+                       f"https://{website_id[:8]}.example.com/manga/{path_id[:8]}/chapter-{number}",
+                       rng.randint(10, 80), 200, number, date_checked)
+    chapter_total = copy_rows(conn, "manga_chapter_url_store",
+                              ["manga_chapter_url_id", "manga_id", "website_id", "manga_path_id", "chapter_url",
+                               "number_of_pages", "chapter_url_status", "chapter_number", "date_checked"], chapter_rows())
+
+    def thumbnail_rows() -> Iterator[tuple]:
+        for path_id, manga_id, website_id, chapters in paths:
+            # Refreshes that found the same thumbnail stored it again
+            for _ in range(1 + min(5, chapters // 200)):
+                yield (uuid.UUID(int=rng.getrandbits(128), version=4), manga_id, website_id, path_id,
+                       f"https://img.example.com/{manga_id[:8]}.jpg")
+    copy_rows(conn, "manga_thumbnail", ["manga_thumbnail_id", "manga_id", "website_id", "manga_path_id", "thumbnail_url"], thumbnail_rows())
+
+    def genre_rows() -> Iterator[tuple]:
+        for manga_id in manga_ids:
+            for genre in rng.sample(GENRES, rng.randint(1, 4)):
+                yield (uuid.UUID(int=rng.getrandbits(128), version=4), manga_id, genre)
+    copy_rows(conn, "manga_genre_table", ["manga_genre_id", "manga_id", "genre"], genre_rows())
+
+    def alias_rows() -> Iterator[tuple]:
+        for manga_id, name in zip(manga_ids, names):
+            if rng.random() < 0.2:
+                yield (uuid.UUID(int=rng.getrandbits(128), version=4), rng.choice(website_ids), manga_id, name[::-1].title())
+    copy_rows(conn, "manga_name_mappings", ["manga_name_mapping_id", "website_id", "manga_id", "manga_name"], alias_rows())
+
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE")
+    conn.commit()
+    ms_db.close_connection()
+    print(f"Seeded {manga_count} manga, {len(paths)} paths and {chapter_total} chapter rows "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manga", type=int, default=10000, help="Number of manga")
+    parser.add_argument("--websites", type=int, default=5, help="Number of websites")
+    parser.add_argument("--max-chapters", type=int, default=2000, help="Chapter rows of the most popular series")
+    parser.add_argument("--skew", type=float, default=0.8, help="Zipf exponent of chapter counts by popularity")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    main(args.manga, args.websites, args.max_chapters, args.skew, args.seed)
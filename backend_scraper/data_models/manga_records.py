@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 from typing import Optional
+from uuid import UUID
 
 class MangaRecord(BaseModel):
     chapter_number: Optional[int] = None
@@ -17,3 +18,11 @@ class MangaRecord(BaseModel):
 
 class MangaList(BaseModel):
     manga_records: list[MangaRecord]
+
+class BulkImportRequest(BaseModel):
+    # Manga page links to import, e.g. exported from another tracker
+    links: list[str]
+
+class FollowRequest(BaseModel):
+    # The manga path a user starts following, as returned in the manga_path_id of refresh events
+    manga_path_id: UUID
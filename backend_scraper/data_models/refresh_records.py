@@ -0,0 +1,73 @@
+## Internal records of the refresh pipeline
+## Refreshes hold one record per manga path, so these are slotted dataclasses rather than pydantic models or dicts.
+## Pydantic stays at the API boundary, see manga_records.py
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+@dataclass(slots=True)
+class RefreshTarget:
+    # A manga path to refresh, read from get_website_paths()
+    # Has the id, link and title of a MangaRecord so the scraping code accepts either
+    id: str # manga_path_id
+    link: str
+    title: str
+
+@dataclass(slots=True)
+class ScrapeResult:
+    # The record a scraper's create_record returns, see MangaKakalotScraper.create_record
+    manga_name: str
+    manga_path: str
+    chapter_url: Optional[str]
+    date_checked: str
+    number_of_pages: int
+    chapter_url_status: Any
+    manga_thumbnail_url: str
+    website_url: str # Interned, every record of a website shares one string
+    chapter_number: Any
+    genres: Tuple[str, ...] = () # Interned, genre names repeat across the library
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "ScrapeResult":
+        """
+        Convert a record returned by create_record
+
+        Args:
+            record (Dict[str, Any]): The scraped record
+
+        Returns:
+            ScrapeResult: The compact record
+        """
+        return cls(
+            manga_name=record["manga_name"],
+            manga_path=record["manga_path"],
+            chapter_url=record["chapter_url"],
+            date_checked=record["date_checked"],
+            number_of_pages=record["number_of_pages"],
+            chapter_url_status=record["chapter_url_status"],
+            manga_thumbnail_url=record["manga_thumbnail_url"],
+            website_url=sys.intern(record["website_url"]),
+            chapter_number=record["chapter_number"],
+            genres=tuple(sys.intern(genre) for genre in record.get("genres") or ())
+        )
+
+    def as_record(self) -> Dict[str, Any]:
+        """
+        The record as the dict create_record returns, for the MangaScraperDB methods that take one
+
+        Returns:
+            Dict[str, Any]: The scraped record
+        """
+        return {
+            "manga_name": self.manga_name,
+            "manga_path": self.manga_path,
+            "chapter_url": self.chapter_url,
+            "date_checked": self.date_checked,
+            "number_of_pages": self.number_of_pages,
+            "chapter_url_status": self.chapter_url_status,
+            "manga_thumbnail_url": self.manga_thumbnail_url,
+            "website_url": self.website_url,
+            "chapter_number": self.chapter_number,
+            "genres": list(self.genres)
+        }
@@ -1,10 +1,84 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import math
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional
 from src.manga_scraper_service import MangaScraperService
-from data_models.manga_records import MangaList
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import read_from_primary
+from src.html_archive import HtmlArchive
+from src.cache_listener import CacheListener
+from src.admission import AdmissionRejected, InsertQueue, RefreshCoordinator
+from data_models.manga_records import MangaList, BulkImportRequest, FollowRequest
 
-app = FastAPI()
+# Created in the lifespan so importing this module never reads the config or touches the database
+manga_scraper_service: Optional[MangaScraperService] = None
+# Set once the warm-up has reached the database, see warm_up
+readiness = {"warmed_up": False}
+WARM_UP_RETRY_SECONDS = 2
+# Cookie holding the time of the client's last write, see mark_client_write
+READ_YOUR_WRITES_COOKIE = "last_write_at"
+
+async def warm_up(service: MangaScraperService):
+    """
+    Open the connection pool, retrying until the database answers, then mark the app ready.
+    With WARM_CACHES=1 the lookup caches are loaded and the /get_data query is run once first,
+    so the first requests after a restart do not pay for cold caches.
+
+    Args:
+        service (MangaScraperService): The service to warm up
+    """
+    while not await service.async_db.ping():
+        await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+    if os.environ.get("WARM_CACHES") == "1":
+        ms_db = MangaScraperDB()
+        await asyncio.to_thread(ms_db.load_lookup_caches)
+        ms_db.close_connection()
+        await service.async_db.get_frontend_data()
+    readiness["warmed_up"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the service on startup and release its resources on shutdown.
+    Startup does not wait for the database: the pool is opened by a background warm-up and /readyz reports
+    when the app can serve traffic, so a slow or unavailable database cannot hang the process.
+    """
+    global manga_scraper_service
+    # Set HTML_ARCHIVE_DIR to keep a copy of every scraped page for offline re-parsing
+    # With HTML_ARCHIVE_OFFLINE=1 as well, pages are served from the archive instead of the websites, e.g. for load tests
+    archive_dir = os.environ.get("HTML_ARCHIVE_DIR")
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+    manga_scraper_service = MangaScraperService(archive=archive,
+                                                offline=bool(archive_dir) and os.environ.get("HTML_ARCHIVE_OFFLINE") == "1")
+    warm_up_task = asyncio.create_task(warm_up(manga_scraper_service))
+    # Each worker listens for changes committed by the others, so their cached reads stay coherent
+    cache_listener = CacheListener(manga_scraper_service.ms_db)
+    cache_listener.start()
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        cache_listener.stop()
+        await asyncio.to_thread(cache_listener.join)
+        readiness["warmed_up"] = False
+        await manga_scraper_service.async_db.close()
+        # Waits for scrapes already running, off the event loop
+        await asyncio.to_thread(manga_scraper_service.scheduler.shutdown)
+        manga_scraper_service.ms_db.close_connection()
+        if archive is not None:
+            archive.close()
+        # A later startup, e.g. the next TestClient, creates a fresh service
+        manga_scraper_service = None
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -15,45 +89,217 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# Admission control for the write endpoints: a bounded queue of insert jobs and at most one refresh in flight
+insert_queue = InsertQueue()
+refresh_coordinator = RefreshCoordinator()
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    """
+    Send the reads of a client that wrote within read_your_writes_seconds to the primary, see mark_client_write.
+    Other clients keep reading from the replicas and the read cache.
+    """
+    written_at = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    recent = False
+    if written_at is not None and manga_scraper_service is not None:
+        try:
+            recent = time.time() - float(written_at) < manga_scraper_service.async_db.read_your_writes_seconds()
+        except ValueError:
+            pass
+    token = read_from_primary.set(recent)
+    try:
+        return await call_next(request)
+    finally:
+        read_from_primary.reset(token)
+
+def mark_client_write(response: Response):
+    """
+    Let the client that made a write read it back: the rest of the request and the client's requests within
+    read_your_writes_seconds, recognised by a cookie, read from the primary instead of a possibly lagging replica.
+
+    Args:
+        response (Response): Response of the write endpoint, the cookie is set on it
+    """
+    read_from_primary.set(True)
+    response.set_cookie(READ_YOUR_WRITES_COOKIE, str(time.time()),
+                        max_age=math.ceil(manga_scraper_service.async_db.read_your_writes_seconds()),
+                        httponly=True, samesite="lax")
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """
+    Answer saturated write endpoints with 429 so clients back off instead of stacking up requests
+    """
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+@app.get("/healthz")
+async def healthz_api() -> Dict[str, str]:
+    """
+    Liveness probe, answers as long as the process is serving requests. Never touches the database.
+    """
+    return {"status": "ok"}
 
-# Instantiate MangaScraperService
-manga_scraper_service = MangaScraperService()
+@app.get("/readyz")
+async def readyz_api() -> JSONResponse:
+    """
+    Readiness probe for load balancers and rolling restarts.
+
+    Returns:
+        JSONResponse: 200 once the warm-up has finished and the database answers, 503 otherwise.
+    """
+    if not readiness["warmed_up"]:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if not await manga_scraper_service.async_db.ping():
+        return JSONResponse(status_code=503, content={"status": "database unavailable"})
+    return JSONResponse(content={"status": "ready"})
 
 @app.post("/insert_record")
-async def update_manga_list(manga_list: MangaList):
+async def update_manga_list(manga_list: MangaList, response: Response):
     """
     Endpoint to update the manga list.
 
     Args:
         manga_list (MangaList): The manga list to be processed.
+        response (Response): Carries the read-your-writes cookie, see mark_client_write.
 
     Returns:
         Dict: A dictionary containing the confirmation message, URL, response data, and database upload status.
     """
-    # Process the manga_list using MangaScraperService
-    output_list, error_list = manga_scraper_service.scrape_record(manga_list)
-    insert_record_response = manga_scraper_service.bulk_insert_record(output_list, refresh_data=False)
-    manga_scraper_service.delete_record(manga_list)
-    response = manga_scraper_service.ms_db.get_frontend_data()
+    def process_manga_list() -> Optional[str]:
+        # Process the manga_list using MangaScraperService
+        output_list, error_list = manga_scraper_service.scrape_record(manga_list)
+        insert_record_response = manga_scraper_service.bulk_insert_record(output_list, refresh_data=False)
+        manga_scraper_service.delete_record(manga_list)
+        return insert_record_response
+
+    # Runs on the insert queue, raises AdmissionRejected when the queue is full
+    insert_record_response = await asyncio.wrap_future(insert_queue.submit(process_manga_list))
+    mark_client_write(response)
+    confirmation = await manga_scraper_service.async_db.get_frontend_data()
 
     return {
         "message": "Successfully confirmed", 
         "url": "http://127.0.0.1:8000/insert_record", 
-        "confirmation": response,
+        "confirmation": confirmation,
         "db_upload_status": insert_record_response
     }
 
+@app.post("/bulk_import")
+async def bulk_import(import_request: BulkImportRequest, response: Response) -> Dict[str, Any]:
+    """
+    Endpoint to import a whole list of manga links at once.
+
+    Args:
+        import_request (BulkImportRequest): The links to import.
+        response (Response): Carries the read-your-writes cookie, see mark_client_write.
+
+    Returns:
+        Dict[str, Any]: A per-link report and a count of links per status.
+    """
+    return await run_bulk_import(import_request.links, response)
+
+@app.post("/bulk_import/csv")
+async def bulk_import_csv(request: Request, response: Response) -> Dict[str, Any]:
+    """
+    Endpoint to import manga links from a CSV export sent as the request body.
+
+    Args:
+        request (Request): Request whose body is the CSV file.
+        response (Response): Carries the read-your-writes cookie, see mark_client_write.
+
+    Returns:
+        Dict[str, Any]: A per-link report and a count of links per status.
+    """
+    csv_text = (await request.body()).decode("utf-8-sig")
+    return await run_bulk_import(manga_scraper_service.parse_import_csv(csv_text), response)
+
+async def run_bulk_import(links: List[str], response: Response) -> Dict[str, Any]:
+    """
+    Run a bulk import on the insert queue and summarise the results.
+
+    Args:
+        links (List[str]): The links to import.
+        response (Response): Response of the import endpoint, see mark_client_write.
+
+    Returns:
+        Dict[str, Any]: A per-link report and a count of links per status.
+    """
+    results = await asyncio.wrap_future(insert_queue.submit(lambda: manga_scraper_service.bulk_import(links)))
+    mark_client_write(response)
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"results": results, "summary": summary}
+
 @app.get("/get_data", response_model=List[Dict[str, Any]])
-async def get_data_api() -> List[Dict[str, Any]]:
+async def get_data_api(genre: Optional[List[str]] = Query(None), stream: bool = False):
     """
     Endpoint to retrieve manga data for the frontend.
 
+    Args:
+        genre (Optional[List[str]]): Only return manga with every given genre, e.g. /get_data?genre=Action&genre=Fantasy
+        stream (bool): Stream the whole library as it is read from a server-side cursor instead of building the list
+                       first, so memory stays flat and the first rows go out right away. Ignored when filtering by genre.
+
     Returns:
         List[Dict[str, Any]]: List of manga data for the frontend.
     """
-    manga_list = manga_scraper_service.ms_db.get_frontend_data()
+    if genre:
+        return await manga_scraper_service.async_db.get_frontend_data_by_genres(genre)
+    if stream:
+        return StreamingResponse(stream_json_array(manga_scraper_service.async_db.iter_frontend_data()),
+                                 media_type="application/json")
+    manga_list = await manga_scraper_service.async_db.get_frontend_data()
     return manga_list
 
+async def stream_json_array(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    """
+    Write chunks of rows as a single JSON array, one chunk at a time.
+
+    Args:
+        chunks (AsyncIterator[List[Dict[str, Any]]]): Chunks of rows, e.g. from iter_frontend_data.
+
+    Yields:
+        str: Pieces of the JSON array.
+    """
+    yield "["
+    first = True
+    async for rows in chunks:
+        if not rows:
+            continue
+        yield ("" if first else ",") + ",".join(json.dumps(row, default=str) for row in rows)
+        first = False
+    yield "]"
+
+@app.get("/search")
+async def search_api(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)) -> Dict[str, Any]:
+    """
+    Endpoint to search the library by title, including alternate names such as "Doupo Cangqiong".
+
+    Args:
+        q (str): Title or part of a title.
+        limit (int): Maximum number of results per page.
+        offset (int): Number of results to skip.
+
+    Returns:
+        Dict[str, Any]: The ranked matches, best first, with the limit and offset used.
+    """
+    results = await manga_scraper_service.async_db.search_manga(q, limit, offset)
+    return {"results": results, "limit": limit, "offset": offset}
+
+@app.get("/get_genres", response_model=List[Dict[str, Any]])
+async def get_genres_api() -> List[Dict[str, Any]]:
+    """
+    Endpoint to retrieve every genre in the library, e.g. for the genre filter.
+
+    Returns:
+        List[Dict[str, Any]]: Genres with the number of manga that have them.
+    """
+    genres = await manga_scraper_service.async_db.get_genres()
+    return genres
+
 @app.get("/get_bookmarks_data", response_model=List[Dict[str, Any]])
 async def get_frontend_data_api() -> List[Dict[str, Any]]:
     """
@@ -62,7 +308,7 @@ async def get_frontend_data_api() -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of manga data for the frontend bookmarks component.
     """
-    manga_list = manga_scraper_service.ms_db.get_bookmarks_data()
+    manga_list = await manga_scraper_service.async_db.get_bookmarks_data()
     return manga_list
 
 @app.get("/get_supported_websites", response_model=List[Dict[str, Any]])
@@ -73,16 +319,160 @@ async def get_supported_websites_data_api() -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of manga data for the frontend supported websites component.
     """
-    manga_list = manga_scraper_service.ms_db.get_supported_websites()
+    manga_list = await manga_scraper_service.async_db.get_supported_websites()
+    return manga_list
+
+@app.get("/users/{userid}/get_data", response_model=List[Dict[str, Any]])
+async def get_user_data_api(userid: uuid.UUID) -> List[Dict[str, Any]]:
+    """
+    Endpoint to retrieve the manga data of the manga a user follows.
+
+    Args:
+        userid (uuid.UUID): ID of the user.
+
+    Returns:
+        List[Dict[str, Any]]: List of manga data in the /get_data format.
+    """
+    manga_list = await manga_scraper_service.async_db.get_user_frontend_data(str(userid))
+    return manga_list
+
+@app.get("/users/{userid}/get_bookmarks_data", response_model=List[Dict[str, Any]])
+async def get_user_bookmarks_data_api(userid: uuid.UUID) -> List[Dict[str, Any]]:
+    """
+    Endpoint to retrieve the bookmarks of the manga paths a user follows.
+
+    Args:
+        userid (uuid.UUID): ID of the user.
+
+    Returns:
+        List[Dict[str, Any]]: List of bookmarks in the /get_bookmarks_data format.
+    """
+    manga_list = await manga_scraper_service.async_db.get_user_bookmarks_data(str(userid))
     return manga_list
 
+@app.post("/users/{userid}/follow")
+async def follow_manga_path_api(userid: uuid.UUID, follow_request: FollowRequest, response: Response) -> Dict[str, bool]:
+    """
+    Endpoint to make a user follow a manga path. The path itself is scraped once per refresh for all its followers.
+
+    Args:
+        userid (uuid.UUID): ID of the user.
+        follow_request (FollowRequest): The manga path to follow.
+        response (Response): Carries the read-your-writes cookie, see mark_client_write.
+
+    Returns:
+        Dict[str, bool]: Whether the follow was recorded, False for a manga path that does not exist.
+    """
+    followed = await manga_scraper_service.async_db.follow_manga_path(str(userid), str(follow_request.manga_path_id))
+    if followed:
+        mark_client_write(response)
+    return {"followed": followed}
+
+@app.delete("/users/{userid}/follow/{manga_path_id}")
+async def unfollow_manga_path_api(userid: uuid.UUID, manga_path_id: uuid.UUID, response: Response) -> Dict[str, bool]:
+    """
+    Endpoint to make a user stop following a manga path.
+
+    Args:
+        userid (uuid.UUID): ID of the user.
+        manga_path_id (uuid.UUID): ID of the manga path.
+        response (Response): Carries the read-your-writes cookie, see mark_client_write.
+
+    Returns:
+        Dict[str, bool]: Whether the update was recorded.
+    """
+    unfollowed = await manga_scraper_service.async_db.unfollow_manga_path(str(userid), str(manga_path_id))
+    if unfollowed:
+        mark_client_write(response)
+    return {"unfollowed": unfollowed}
+
+@app.get("/get_bootstrap_data")
+async def get_bootstrap_data_api() -> Response:
+    """
+    Endpoint to retrieve everything the frontend needs on first load in one request.
+    Combines /get_data, /get_bookmarks_data, /get_supported_websites and /get_genres, built in a single database round trip.
+
+    Returns:
+        Response: JSON object with "manga_data", "bookmarks_data", "supported_websites" and "genres" keys.
+    """
+    bootstrap_json = await manga_scraper_service.async_db.get_bootstrap_json()
+    return Response(content=bootstrap_json, media_type="application/json")
+
 @app.get("/refresh_data")
-async def refresh_data():
+async def refresh_data(deadline_seconds: Optional[float] = None):
     """
     Endpoint to refresh data by scraping existing websites for new chapters using MangaScraperService.
+    If a refresh is already running the request joins it and waits for its result.
+
+    Args:
+        deadline_seconds (Optional[float]): Time budget for the refresh. Series not reached are resumed by the next refresh.
+
+    Returns:
+        str: A message indicating the status of the data refresh, "Good" or "Partial" if the deadline was hit or some series failed.
+    """
+    run = refresh_coordinator.start_or_join(
+        lambda: manga_scraper_service.iter_refresh_events(deadline_seconds=deadline_seconds))
+    summary = await asyncio.wrap_future(run.result)
+    response = "Good" if summary["run_status"] == "completed" else "Partial"
+    return response
+
+@app.post("/refresh_runs")
+async def create_refresh_run_api() -> Dict[str, str]:
+    """
+    Endpoint to queue a refresh for the distributed refresh workers (src/refresh_worker.py).
+    Creates one job per manga path, which any number of workers can then claim and process.
 
     Returns:
-        str: A message indicating the status of the data refresh.
+        Dict[str, str]: The ID of the created refresh run.
     """
-    response = manga_scraper_service.refresh_backend_data()
-    return response
\ No newline at end of file
+    run_id = manga_scraper_service.ms_db.create_refresh_run()
+    return {"run_id": run_id}
+
+@app.get("/refresh_data/stream")
+async def refresh_data_stream(batch_size: int = 5, sweep: bool = True, deadline_seconds: Optional[float] = None) -> StreamingResponse:
+    """
+    Endpoint to refresh data while streaming per-manga progress as Server-Sent Events.
+    Each "refresh" event carries the status ("new_chapter", "unchanged" or "error") and, for new chapters,
+    the updated rows in the /get_data format so the frontend can patch individual cards.
+    A final "done" event with the run_id and run_status ("completed" or "partial") is sent once the refresh has finished.
+    If a refresh is already running the stream joins it, replaying its events so far, and the options are ignored.
+
+    Args:
+        batch_size (int): Number of records written per transaction before their events are sent.
+        sweep (bool): Only scrape series listed as updated since the last completed refresh by their website.
+        deadline_seconds (Optional[float]): Time budget for the refresh. Series not reached are resumed by the next refresh.
+
+    Returns:
+        StreamingResponse: text/event-stream of refresh events.
+    """
+    run = refresh_coordinator.start_or_join(
+        lambda: manga_scraper_service.iter_refresh_events(batch_size=max(1, batch_size), sweep=sweep,
+                                                          deadline_seconds=deadline_seconds))
+
+    def event_stream() -> Iterator[str]:
+        # The refresh runs on its own thread, a client disconnecting only stops its own stream
+        for event in run.subscribe():
+            yield f"event: refresh\ndata: {json.dumps(event, default=str)}\n\n"
+        error = run.result.exception()
+        summary = {"run_status": "error", "error": str(error)} if error is not None else run.result.result()
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/metrics")
+async def metrics_api() -> Dict[str, Any]:
+    """
+    Endpoint exposing admission control and scraping load, e.g. for dashboards or alerting.
+
+    Returns:
+        Dict[str, Any]: Insert queue depth and rejections, refresh coordination counters, scrape scheduler load
+                        and read cache hits.
+    """
+    return {
+        "insert_queue": insert_queue.stats(),
+        "refresh": refresh_coordinator.stats(),
+        "scrape_scheduler": manga_scraper_service.scheduler.stats(),
+        "coalesced_scrapes": manga_scraper_service.scrape_flight.coalesced,
+        "read_cache": MangaScraperDB.read_cache.stats()
+    }
@@ -0,0 +1,195 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Generator, Iterator, Optional
+
+# Events kept for callers joining a refresh late, older events are only seen by callers already following along
+REFRESH_REPLAY_EVENTS = 500
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a job is refused because the server is saturated. The API answers with 429 and Retry-After.
+    """
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InsertQueue:
+    """
+    Bounded queue for write jobs such as /insert_record and bulk imports.
+    At most max_running jobs run at once and at most max_queued wait behind them; anything beyond is rejected
+    immediately instead of piling up requests that all scrape and write at the same time.
+    """
+    def __init__(self, max_running: int = 2, max_queued: int = 8, retry_after_seconds: int = 5):
+        """
+        Args:
+            max_running (int): Jobs processed at the same time
+            max_queued (int): Jobs allowed to wait for a free slot
+            retry_after_seconds (int): Retry-After sent with rejections
+        """
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="insert")
+        self._lock = threading.Lock()
+        self._admitted = 0 # Queued plus running
+        self.accepted = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[[], Any]) -> Future:
+        """
+        Queue a write job
+
+        Args:
+            fn (Callable[[], Any]): The job
+
+        Raises:
+            AdmissionRejected: If the queue is full
+
+        Returns:
+            Future: Resolves to the result of fn
+        """
+        with self._lock:
+            if self._admitted >= self.max_running + self.max_queued:
+                self.rejected += 1
+                raise AdmissionRejected("Too many insert jobs in progress, try again later", self.retry_after_seconds)
+            self._admitted += 1
+            self.accepted += 1
+        future = self._executor.submit(fn)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future):
+        with self._lock:
+            self._admitted -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Queue depth and admission counters
+        """
+        with self._lock:
+            return {
+                "running": min(self._admitted, self.max_running),
+                "queued": max(0, self._admitted - self.max_running),
+                "max_running": self.max_running,
+                "max_queued": self.max_queued,
+                "accepted": self.accepted,
+                "rejected": self.rejected
+            }
+
+
+class RefreshRun:
+    """
+    A refresh running on a background thread. Its latest events are kept so every caller that joins the run, early
+    or late, can replay them and then follow along. Only the last max_replay events are kept, since the "refresh"
+    events of new chapters carry their updated rows.
+    """
+    def __init__(self, events: Generator[Dict[str, Any], None, Dict[str, Any]], max_replay: int = REFRESH_REPLAY_EVENTS):
+        self.result: Future = Future() # Resolves to the run summary returned by iter_refresh_events
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_replay)
+        self._produced = 0 # Events produced so far, including those dropped from the replay buffer
+        self._finished = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, args=(events,), daemon=True)
+
+    def start(self):
+        self.result.set_running_or_notify_cancel()
+        self._thread.start()
+
+    def _run(self, events: Generator[Dict[str, Any], None, Dict[str, Any]]):
+        try:
+            while True:
+                try:
+                    event = next(events)
+                except StopIteration as finished:
+                    self.result.set_result(finished.value)
+                    return
+                with self._condition:
+                    self._events.append(event)
+                    self._produced += 1
+                    self._condition.notify_all()
+        except BaseException as e:
+            self.result.set_exception(e)
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    @property
+    def done(self) -> bool:
+        with self._condition:
+            return self._finished
+
+    def subscribe(self) -> Iterator[Dict[str, Any]]:
+        """
+        The buffered events of the run, then every new one, blocking until new events arrive or the run finishes.
+        A subscriber that falls more than max_replay events behind skips the events dropped in the meantime.
+
+        Yields:
+            Dict[str, Any]: Refresh events in the order they were produced
+        """
+        position = 0 # Index of the next event among all events produced
+        while True:
+            with self._condition:
+                while position >= self._produced and not self._finished:
+                    self._condition.wait()
+                if position >= self._produced:
+                    return
+                first = self._produced - len(self._events)
+                position = max(position, first)
+                event = self._events[position - first]
+            position += 1
+            yield event
+
+
+class RefreshCoordinator:
+    """
+    Keeps at most one refresh in flight. A refresh requested while another is running joins it instead of starting
+    a second run against the same websites and database.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[RefreshRun] = None
+        self.started = 0
+        self.joined = 0
+
+    def start_or_join(self, start: Callable[[], Generator[Dict[str, Any], None, Dict[str, Any]]]) -> RefreshRun:
+        """
+        Join the refresh in flight, or start one
+
+        Args:
+            start (Callable[[], Generator]): Creates the refresh, e.g. a call to iter_refresh_events.
+                                             Not called when joining, so the running refresh keeps its own options.
+
+        Returns:
+            RefreshRun: The refresh in flight
+        """
+        with self._lock:
+            if self._current is not None and not self._current.done:
+                self.joined += 1
+                return self._current
+            run = RefreshRun(start())
+            self._current = run
+            self.started += 1
+        # Let go of the finished run so its buffered events are freed, callers still subscribed keep it alive
+        run.result.add_done_callback(lambda _: self._release(run))
+        run.start()
+        return run
+
+    def _release(self, run: RefreshRun):
+        with self._lock:
+            if self._current is run:
+                self._current = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Whether a refresh is in flight and how many requests started or joined one
+        """
+        with self._lock:
+            return {
+                "in_flight": self._current is not None and not self._current.done,
+                "started": self.started,
+                "joined": self.joined
+            }
@@ -0,0 +1,99 @@
+import json
+import select
+import threading
+from typing import Any, Dict
+import psycopg2
+from src.manga_scraper_db import MangaScraperDB
+
+# Channel the write procedures notify on, see database/stored_procs/notify_manga_change.sql
+CHANNEL = "manga_changes"
+RECONNECT_MAX_SECONDS = 30
+
+
+def apply_notification(payload: Dict[str, Any]):
+    """
+    Bring this process's caches up to date with a change committed by any process.
+    The lookup cache is patched in place, whole cached reads are dropped.
+
+    Args:
+        payload (Dict[str, Any]): The notification, with the changed table, the operation and the changed IDs
+    """
+    table, operation = payload.get("table"), payload.get("op")
+    lookup_cache = MangaScraperDB.lookup_cache
+    if table == "website_table" and operation == "insert":
+        lookup_cache.add_website(payload["website_url"], payload["website_id"])
+    elif table == "manga_path_table" and operation == "insert":
+        lookup_cache.add_manga_path(payload["manga_id"], payload["website_id"], payload["manga_path"],
+                                    payload["manga_path_id"])
+    elif table == "manga_table" and operation == "delete":
+        lookup_cache.remove_manga(payload["manga_id"])
+    MangaScraperDB.read_cache.invalidate()
+
+
+class CacheListener(threading.Thread):
+    """
+    Keeps the caches of an API worker coherent with the other workers and the refresh processes.
+    Holds its own connection LISTENing on the change channel and applies each notification as it arrives.
+    The read cache is only enabled while listening: while disconnected changes could be missed, so it is disabled,
+    the lookup cache is cleared and both are rebuilt from the database after reconnecting.
+    """
+    def __init__(self, ms_db: MangaScraperDB, poll_seconds: float = 1):
+        """
+        Args:
+            ms_db (MangaScraperDB): Provides the connection settings of the primary
+            poll_seconds (float): Longest wait for a notification before checking whether to stop
+        """
+        super().__init__(name="cache-listener", daemon=True)
+        self.ms_db = ms_db
+        self.poll_seconds = poll_seconds
+        self.notifications = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Ask the listener to stop, it exits within poll_seconds
+        """
+        self._stop_event.set()
+
+    def run(self):
+        backoff = 1
+        while not self._stop_event.is_set():
+            try:
+                primary, _ = MangaScraperDB.connection_settings(self.ms_db.settings)
+                conn = psycopg2.connect(**primary, connect_timeout=self.ms_db.connect_timeout)
+            except Exception as e:
+                print(f"Cache listener could not connect: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+                continue
+            backoff = 1
+            try:
+                self.listen(conn)
+            except Exception as e:
+                print(f"Cache listener disconnected: {e}")
+            finally:
+                MangaScraperDB.read_cache.set_enabled(False)
+                MangaScraperDB.lookup_cache.clear()
+                conn.close()
+
+    def listen(self, conn):
+        """
+        Subscribe on conn and apply notifications until stopped or the connection fails
+        """
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL};")
+        # Enabled only once subscribed, so no change can fall between a cached read and the subscription
+        MangaScraperDB.read_cache.set_enabled(True)
+        while not self._stop_event.is_set():
+            if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notification = conn.notifies.pop(0)
+                self.notifications += 1
+                try:
+                    apply_notification(json.loads(notification.payload))
+                except (ValueError, KeyError) as e:
+                    print(f"Error applying cache notification {notification.payload}: {e}")
+                    MangaScraperDB.read_cache.invalidate()
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zstandard # Zstandard compression. See: https://github.com/indygreg/python-zstandard
+from typing import Iterator, List, Optional, Tuple
+
+
+class HtmlArchive:
+    """
+    Local store of raw fetched pages so parsed data can be rebuilt after a site changes its markup without
+    scraping again. Page bodies are zstd compressed and content addressed by their SHA-256, so unchanged pages
+    fetched on every refresh are only stored once. A sqlite index records which URL returned which body and when.
+
+    Layout on disk:
+        <root>/index.sqlite3
+        <root>/objects/<first two hex digits>/<remaining hex digits>.zst
+    """
+    def __init__(self, root: str, compression_level: int = 10):
+        """
+        Args:
+            root (str): Directory of the archive, created if missing
+            compression_level (int): zstd compression level used for new objects
+        """
+        self.root = root
+        self.compression_level = compression_level
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        # Scrapers archive from worker threads, sqlite connections are shared behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_index ("
+            "url TEXT NOT NULL, fetched_at REAL NOT NULL, digest TEXT NOT NULL, status_code INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS page_index_url_idx ON page_index (url, fetched_at)")
+        self._conn.commit()
+
+    def object_path(self, digest: str) -> str:
+        """
+        Path of the compressed object for a content digest
+        """
+        return os.path.join(self.root, "objects", digest[:2], f"{digest[2:]}.zst")
+
+    def put(self, url: str, content: bytes, status_code: int = 200) -> str:
+        """
+        Archive a fetched page
+
+        Args:
+            url (str): URL the page was fetched from
+            content (bytes): Raw response body
+            status_code (int): HTTP status code of the response
+
+        Returns:
+            str: SHA-256 digest the body is stored under
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zstandard.ZstdCompressor(level=self.compression_level).compress(content)
+            # Write then rename so readers never see a partially written object
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(temp_path, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO page_index (url, fetched_at, digest, status_code) VALUES (?, ?, ?, ?)",
+                (url, time.time(), digest, status_code)
+            )
+            self._conn.commit()
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read an archived body by its digest
+
+        Args:
+            digest (str): SHA-256 digest returned by put
+
+        Returns:
+            bytes: The decompressed page body
+        """
+        with open(self.object_path(digest), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+
+    def latest(self, url: str, before: Optional[float] = None) -> Optional[Tuple[bytes, int]]:
+        """
+        Most recent archived response for a URL
+
+        Args:
+            url (str): URL of the page
+            before (Optional[float]): Only consider pages fetched before this epoch time
+
+        Returns:
+            Optional[Tuple[bytes, int]]: The page body and its status code, or None if the URL was never archived
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, status_code FROM page_index WHERE url = ? AND fetched_at < ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (url, before if before is not None else float("inf"))
+            ).fetchone()
+        if row is None:
+            return None
+        return self.get(row[0]), row[1]
+
+    def latest_fetched_at(self, url: str) -> Optional[float]:
+        """
+        When the most recent successful response for a URL was fetched
+
+        Args:
+            url (str): URL of the page
+
+        Returns:
+            Optional[float]: Epoch time of the fetch, or None if the URL was never archived with a 200
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(fetched_at) FROM page_index WHERE url = ? AND status_code = 200", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def urls(self) -> List[str]:
+        """
+        Every archived URL
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT url FROM page_index ORDER BY url")]
+
+    def iter_pages(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        Latest archived body of every URL, e.g. as a parsing benchmark corpus
+
+        Yields:
+            Tuple[str, bytes]: The URL and its page body
+        """
+        for url in self.urls():
+            page = self.latest(url)
+            if page is not None:
+                yield url, page[0]
+
+    def close(self):
+        """
+        Close the index connection
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,93 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class LookupCache:
+    """
+    Process-wide in-memory copy of website_table and manga_path_table used to resolve website_id and manga_path_id
+    without a database round trip. The cache is loaded at the start of a run and kept consistent by MangaScraperDB
+    on insert, once the inserting transaction has committed, and on delete. While it is not loaded every lookup
+    goes to the database as before.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.website_ids: Dict[str, str] = {}
+        self.manga_path_ids: Dict[Tuple[str, str, str], str] = {}
+
+    @staticmethod
+    def path_key(manga_id: str, website_id: str, manga_path: str) -> Tuple[str, str, str]:
+        """
+        Key for manga_path_ids. IDs are compared as strings so UUID objects and strings map to the same entry.
+
+        Args:
+            manga_id (str): ID of the manga
+            website_id (str): ID of the website
+            manga_path (str): Path of the manga on the website
+
+        Returns:
+            Tuple[str, str, str]: The cache key
+        """
+        return (str(manga_id), str(website_id), manga_path)
+
+    def load(self, website_ids: Dict[str, str], manga_path_ids: Dict[Tuple[str, str, str], str]):
+        """
+        Replace the cache contents with freshly read tables
+
+        Args:
+            website_ids (Dict[str, str]): website_url to website_id
+            manga_path_ids (Dict[Tuple[str, str, str], str]): (manga_id, website_id, manga_path) to manga_path_id
+        """
+        with self._lock:
+            self.website_ids = website_ids
+            self.manga_path_ids = manga_path_ids
+            self.loaded = True
+
+    def clear(self):
+        """
+        Drop the cache, e.g. while change notifications from other processes may be missed. Lookups fall back to the database.
+        """
+        with self._lock:
+            self.website_ids = {}
+            self.manga_path_ids = {}
+            self.loaded = False
+
+    def get_website_id(self, website_url: str) -> Optional[str]:
+        """
+        Cached website_id for a website URL, or None if it is not cached
+        """
+        with self._lock:
+            return self.website_ids.get(website_url)
+
+    def add_website(self, website_url: str, website_id: str):
+        """
+        Record a newly inserted website
+        """
+        with self._lock:
+            if self.loaded:
+                self.website_ids[website_url] = str(website_id)
+
+    def get_manga_path_id(self, manga_id: str, website_id: str, manga_path: str) -> Optional[str]:
+        """
+        Cached manga_path_id for a manga on a website, or None if it is not cached
+        """
+        with self._lock:
+            return self.manga_path_ids.get(self.path_key(manga_id, website_id, manga_path))
+
+    def add_manga_path(self, manga_id: str, website_id: str, manga_path: str, manga_path_id: str):
+        """
+        Record a newly inserted manga path. Paths without a manga are never looked up successfully, so they are skipped.
+        """
+        with self._lock:
+            if self.loaded and manga_id is not None:
+                self.manga_path_ids[self.path_key(manga_id, website_id, manga_path)] = str(manga_path_id)
+
+    def remove_manga(self, manga_id: str):
+        """
+        Remove every manga path of a deleted manga
+
+        Args:
+            manga_id (str): ID of the deleted manga
+        """
+        with self._lock:
+            self.manga_path_ids = {key: value for key, value in self.manga_path_ids.items() if key[0] != str(manga_id)}
@@ -0,0 +1,56 @@
+import numpy as np
+from rapidfuzz.distance import Jaro # C++ string distances. See: https://github.com/rapidfuzz/RapidFuzz
+from rapidfuzz.process import cdist
+from typing import List, Optional, Tuple
+
+# Names are considered the same manga above this Jaro similarity, matching find_similar_manga
+SIMILARITY_THRESHOLD = 0.85
+
+
+def match_manga_names(incoming: List[str], existing: List[str],
+                      threshold: float = SIMILARITY_THRESHOLD) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+    """
+    Match a batch of incoming manga names against the library and against each other in one pass.
+    A single similarity matrix of incoming x (existing + incoming) names is computed with rapidfuzz, which gives the
+    same Jaro scores as jellyfish.jaro_similarity but runs in C++ across all cores.
+
+    Matching is case-insensitive and uses the same rule as find_similar_manga: the first existing name with a
+    similarity strictly above the threshold wins. Incoming names without a library match are checked against the
+    names before them in the batch, so a batch never adds the same manga twice.
+
+    Args:
+        incoming (List[str]): Names of the manga being added or refreshed
+        existing (List[str]): Names already in the library, in the order they should be preferred
+        threshold (float): Similarity above which two names are the same manga
+
+    Returns:
+        Tuple[List[Optional[int]], List[Optional[int]]]: For each incoming name, the index of the matching existing
+        name, and the index of the earlier incoming name it duplicates when there is no existing match.
+    """
+    if not incoming:
+        return [], []
+
+    incoming_lower = [name.lower() for name in incoming]
+    candidates = [name.lower() for name in existing] + incoming_lower
+    scores = cdist(incoming_lower, candidates, scorer=Jaro.normalized_similarity, dtype=np.float64, workers=-1)
+
+    # jellyfish scores empty strings as 0, rapidfuzz scores two empty strings as 1
+    empty_candidates = np.array([name == "" for name in candidates])
+    empty_incoming = np.array([name == "" for name in incoming_lower])
+    matches = (scores > threshold) & ~empty_candidates[np.newaxis, :] & ~empty_incoming[:, np.newaxis]
+
+    existing_matches = matches[:, :len(existing)]
+    # Only names earlier in the batch count as duplicates, the first occurrence is the one that gets added
+    incoming_matches = np.tril(matches[:, len(existing):], k=-1)
+
+    existing_indexes, duplicate_indexes = [], []
+    for row in range(len(incoming)):
+        existing_hits = np.flatnonzero(existing_matches[row])
+        if existing_hits.size:
+            existing_indexes.append(int(existing_hits[0]))
+            duplicate_indexes.append(None)
+            continue
+        existing_indexes.append(None)
+        duplicate_hits = np.flatnonzero(incoming_matches[row])
+        duplicate_indexes.append(int(duplicate_hits[0]) if duplicate_hits.size else None)
+    return existing_indexes, duplicate_indexes
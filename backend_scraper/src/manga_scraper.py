@@ -1,21 +1,136 @@
 import bs4
+import codecs
 import requests
 import re
 import time
 import jellyfish
-from urllib.parse import urlparse
-from typing import Optional, List, Dict, Union, Any, Tuple
+from datetime import date, datetime, timedelta
+from html.parser import HTMLParser
+from urllib.parse import urlparse, parse_qs
+from typing import Optional, List, Dict, Union, Any, Tuple, Set
+from src.html_archive import HtmlArchive
+
+# A selector is (tag, attribute, value), e.g. ("a", "class", "chapter-name") for a.chapter-name or ("ul", "id", "_listUl")
+Selector = Tuple[str, str, str]
+
+STREAM_CHUNK_SIZE = 16384 # Bytes read from the network between selector checks
+REQUEST_TIMEOUT = (10, 30) # Seconds to connect and between received bytes, so a hanging site cannot stall a run
+LISTING_MAX_PAGES = 50 # Latest-updates pages crawled before a sweep gives up and every series is scraped instead
+LISTING_SLACK = timedelta(days=1) # Listings show dates in the website's time zone, refresh runs are timed by the database
+
+
+class SelectorWatcher(HTMLParser):
+    """
+    Incremental HTML parser that is fed a page as it downloads and reports once every selector has matched an
+    element that has been closed. Class selectors match any of the element's classes, like a CSS selector.
+    """
+    VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self, selectors: Tuple[Selector, ...]):
+        super().__init__(convert_charrefs=False)
+        self.pending = set(selectors)
+        self.open_matches: List[List] = [] # [selector, tag, nesting depth] for matched elements not yet closed
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and not self.open_matches
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        for open_match in self.open_matches:
+            if open_match[1] == tag:
+                open_match[2] += 1
+
+        attributes = dict(attrs)
+        for selector in list(self.pending):
+            selector_tag, attribute, value = selector
+            if tag != selector_tag or attributes.get(attribute) is None:
+                continue
+            attribute_value = attributes[attribute]
+            if (value in attribute_value.split()) if attribute == "class" else (attribute_value == value):
+                self.pending.discard(selector)
+                if tag not in self.VOID_ELEMENTS:
+                    self.open_matches.append([selector, tag, 1])
+
+    def handle_endtag(self, tag: str):
+        for open_match in self.open_matches:
+            if open_match[1] == tag:
+                open_match[2] -= 1
+        self.open_matches = [open_match for open_match in self.open_matches if open_match[2] > 0]
+
 
 class MangaScraper:
-    def __init__(self, manga_list: List[dict]):
+    # Elements create_record needs from a manga page. Downloads stop once all of them have been parsed.
+    record_selectors: Tuple[Selector, ...] = ()
+
+    def __init__(self, manga_list: List[dict], archive: Optional[HtmlArchive] = None, offline: bool = False):
         """
         Initializes the MangaScraper with a list of manga.
 
         Args:
             manga_list (List[dict]): List of manga with their details.
+            archive (Optional[HtmlArchive]): Archive every fetched page is stored in
+            offline (bool): Read pages from the archive instead of the network, used to re-parse archived pages
         """
         self.manga_list = manga_list
         self.soup: Optional[bs4.BeautifulSoup] = None
+        self.archive = archive
+        self.offline = offline
+        # Last page fetched with a 200 as (url, selectors it was read up to or None if read in full, soup, status code)
+        self._page_cache: Optional[Tuple[str, Optional[Tuple[Selector, ...]], Optional[bs4.BeautifulSoup], int]] = None
+
+    def fetch_soup(self, url: str, stop_selectors: Tuple[Selector, ...] = ()) -> Tuple[Optional[bs4.BeautifulSoup], int]:
+        """
+        Fetch and parse a page, streaming the body and stopping as soon as every stop selector has been parsed.
+        Without stop selectors, or when they never all match, the whole page is read.
+        The last page is kept so the several extract methods used by create_record share a single download.
+        Failed responses are not kept, so a transient error such as a 429 is retried by the next extract method.
+        When archiving, pages are always read in full so a later re-parse sees the whole page.
+        Offline, pages come from the archive and URLs that were never archived are reported as 404.
+
+        Args:
+            url (str): URL of the page
+            stop_selectors (Tuple[Selector, ...]): Elements that must be complete before the download can stop
+
+        Returns:
+            Tuple[Optional[bs4.BeautifulSoup], int]: The parsed page (None if the request failed) and the status code
+        """
+        if self._page_cache is not None:
+            cached_url, cached_selectors, cached_soup, cached_status = self._page_cache
+            if cached_url == url and (cached_selectors is None or set(stop_selectors) <= set(cached_selectors)):
+                return cached_soup, cached_status
+
+        if self.offline:
+            page = self.archive.latest(url) if self.archive is not None else None
+            content, status_code = page if page is not None else (None, 404)
+            soup = bs4.BeautifulSoup(content, 'html.parser') if status_code == 200 else None
+            if status_code == 200:
+                self._page_cache = (url, None, soup, status_code)
+            return soup, status_code
+
+        if self.archive is not None:
+            stop_selectors = ()
+
+        with requests.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                return None, response.status_code
+
+            watcher = SelectorWatcher(stop_selectors) if stop_selectors else None
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            chunks = []
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                if watcher is not None:
+                    watcher.feed(decoder.decode(chunk))
+                    if watcher.done:
+                        break
+            complete = watcher is None or not watcher.done
+
+        content = b"".join(chunks)
+        if self.archive is not None:
+            self.archive.put(url, content, response.status_code)
+        soup = bs4.BeautifulSoup(content, 'html.parser')
+        self._page_cache = (url, None if complete else tuple(stop_selectors), soup, response.status_code)
+        return soup, response.status_code
 
     def scrape_manga(self, website_name: str, manga_name: str) -> Tuple[Optional[str], Optional[str], str]:
         """
@@ -30,14 +145,13 @@ class MangaScraper:
         """
         website_url, manga_url = self.get_urls(website_name, manga_name)
         complete_url = self.normalize_url(website_url + manga_url)
-        response = requests.get(complete_url)
+        soup, status_code = self.fetch_soup(complete_url)
 
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
+        if status_code == 200:
             self.soup = soup
             return self.parse_html(soup, website_url, complete_url)
         else:
-            return None, None, f'Failed to retrieve webpage, status code: {response.status_code}'
+            return None, None, f'Failed to retrieve webpage, status code: {status_code}'
 
     def get_urls(self, website_name:str, manga_name:str) -> Tuple[str, str]:
         """
@@ -141,9 +255,8 @@ class MangaScraper:
         Returns:
             str: the image tag as a str or error strings
         """
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
+        soup, status_code = self.fetch_soup(url, (("div", "class", "story-info-left"),))
+        if status_code == 200:
             # Navigate to the div with the class 'story-info-left'
             div_tag = soup.find('div', class_='story-info-left')
             if div_tag:
@@ -156,9 +269,46 @@ class MangaScraper:
             else:
                 return "Div with specified class not found"
         else:
-            return f"Failed to retrieve webpage, status code: {response.status_code}"
+            return f"Failed to retrieve webpage, status code: {status_code}"
     
 
+    def get_updated_keys(self, since: Optional[datetime]) -> Optional[Set[str]]:
+        """
+        Crawl the website's latest-updates listing and return the listing keys of every series updated since a time.
+        Websites without a listing return None, which means every series has to be scraped individually.
+
+        Args:
+            since (Optional[datetime]): Start of the last completed refresh. None if unknown, which needs a full scrape.
+
+        Returns:
+            Optional[Set[str]]: Listing keys of the updated series, or None if the listing cannot cover the whole period
+        """
+        return None
+
+    def listing_key(self, url: str) -> str:
+        """
+        Key that identifies a series on both its manga page URL and the latest-updates listing.
+
+        Args:
+            url (str): Manga page URL or manga path
+
+        Returns:
+            str: The listing key
+        """
+        return urlparse(url).path.rstrip('/')
+
+    def extract_genres(self, url: str) -> List[str]:
+        """
+        Genres of a manga. Websites without genre information return an empty list.
+
+        Args:
+            url (str): The URL of the manga page.
+
+        Returns:
+            List[str]: The genres, e.g. ["Action", "Fantasy"]
+        """
+        return []
+
     def create_record(self,url:str) -> Dict:
         """
         Method to create the dataset required for database insertion
@@ -234,8 +384,11 @@ class TcbScansScraper(MangaScraper):
     
         
 class MangaKakalotScraper(MangaScraper):
-    def __init__(self, manga_list: List[dict]):
-        super().__init__(manga_list)
+    # Story info (thumbnail, name and genres) comes before the chapter list on the page
+    record_selectors = (("div", "class", "story-info-left"), ("div", "class", "story-info-right"), ("a", "class", "chapter-name"))
+
+    def __init__(self, manga_list: List[dict], archive: Optional[HtmlArchive] = None, offline: bool = False):
+        super().__init__(manga_list, archive=archive, offline=offline)
         self.base_url = "https://manganato.com/"
 
     def parse_html(self, soup: bs4.BeautifulSoup, base_url: str, complete_url: str) -> Tuple[Optional[str], Optional[str], str]:
@@ -288,6 +441,92 @@ class MangaKakalotScraper(MangaScraper):
 
         return {"genres": []}
     
+    def get_updated_keys(self, since: Optional[datetime], max_pages: int = LISTING_MAX_PAGES) -> Optional[Set[str]]:
+        """
+        Crawl the manganato latest-updates listing, which lists series in order of their last update, page by page
+        until it reaches series last updated before since.
+
+        Args:
+            since (Optional[datetime]): Start of the last completed refresh. None if unknown, which needs a full scrape.
+            max_pages (int): Listing pages crawled at most. Each page covers a few dozen series.
+
+        Returns:
+            Optional[Set[str]]: Listing keys of the series updated since then, or None if the listing could not be read
+                                or goes back further than max_pages
+        """
+        if since is None:
+            return None
+        cutoff = (since - LISTING_SLACK).date()
+        updated_keys = set()
+        for page in range(1, max_pages + 1):
+            soup, status_code = self.fetch_soup(f"{self.base_url}genre-all/{page}")
+            if status_code != 200:
+                return None
+            items = soup.find_all('div', class_='content-genres-item')
+            if not items:
+                # Past the end of the listing, every series is on it
+                return updated_keys if page > 1 else None
+            for item in items:
+                updated_at = self.listing_date(item)
+                if updated_at is None:
+                    return None
+                if updated_at < cutoff:
+                    return updated_keys
+                link = item.find('a', href=True)
+                if link:
+                    updated_keys.add(self.listing_key(link['href']))
+        return None
+
+    @staticmethod
+    def listing_date(item: bs4.element.Tag) -> Optional[date]:
+        """
+        Date of the last update of a latest-updates listing entry, shown as e.g. "Nov 22,23" or "2 hours ago"
+
+        Args:
+            item (bs4.element.Tag): The div.content-genres-item of the series
+
+        Returns:
+            Optional[date]: The date, or None if the entry has no date that can be read
+        """
+        time_tag = item.find('span', class_='genres-item-time')
+        if time_tag is None:
+            return None
+        text = time_tag.get_text(strip=True)
+        if text.endswith("ago"):
+            return date.today()
+        try:
+            return datetime.strptime(text, "%b %d,%y").date()
+        except ValueError:
+            return None
+
+    def listing_key(self, url: str) -> str:
+        """
+        The manga id at the end of the path, e.g. "manga-gv952204". Manganato serves the same series from several
+        domains, so the domain is ignored.
+
+        Args:
+            url (str): Manga page URL or manga path
+
+        Returns:
+            str: The listing key
+        """
+        return urlparse(url).path.rstrip('/').split('/')[-1]
+
+    def extract_genres(self, url: str) -> List[str]:
+        """
+        Genres listed in the story info of the manga page. The page is the one create_record has already fetched.
+
+        Args:
+            url (str): The URL of the manga page.
+
+        Returns:
+            List[str]: The genres, or an empty list if the page could not be read
+        """
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
+        if status_code != 200:
+            return []
+        return [genre.strip() for genre in self.get_genres(soup)["genres"] if genre.strip()]
+
     def find_manga_link(self, search_query:str) -> Optional[str]:
         """
         Find the manga link with a title matching the query_string in the provided BeautifulSoup object.
@@ -300,10 +539,10 @@ class MangaKakalotScraper(MangaScraper):
         """
         search_query_link = search_query.strip().replace(" ", "_")
         search_string = f"https://chapmanganato.to/https://manganato.com/search/story/{search_query_link}"
-        response = requests.get(search_string)
+        soup, status_code = self.fetch_soup(search_string)
 
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
+        if status_code != 200:
+            return None
 
         item_right = soup.find('div', class_='item-right')
         if item_right:
@@ -325,10 +564,9 @@ class MangaKakalotScraper(MangaScraper):
         Returns:
             str: Name of website or error
         """
-        response = requests.get(url)
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
 
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
+        if status_code == 200:
         # Regular expression to extract the part after the last '/'
             story_info_right_div = soup.find('div', class_='story-info-right')
             if story_info_right_div:
@@ -368,10 +606,9 @@ class MangaKakalotScraper(MangaScraper):
         Returns:
             tuple(tuple, str): Returns a tuple of various parsed objects and a status code
         """
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
-            return self.parse_html(soup, self.base_url, url), response.status_code
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
+        if status_code == 200:
+            return self.parse_html(soup, self.base_url, url), status_code
     
     ##TODO: Page number on viz is rendered dynamically through JS which can't be fetched with bs4 or requests
     def extract_chapter_length(self, url: str) -> Union[int, str]:
@@ -414,11 +651,10 @@ class MangaKakalotScraper(MangaScraper):
             str: The URL of the latest chapter, or None if not found or an error occurred.
         """
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            html_content = response.text
+            soup, status_code = self.fetch_soup(url, self.record_selectors)
+            if status_code != 200:
+                raise requests.HTTPError(f"{status_code} Error for url: {url}")  # Raise an exception for HTTP errors
 
-            soup = bs4.BeautifulSoup(html_content, 'html.parser')
             ul = soup.find('ul', class_='row-content-chapter')
             first_link = ul.find('a', class_='chapter-name') if ul else None
             return first_link.get('href') if first_link else None
@@ -447,7 +683,8 @@ class MangaKakalotScraper(MangaScraper):
             "chapter_url_status":response_code,
             "manga_thumbnail_url": self.extract_thumbnail(url),
             "website_url": base_url,
-            "chapter_number": parse_html_obj[2]
+            "chapter_number": parse_html_obj[2],
+            "genres": self.extract_genres(url)
         }
         return record
 
@@ -494,8 +731,11 @@ class MangaDemonScraper(MangaScraper):
         return super().create_record(url)
     
 class vizScraper(MangaScraper):
-    def __init__(self, manga_list: List[dict]):
-        super().__init__(manga_list)
+    # The hero image comes before the chapter rows on the page
+    record_selectors = (("img", "class", "o_hero-media"), ("div", "id", "chpt_rows"))
+
+    def __init__(self, manga_list: List[dict], archive: Optional[HtmlArchive] = None, offline: bool = False):
+        super().__init__(manga_list, archive=archive, offline=offline)
         self.base_url = "https://www.viz.com/"
 
     def parse_html(self, soup: bs4.BeautifulSoup, base_url: str, complete_url: str) -> Tuple[str | None, str | None, str]:
@@ -574,10 +814,9 @@ class vizScraper(MangaScraper):
         Returns:
             Tuple: A tuple containing the result of parse_html and the HTTP response status code.
         """
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
-            return self.parse_html(soup, self.base_url, url), response.status_code
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
+        if status_code == 200:
+            return self.parse_html(soup, self.base_url, url), status_code
 
     ## TODO: Page number on viz is rendered dynamically through JS, which can't be fetched with bs4 or requests
     def extract_chapter_length(self, url: str) -> int:
@@ -629,7 +868,8 @@ class vizScraper(MangaScraper):
             "chapter_url_status": response_code,
             "manga_thumbnail_url": self.extract_thumbnail(url),
             "website_url": self.get_base_url(parse_html_obj[0]),
-            "chapter_number": self.get_chapter_number(parse_html_obj[0])
+            "chapter_number": self.get_chapter_number(parse_html_obj[0]),
+            "genres": self.extract_genres(url)
         }
         return record
     
@@ -659,21 +899,22 @@ class vizScraper(MangaScraper):
         Returns:
             str: The URL of the manga thumbnail if found, otherwise an error message.
         """
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
+        if status_code == 200:
             image_tag = soup.find('img', class_='o_hero-media')
             if 'src' in image_tag.attrs.keys():
                 return image_tag.attrs['src']
             else:
                 return "Image or src attribute not found"
         else:
-            return f"Failed to retrieve webpage, status code: {response.status_code}"
+            return f"Failed to retrieve webpage, status code: {status_code}"
 
 
 class webtoonScraper(MangaScraper):
-    def __init__(self, manga_list: List[dict]):
-        super().__init__(manga_list)
+    record_selectors = (("ul", "id", "_listUl"),)
+
+    def __init__(self, manga_list: List[dict], archive: Optional[HtmlArchive] = None, offline: bool = False):
+        super().__init__(manga_list, archive=archive, offline=offline)
         self.base_url = "https://www.webtoons.com/"
 
     def parse_html(self, soup: bs4.BeautifulSoup, base_url: str, complete_url: str) -> Tuple[str | None, str | None, str]:
@@ -700,6 +941,68 @@ class webtoonScraper(MangaScraper):
         else:
             return None, None, 'Ul with id "_listUl" not found'
         
+    def get_updated_keys(self, since: Optional[datetime]) -> Optional[Set[str]]:
+        """
+        Read the webtoons daily schedule and return the series published on every weekday since a time.
+        Webtoons originals update on fixed weekdays, so these are the series that may have a new episode.
+
+        Args:
+            since (Optional[datetime]): Start of the last completed refresh. None if unknown, which needs a full scrape.
+
+        Returns:
+            Optional[Set[str]]: Listing keys of the scheduled series, or None if the schedule could not be read or the
+                                period covers a whole week, which needs a full scrape
+        """
+        if since is None:
+            return None
+        days_back = (datetime.now() - since + LISTING_SLACK).days
+        if days_back >= 6:
+            return None
+        soup, status_code = self.fetch_soup(f"{self.base_url}en/dailySchedule")
+        if status_code != 200:
+            return None
+
+        weekdays = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+        today = time.localtime().tm_wday
+        updated_keys = set()
+        for offset in range(days_back + 1):
+            section = soup.find('div', class_=f"_list_{weekdays[(today - offset) % 7]}")
+            if section is None:
+                return None
+            for link in section.find_all('a', href=True):
+                key = self.listing_key(link['href'])
+                if key:
+                    updated_keys.add(key)
+        return updated_keys
+
+    def listing_key(self, url: str) -> str:
+        """
+        The title_no query parameter, which identifies a series regardless of language or genre in the path.
+
+        Args:
+            url (str): Manga page URL or manga path
+
+        Returns:
+            str: The listing key, or an empty string if the URL has no title_no
+        """
+        return parse_qs(urlparse(url).query).get("title_no", [""])[0]
+
+    def extract_genres(self, url: str) -> List[str]:
+        """
+        The genre is part of every series URL, e.g. /en/slice-of-life/<series>/list?title_no=1 is "Slice of life",
+        matching how MangaKakalot names its genres. No page needs to be fetched.
+
+        Args:
+            url (str): The URL of the manga page.
+
+        Returns:
+            List[str]: The genre, or an empty list if the URL has no genre segment
+        """
+        segments = [segment for segment in urlparse(url).path.split('/') if segment]
+        if len(segments) < 3:
+            return []
+        return [segments[1].replace('-', ' ').capitalize()]
+
     def extract_name(self, url:str) -> str:
         """
         Extracts the manga name from the URL.
@@ -749,11 +1052,23 @@ class webtoonScraper(MangaScraper):
         Returns:
             Tuple: A tuple containing the result of parse_html and the HTTP response status code.
         """
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.content, 'html.parser')
-            return self.parse_html(soup, self.base_url, url), response.status_code
+        soup, status_code = self.fetch_soup(url, self.record_selectors)
+        if status_code == 200:
+            return self.parse_html(soup, self.base_url, url), status_code
     
+    def extract_thumbnail(self, url: str) -> str:
+        """
+        Webtoons pages have no 'story-info-left' div, the thumbnail is looked up on MangaKakalot by the service instead.
+        Returns the same result as the base method without downloading the page again.
+
+        Args:
+            url (str): The URL of the manga page.
+
+        Returns:
+            str: Message indicating the thumbnail was not found on the page.
+        """
+        return "Div with specified class not found"
+
     def extract_chapter_length(self, url: str) -> int:
         """
         Leave empty for now
@@ -788,7 +1103,8 @@ class webtoonScraper(MangaScraper):
             "chapter_url_status":response_code,
             "manga_thumbnail_url": self.extract_thumbnail(url),
             "website_url": self.get_base_url(parse_html_obj[0]),
-            "chapter_number": self.get_chapter_number(parse_html_obj[0])
+            "chapter_number": self.get_chapter_number(parse_html_obj[0]),
+            "genres": self.extract_genres(url)
         }
         return record
     
@@ -2,31 +2,369 @@ import psycopg2
 import uuid
 import json
 import re
-import jellyfish # For string distance matching. See: https://github.com/jamesturk/jellyfish
 import os
+import time
 from psycopg2 import OperationalError
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
+from src.manga_matcher import match_manga_names
+from src.lookup_cache import LookupCache
+from src.read_cache import ReadCache
+
+# Number of indexed search results checked when looking for a similar manga across alternate names
+SIMILAR_MANGA_CANDIDATES = 50
+# Seconds a replica's measured lag is trusted before it is checked again
+REPLICA_LAG_CHECK_SECONDS = 1.0
+# Seconds a replica that could not be reached is skipped before connecting to it is tried again
+REPLICA_RETRY_SECONDS = 30
+# Replication lag of a standby in seconds, 0 when it has replayed everything it received
+REPLICA_LAG_QUERY = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+# Payload of get_bootstrap_json when the database cannot be read
+EMPTY_BOOTSTRAP_DATA = {"manga_data": [], "bookmarks_data": [], "supported_websites": [], "genres": []}
+# Unfinished inline refresh runs older than this are not resumed, see start_refresh_run
+RESUMABLE_RUN_MAX_AGE_SECONDS = 6 * 3600
+
+
+class WriteFailed(Exception):
+    """
+    Raised inside MangaScraperDB.savepoint when one of a group of writes failed, so the whole group is undone
+    """
 
 
 class MangaScraperDB:
     """
     Class that connects and performs insertions to the database hosted on PostgreSQL
     """
-    def __init__(self):
-        try:
+    # Shared by every instance in the process so inserts and deletes on one connection keep the others consistent
+    lookup_cache = LookupCache()
+    # Whole read results served by the API, see AsyncMangaScraperDB. Kept coherent across processes by the cache listener.
+    read_cache = ReadCache()
+    # time.monotonic() until which each unreachable replica, by host and port, is skipped. Shared with
+    # AsyncMangaScraperDB, so while a replica is down reads do not each wait up to connect_timeout for it.
+    replica_retry_at: Dict[Tuple[str, int], float] = {}
+
+    _conn = None
+    _replica_conn = None
+    _replica = None
+    _settings = None
+    _replica_lag_checked_at = float("-inf")
+    _replica_lag_ok = False
+
+    def __init__(self, connect_timeout: int = 10):
+        """
+        The connection is only opened on first use, so constructing this class never touches the database.
+
+        Args:
+            connect_timeout (int): Seconds to wait for the database when connecting
+        """
+        self._in_transaction = False
+        # Lookup cache entries for rows inserted by the open transaction, shared once it commits
+        self._pending_website_ids: Dict[str, str] = {}
+        self._pending_manga_path_ids: Dict[Tuple[str, str, str], str] = {}
+        self.connect_timeout = connect_timeout
+        # time.monotonic() of this instance's last committed write. Its reads within read_your_writes_seconds
+        # of it go to the primary, writes by other instances and processes do not change where it reads from.
+        self._last_write_at = float("-inf")
+        self._replica_lag_checked_at = float("-inf")
+        self._replica_lag_ok = False
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """
+        Connection settings read from src/secrets/db_config.json on first use. Besides host, database, user and
+        password (and optionally port) of the primary, the file may list read replicas:
+            "replicas": [{"host": "replica1", "port": 5433}, ...] Each entry overrides the primary's settings
+            "replica_max_lag_seconds": 5 Replicas further behind than this are not read from
+            "read_your_writes_seconds": 10 Reads this soon after a write by the same client use the primary
+        """
+        if self._settings is None:
             creds_path = os.path.join(os.getcwd(),"src/secrets/db_config.json")
-            credentials = self.read_db_credentials(creds_path) ## To change into environ reading
-            self.conn = psycopg2.connect(
-                host= credentials["host"],
-                database= credentials["database"],
-                user= credentials["user"],
-                password= credentials["password"]
-            )
+            self._settings = self.read_db_credentials(creds_path) ## To change into environ reading
+        return self._settings
+
+    @staticmethod
+    def connection_settings(settings: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Split the db_config.json settings into connection parameters for the primary and for each replica
+
+        Args:
+            settings (Dict[str, Any]): Contents of db_config.json
+
+        Returns:
+            Tuple[Dict[str, Any], List[Dict[str, Any]]]: host, port, database, user and password of the primary
+                                                         and of each replica
+        """
+        primary = {
+            "host": settings["host"],
+            "port": settings.get("port", 5432),
+            "database": settings["database"],
+            "user": settings["user"],
+            "password": settings["password"]
+        }
+        replicas = [dict(primary, **replica) for replica in settings.get("replicas", [])]
+        return primary, replicas
+
+    def _connect(self, parameters: Dict[str, Any]):
+        try:
+            return psycopg2.connect(**parameters, connect_timeout= self.connect_timeout)
         except OperationalError as e:
             print(f"Error connecting to PostgreSQL database: {e}")
-        except (FileNotFoundError, KeyError) as e:
-            print(f"Error reading database configuration: {e}")
+            raise
+
+    @property
+    def conn(self):
+        """
+        Connection to the primary PostgreSQL database, opened on first use and reopened if it was closed.
+        Errors are raised so the calling method reports them and the next call tries again.
+
+        Returns:
+            psycopg2.extensions.connection: The open connection
+        """
+        if self._conn is None or self._conn.closed:
+            try:
+                primary, _ = self.connection_settings(self.settings)
+            except (FileNotFoundError, KeyError) as e:
+                print(f"Error reading database configuration: {e}")
+                raise
+            self._conn = self._connect(primary)
+        return self._conn
+
+    def mark_write(self):
+        """
+        Record that this instance just committed a write, starting its read-your-writes window.
+        Cached reads are dropped straight away rather than when the change notification arrives.
+        """
+        self._last_write_at = time.monotonic()
+        self.read_cache.invalidate()
+
+    def recently_written(self, window_seconds: float) -> bool:
+        """
+        Whether this instance committed a write in the last window_seconds
+        """
+        return time.monotonic() - self._last_write_at < window_seconds
+
+    @property
+    def read_conn(self):
+        """
+        Connection for read-only queries. A replica when one is configured, reachable and within
+        replica_max_lag_seconds of the primary, otherwise the primary. Inside a transaction, and right after
+        a write by this instance, reads always use the primary.
+
+        Returns:
+            psycopg2.extensions.connection: The connection to read from
+        """
+        settings = self.settings
+        if (not settings.get("replicas") or self._in_transaction
+                or self.recently_written(settings.get("read_your_writes_seconds", 10))):
+            return self.conn
+        replica = self._get_replica_conn()
+        if replica is None:
+            return self.conn
+
+        now = time.monotonic()
+        if now - self._replica_lag_checked_at >= REPLICA_LAG_CHECK_SECONDS:
+            try:
+                with replica.cursor() as cur:
+                    cur.execute(REPLICA_LAG_QUERY)
+                    lag = float(cur.fetchone()[0])
+                self._replica_lag_ok = lag <= settings.get("replica_max_lag_seconds", 5)
+            except Exception as e:
+                print(f"Error checking replica lag: {e}")
+                replica.close()
+                if self._replica is not None:
+                    self.replica_unreachable(self._replica)
+                self._replica_lag_ok = False
+            self._replica_lag_checked_at = now
+        return replica if self._replica_lag_ok else self.conn
+
+    def _get_replica_conn(self):
+        """
+        Open replica connection, connecting to the first reachable replica if there is none.
+        Replicas that failed recently are skipped, see replica_retry_at.
+        Replica connections autocommit so reads never hold a transaction open on the standby.
+
+        Returns:
+            Optional[psycopg2.extensions.connection]: The replica connection, or None if no replica is reachable
+        """
+        if self._replica_conn is not None and not self._replica_conn.closed:
+            return self._replica_conn
+        _, replicas = self.connection_settings(self.settings)
+        for replica in self.reachable_replicas(replicas):
+            try:
+                self._replica_conn = self._connect(replica)
+                self._replica_conn.autocommit = True
+                self._replica = replica
+                self._replica_lag_checked_at = float("-inf")
+                return self._replica_conn
+            except OperationalError:
+                self.replica_unreachable(replica)
+        return None
+
+    @staticmethod
+    def reachable_replicas(replicas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        The replicas worth connecting to, i.e. all but those that failed in the last REPLICA_RETRY_SECONDS
+
+        Args:
+            replicas (List[Dict[str, Any]]): Connection parameters of each replica, see connection_settings
+
+        Returns:
+            List[Dict[str, Any]]: The replicas not backing off, in their configured order
+        """
+        now = time.monotonic()
+        return [replica for replica in replicas
+                if MangaScraperDB.replica_retry_at.get((replica["host"], replica["port"]), float("-inf")) <= now]
+
+    @staticmethod
+    def replica_unreachable(replica: Dict[str, Any]):
+        """
+        Skip a replica that could not be connected to or queried for the next REPLICA_RETRY_SECONDS
+        """
+        MangaScraperDB.replica_retry_at[(replica["host"], replica["port"])] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    @contextmanager
+    def transaction(self) -> Iterator["MangaScraperDB"]:
+        """
+        Group several writes into a single transaction that is committed once on exit.
+        Each write and each read on the primary is isolated by a savepoint so one failed statement does not
+        discard the rest of the batch. Should the transaction still be aborted, it is rolled back and an error
+        is raised rather than letting the commit silently discard the batch.
+
+        Yields:
+            MangaScraperDB: This instance, with per-write commits deferred until the block exits.
+        """
+        self._in_transaction = True
+        try:
+            yield self
+            if self.conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                raise psycopg2.InternalError("Transaction was aborted by a failed statement, nothing was committed")
+            self.conn.commit()
+            self.mark_write()
+            self._publish_pending_lookups()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            # Entries of rolled back inserts were never shared, so only they are dropped
+            self._pending_website_ids, self._pending_manga_path_ids = {}, {}
+            self._in_transaction = False
+
+    @contextmanager
+    def savepoint(self) -> Iterator["MangaScraperDB"]:
+        """
+        Keep or undo several writes together, e.g. every row of a new manga. Inside a transaction block the
+        writes are undone to a savepoint if the block raises, the rest of the transaction stays pending.
+        Outside of one the block runs in its own transaction. Raise WriteFailed when a write returns a failure.
+
+        Yields:
+            MangaScraperDB: This instance
+        """
+        if not self._in_transaction:
+            with self.transaction():
+                yield self
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("SAVEPOINT manga_record")
+        pending = dict(self._pending_website_ids), dict(self._pending_manga_path_ids)
+        try:
+            yield self
+        except Exception:
+            with self.conn.cursor() as cur:
+                cur.execute("ROLLBACK TO SAVEPOINT manga_record; RELEASE SAVEPOINT manga_record")
+            # Forget the lookups of the undone inserts, the rest of the transaction keeps its own
+            self._pending_website_ids, self._pending_manga_path_ids = pending
+            raise
+        with self.conn.cursor() as cur:
+            cur.execute("RELEASE SAVEPOINT manga_record")
+
+    def _cache_website_id(self, website_url: str, website_id: str):
+        """
+        Add a website to the lookup cache. Inside a transaction block it is kept pending until the commit,
+        so other threads never resolve an ID the transaction may still roll back.
+        """
+        if self._in_transaction:
+            self._pending_website_ids[website_url] = str(website_id)
+        else:
+            self.lookup_cache.add_website(website_url, website_id)
+
+    def _cache_manga_path_id(self, manga_id: str, website_id: str, manga_path: str, manga_path_id: str):
+        """
+        Add a manga path to the lookup cache, kept pending until the commit inside a transaction block
+        """
+        if self._in_transaction:
+            if manga_id is not None:
+                self._pending_manga_path_ids[LookupCache.path_key(manga_id, website_id, manga_path)] = str(manga_path_id)
+        else:
+            self.lookup_cache.add_manga_path(manga_id, website_id, manga_path, manga_path_id)
+
+    def _publish_pending_lookups(self):
+        """
+        Share the lookup cache entries of a committed transaction
+        """
+        for website_url, website_id in self._pending_website_ids.items():
+            self.lookup_cache.add_website(website_url, website_id)
+        for (manga_id, website_id, manga_path), manga_path_id in self._pending_manga_path_ids.items():
+            self.lookup_cache.add_manga_path(manga_id, website_id, manga_path, manga_path_id)
+
+    def _execute_write(self, label: str, query: str, params: tuple) -> bool:
+        """
+        Execute a single write statement. Outside of a transaction block the write is committed straight away,
+        inside one it is wrapped in a savepoint in the same round trip.
+
+        Args:
+            label (str): Name of the calling method used in error messages
+            query (str): SQL statement to run
+            params (tuple): Parameters for the statement
+
+        Returns:
+            bool: True if the write succeeded
+        """
+        try:
+            with self.conn.cursor() as cur:
+                if self._in_transaction:
+                    cur.execute(f"SAVEPOINT manga_write; {query}; RELEASE SAVEPOINT manga_write", params)
+                else:
+                    cur.execute(query, params)
+                    self.conn.commit()
+                    self.mark_write()
+            return True
+        except Exception as e:
+            print(f"Error in {label}: {e}")
+            if self._in_transaction:
+                # Only undo the failed statement, the rest of the batch stays pending
+                if self.conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                    with self.conn.cursor() as cur:
+                        cur.execute("ROLLBACK TO SAVEPOINT manga_write; RELEASE SAVEPOINT manga_write")
+            else:
+                self.conn.rollback()
+            return False
+
+    @contextmanager
+    def _read_cursor(self) -> Iterator[psycopg2.extensions.cursor]:
+        """
+        Cursor for a read on the primary. Inside a transaction block the read is wrapped in a savepoint,
+        so a failed read is undone on its own instead of aborting the writes pending in the transaction.
+        Errors are raised for the calling method to report.
+
+        Yields:
+            psycopg2.extensions.cursor: Cursor on the primary connection
+        """
+        with self.conn.cursor() as cur:
+            if not self._in_transaction:
+                yield cur
+                return
+            cur.execute("SAVEPOINT manga_read")
+            try:
+                yield cur
+            except Exception:
+                if self.conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                    cur.execute("ROLLBACK TO SAVEPOINT manga_read; RELEASE SAVEPOINT manga_read")
+                raise
+            cur.execute("RELEASE SAVEPOINT manga_read")
 
     @staticmethod
     def read_db_credentials(filename:str):
@@ -68,22 +406,22 @@ class MangaScraperDB:
         Args:
             website_url (str): Url of the website
             website_status (str): Status code of the website
+
+        Returns:
+            Optional[str]: ID of the inserted website, None if the insert failed
         """
         website_id = str(uuid.uuid4())
         website_name = self.extract_website_name(website_url)
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_website(%s, %s, %s, %s, %s)",
-                            (website_id, 
-                             website_name,
-                             website_url, 
-                             website_status, 
-                             datetime.now()))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_website: {e}")
-            self.conn.rollback()
-        return website_id 
+        if self._execute_write("insert_website",
+                               "CALL insert_website(%s, %s, %s, %s, %s)",
+                               (website_id, 
+                                website_name,
+                                website_url, 
+                                website_status, 
+                                datetime.now())):
+            self._cache_website_id(website_url, website_id)
+            return website_id
+        return None
 
     def insert_manga(self, manga_name:str):
         """
@@ -91,22 +429,22 @@ class MangaScraperDB:
 
         Args:
             manga_name (str): Name of manga to be inserted
+
+        Returns:
+            Optional[str]: ID of the inserted manga, None if the insert failed
         """
         manga_id = str(uuid.uuid4())
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga(%s, %s)", 
-                            (manga_id, 
-                             manga_name))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_manga: {e}")
-            self.conn.rollback()
-        return manga_id
+        if self._execute_write("insert_manga",
+                               "CALL insert_manga(%s, %s)", 
+                               (manga_id, 
+                                manga_name)):
+            return manga_id
+        return None
 
     def find_similar_manga(self, manga_name: str) -> str:
         """
-        Find a manga in the database with a similar name.
+        Find a manga in the database with a similar name or alternate name. Candidates come from the search_manga
+        trigram index instead of a scan of the whole manga table, and are matched with the same Jaro rule.
 
         Args:
             manga_name (str): Name of the manga to search for.
@@ -115,18 +453,53 @@ class MangaScraperDB:
             str: The manga_id of a similar manga or None if no match is found.
         """
         try:
-            with self.conn.cursor() as cur:
-                cur.execute("SELECT manga_id, manga_name FROM manga_table") # TODO: Best to run this as a stored proc instead
-                for row in cur.fetchall():
-                    existing_manga_id, existing_manga_name = row
-                    similarity = jellyfish.jaro_similarity(manga_name.lower(), existing_manga_name.lower())
-                    if similarity > 0.85:
-                        return existing_manga_id
-                return None
+            # Read from the primary so a manga inserted just before is found
+            with self._read_cursor() as cur:
+                cur.execute("SELECT * FROM search_manga(%s, %s, %s)", (manga_name, SIMILAR_MANGA_CANDIDATES, 0))
+                candidates = cur.fetchall()
         except Exception as e:
             print(f"Error in find_similar_manga: {e}")
             return None
 
+        existing_indexes, _ = match_manga_names([manga_name], [row[2] or "" for row in candidates])
+        return candidates[existing_indexes[0]][0] if existing_indexes[0] is not None else None
+
+    def find_similar_manga_batch(self, manga_names: List[str]) -> List[Optional[str]]:
+        """
+        Find similar manga for several names at once, reading the manga table a single time.
+        Uses the same Jaro rule as find_similar_manga, against the manga names only.
+
+        Args:
+            manga_names (List[str]): Names of the manga to search for.
+
+        Returns:
+            List[Optional[str]]: The manga_id of a similar manga for each name, or None where no match is found.
+        """
+        return self.match_manga_batch(manga_names)[0]
+
+    def match_manga_batch(self, manga_names: List[str]) -> Tuple[List[Optional[str]], List[Optional[int]]]:
+        """
+        Resolve a batch of incoming names against the library and against each other with one similarity matrix.
+
+        Args:
+            manga_names (List[str]): Names of the manga to search for.
+
+        Returns:
+            Tuple[List[Optional[str]], List[Optional[int]]]: The manga_id of a similar manga for each name, and for
+            names without one, the index of an earlier name in the batch that it duplicates.
+        """
+        try:
+            with self._read_cursor() as cur:
+                cur.execute("SELECT manga_id, manga_name FROM manga_table") # TODO: Best to run this as a stored proc instead
+                rows = cur.fetchall()
+        except Exception as e:
+            print(f"Error in match_manga_batch: {e}")
+            return [None] * len(manga_names), [None] * len(manga_names)
+
+        existing_indexes, duplicate_indexes = match_manga_names(manga_names, [row[1] or "" for row in rows])
+        manga_ids = [rows[index][0] if index is not None else None for index in existing_indexes]
+        return manga_ids, duplicate_indexes
+
     def insert_manga_path(self, manga_id:str, website_id:str, manga_path:str):
         """
         Insert the website manga path to the appropriate table
@@ -135,40 +508,50 @@ class MangaScraperDB:
             manga_id (str): unique id for the manga inserting
             website_id (str): unique id for the website of the manga
             manga_path (str): the manga path as a part of the website
+
+        Returns:
+            Optional[str]: ID of the inserted manga path, None if the insert failed
         """
         manga_path_id = str(uuid.uuid4())
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga_path(%s, %s, %s, %s)", 
-                            (manga_path_id, 
-                             manga_id, 
-                             website_id, 
-                             manga_path))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_manga_path: {e}")
-            self.conn.rollback()
-        return manga_path_id
+        if self._execute_write("insert_manga_path",
+                               "CALL insert_manga_path(%s, %s, %s, %s)", 
+                               (manga_path_id, 
+                                manga_id, 
+                                website_id, 
+                                manga_path)):
+            self._cache_manga_path_id(manga_id, website_id, manga_path, manga_path_id)
+            return manga_path_id
+        return None
 
-    # TODO: Edit the genre insert as this will be a dictionary containing a list
-    def insert_manga_genre(self, manga_id:str, genre:Dict):
+    def insert_manga_genre(self, manga_id:str, genre:str):
         """
-        Insert the manga genres related to the manga by manga id
+        Insert a single genre of the manga by manga id
 
         Args:
-            manga_id (str): ID of manga to have its genres inserted
-            genre (Dict): Dictionary of genres
+            manga_id (str): ID of manga to have its genre inserted
+            genre (str): Name of the genre, e.g. "Action"
         """
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga_genre(%s, %s, %s)", 
+        self._execute_write("insert_manga_genre",
+                            "CALL insert_manga_genre(%s, %s, %s)", 
                             (str(uuid.uuid4()), 
                              manga_id, 
                              genre))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_manga_genre: {e}")
-            self.conn.rollback()
+
+    def insert_manga_genres(self, manga_id:str, genres:List[str]):
+        """
+        Insert every genre of the manga in a single call. Genres the manga already has are skipped.
+
+        Args:
+            manga_id (str): ID of manga to have its genres inserted
+            genres (List[str]): Names of the genres, e.g. ["Action", "Fantasy"]
+
+        Returns:
+            bool: True if the genres were stored
+        """
+        return self._execute_write("insert_manga_genres",
+                            "CALL insert_manga_genres(%s, %s::varchar[])", 
+                            (manga_id, 
+                             list(genres)))
 
     def insert_manga_name_mapping(self, website_id:str, manga_id:str, manga_name:str):
         """
@@ -180,17 +563,12 @@ class MangaScraperDB:
             manga_name (str): The alternate name of the manga to be mapped to the main id
         """
         manga_name_mapping_id = str(uuid.uuid4())
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga_name_mapping(%s, %s, %s, %s)", 
+        self._execute_write("insert_manga_name_mapping",
+                            "CALL insert_manga_name_mapping(%s, %s, %s, %s)", 
                             (manga_name_mapping_id, 
                              website_id, 
                              manga_id, 
                              manga_name))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_manga_name_mapping: {e}")
-            self.conn.rollback()
         return manga_name_mapping_id
 
     def insert_manga_chapter_url_store(self, record: Dict, manga_id:str, website_id:str, manga_path_id:str):
@@ -202,26 +580,30 @@ class MangaScraperDB:
             manga_id (str): Relevant manga id
             website_id (str): Relevant Website ID
             manga_path_id (str): Relevant manga path id
+
+        Returns:
+            Optional[str]: ID of the stored chapter URL, None if the record is invalid or the insert failed
         """
         manga_chapter_url_id = str(uuid.uuid4())
         try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga_chapter_url_store(%s, %s, %s, %s, %s, %s, %s, %s, %s)", 
-                        (manga_chapter_url_id, 
-                         manga_id, 
-                         website_id, 
-                         manga_path_id,
-                         record["chapter_url"], 
-                         int(record["number_of_pages"]),  # Ensure this is an integer
-                         str(record["chapter_url_status"]), 
-                         int(record['chapter_number']),
-                         datetime.strptime(record["date_checked"], '%Y-%m-%d %H:%M:%S')  # Parse to datetime object
-                        ))
-                self.conn.commit()
-        except Exception as e:
+            params = (manga_chapter_url_id, 
+                      manga_id, 
+                      website_id, 
+                      manga_path_id,
+                      record["chapter_url"], 
+                      int(record["number_of_pages"]),  # Ensure this is an integer
+                      str(record["chapter_url_status"]), 
+                      int(record['chapter_number']),
+                      datetime.strptime(record["date_checked"], '%Y-%m-%d %H:%M:%S')  # Parse to datetime object
+                     )
+        except (KeyError, TypeError, ValueError) as e:
             print(f"Error in insert_manga_chapter_url_store: {e}")
-            self.conn.rollback()
-        return manga_chapter_url_id
+            return None
+        if self._execute_write("insert_manga_chapter_url_store",
+                               "CALL insert_manga_chapter_url_store(%s, %s, %s, %s, %s, %s, %s, %s, %s)", 
+                               params):
+            return manga_chapter_url_id
+        return None
     
 
     def insert_manga_thumbnail(self, manga_id: str, website_id: str, manga_path_id: str, thumbnail_url: str) -> str:
@@ -235,19 +617,35 @@ class MangaScraperDB:
             thumbnail_url (str): URL of the manga thumbnail.
 
         Returns:
-            str: ID of the inserted manga thumbnail record.
+            Optional[str]: ID of the inserted manga thumbnail record, None if the insert failed.
         """
         manga_thumbnail_id = str(uuid.uuid4())
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute("CALL insert_manga_thumbnail(%s, %s, %s, %s, %s)",
-                            (manga_thumbnail_id, manga_id, website_id, manga_path_id, thumbnail_url))
-                self.conn.commit()
-        except Exception as e:
-            print(f"Error in insert_manga_thumbnail: {e}")
-            self.conn.rollback()
-        return manga_thumbnail_id
+        if self._execute_write("insert_manga_thumbnail",
+                               "CALL insert_manga_thumbnail(%s, %s, %s, %s, %s)",
+                               (manga_thumbnail_id, manga_id, website_id, manga_path_id, thumbnail_url)):
+            return manga_thumbnail_id
+        return None
     
+    def replace_manga_thumbnail(self, manga_id: str, website_id: str, manga_path_id: str, thumbnail_url: str) -> Optional[str]:
+        """
+        Replace the stored thumbnail of a manga path, e.g. with one re-parsed from an archived page.
+
+        Args:
+            manga_id (str): ID of the manga.
+            website_id (str): ID of the website.
+            manga_path_id (str): ID of the manga path.
+            thumbnail_url (str): URL of the manga thumbnail.
+
+        Returns:
+            Optional[str]: ID of the new manga thumbnail record, None if the write failed.
+        """
+        manga_thumbnail_id = str(uuid.uuid4())
+        if self._execute_write("replace_manga_thumbnail",
+                               "CALL replace_manga_thumbnail(%s, %s, %s, %s, %s)",
+                               (manga_thumbnail_id, manga_id, website_id, manga_path_id, thumbnail_url)):
+            return manga_thumbnail_id
+        return None
+
     def get_website_id(self, website_url: str) -> str:
         """
         Retrieve the website ID for a given website URL.
@@ -258,11 +656,15 @@ class MangaScraperDB:
         Returns:
             str: The website ID or None if not found
         """
+        cached_website_id = self._pending_website_ids.get(website_url) or self.lookup_cache.get_website_id(website_url)
+        if cached_website_id is not None:
+            return cached_website_id
         try:
-            with self.conn.cursor() as cur:
+            with self._read_cursor() as cur:
                 cur.execute("SELECT get_website_id_by_url(%s)", (website_url,))
                 result = cur.fetchone()
-                if result:
+                if result and result[0] is not None:
+                    self._cache_website_id(website_url, result[0])
                     return result[0]
                 else:
                     return None
@@ -275,23 +677,53 @@ class MangaScraperDB:
         Method to retrieve data in the format to present on the frontend.
         """
         try:
-            with self.conn.cursor() as cur:
+            with self.read_conn.cursor() as cur:
                 cur.execute("SELECT * FROM get_manga_data()")
                 result = cur.fetchall()
-                return [
-                    {
-                        "id": row[0],
-                        "title": row[1],
-                        "link": row[2],  # This needs to be correctly mapped
-                        "lastUpdated": row[3].strftime('%Y-%m-%d'),
-                        "imageUrl": row[4],
-                        "status": row[5],
-                        "chapter_number": row[6]
-                    } for row in result
-                ]
+                return [self.format_frontend_row(row) for row in result]
         except Exception as e:
             print(f"Error in get_frontend_data: {e}")
             return []
+
+    def get_frontend_data_by_ids(self, manga_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve the frontend rows for a subset of manga, e.g. the ones updated by a refresh.
+
+        Args:
+            manga_ids (List[str]): IDs of the manga to retrieve
+
+        Returns:
+            List[Dict[str, Any]]: Rows in the same format as get_frontend_data
+        """
+        try:
+            with self._read_cursor() as cur:
+                cur.execute("SELECT * FROM get_manga_data_by_ids(%s::uuid[])", (list(manga_ids),))
+                result = cur.fetchall()
+                return [self.format_frontend_row(row) for row in result]
+        except Exception as e:
+            print(f"Error in get_frontend_data_by_ids: {e}")
+            return []
+
+    @staticmethod
+    def format_frontend_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a row returned by get_manga_data() into the structure used by the frontend.
+
+        Args:
+            row (tuple): Row from get_manga_data() or get_manga_data_by_ids()
+
+        Returns:
+            Dict[str, Any]: Manga data for the frontend
+        """
+        return {
+            "id": row[0],
+            "title": row[1],
+            "link": row[2],  # This needs to be correctly mapped
+            "lastUpdated": row[3].strftime('%Y-%m-%d'),
+            "imageUrl": row[4],
+            "status": row[5],
+            "chapter_number": row[6]
+        }
         
     
     def get_bookmarks_data(self) -> List[Dict[str, Any]]:
@@ -302,25 +734,104 @@ class MangaScraperDB:
             List[Dict[str, Any]]: List of dictionaries containing data to be presented to frontend in response
         """
         try:
-            with self.conn.cursor() as cur:
+            with self.read_conn.cursor() as cur:
                 cur.execute("SELECT * FROM get_manga_bookmarks()")
                 result = cur.fetchall()
-                formatted_data = []
-                for row in result:
-                    timestamp = datetime.fromisoformat(str(row[3]))
-                    formatted_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                    formatted_data.append({
-                        "id": row[0],
-                        "title": row[1],
-                        "link": row[2],
-                        "lastUpdated": formatted_str,
-                        "status": row[4]
-                    })
-                return formatted_data
+                return [self.format_bookmark_row(row) for row in result]
         except Exception as e:
             print(f"Error in get_bookmarks_data: {e}")
             return []
         
+    def get_frontend_data_by_genres(self, genres: List[str]) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve the frontend rows of the manga that have every one of the given genres
+
+        Args:
+            genres (List[str]): Names of the genres to filter on
+
+        Returns:
+            List[Dict[str, Any]]: Rows in the same format as get_frontend_data
+        """
+        try:
+            with self.read_conn.cursor() as cur:
+                cur.execute("SELECT * FROM get_manga_data_by_genres(%s::varchar[])", (list(genres),))
+                result = cur.fetchall()
+                return [self.format_frontend_row(row) for row in result]
+        except Exception as e:
+            print(f"Error in get_frontend_data_by_genres: {e}")
+            return []
+
+    def get_genres(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve every genre in the library with the number of manga that have it
+
+        Returns:
+            List[Dict[str, Any]]: Dictionaries with the "genre" and "manga_count"
+        """
+        try:
+            with self.read_conn.cursor() as cur:
+                cur.execute("SELECT * FROM get_genres()")
+                result = cur.fetchall()
+                return [self.format_genre_row(row) for row in result]
+        except Exception as e:
+            print(f"Error in get_genres: {e}")
+            return []
+
+    @staticmethod
+    def format_genre_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a get_genres() row for the frontend
+
+        Args:
+            row (tuple): genre, manga_count
+
+        Returns:
+            Dict[str, Any]: The formatted row
+        """
+        return {
+            "genre": row[0],
+            "manga_count": row[1]
+        }
+
+    def search_manga(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Ranked title search over manga names and their alternate names, served by trigram indexes.
+
+        Args:
+            query (str): Title or part of a title
+            limit (int): Maximum number of results
+            offset (int): Number of results to skip, for pagination
+
+        Returns:
+            List[Dict[str, Any]]: Matches with the manga_id, manga_name, the matched_name and its score, best first
+        """
+        try:
+            with self.read_conn.cursor() as cur:
+                cur.execute("SELECT * FROM search_manga(%s, %s, %s)", (query, limit, offset))
+                result = cur.fetchall()
+                return [self.format_search_row(row) for row in result]
+        except Exception as e:
+            print(f"Error in search_manga: {e}")
+            return []
+
+    @staticmethod
+    def format_search_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a search_manga() row for the frontend
+
+        Args:
+            row (tuple): manga_id, manga_name, matched_name, score
+
+        Returns:
+            Dict[str, Any]: The formatted row
+        """
+        return {
+            "manga_id": str(row[0]),
+            "manga_name": row[1],
+            "matched_name": row[2],
+            "score": float(row[3])
+        }
+
     def get_supported_websites(self) -> List[Dict[str, Any]]:
         """
         Method to retrieve data in the format to present on the frontend bookmarks component
@@ -330,22 +841,104 @@ class MangaScraperDB:
             List[Dict[str, Any]]: List of dictionaries containing data to be presented to frontend in response
         """
         try:
-            with self.conn.cursor() as cur:
+            with self.read_conn.cursor() as cur:
                 cur.execute("SELECT * FROM get_supported_websites()")
                 result = cur.fetchall()
-                return [
-                    {
-                        "id": row[0],
-                        "title": row[1],
-                        "link": row[2],
-                        "status": row[3],
-                        "lastUpdated": row[4]
-                    } for row in result
-                ]
+                return [self.format_website_row(row) for row in result]
         except Exception as e:
             print(f"Error in get_bookmarks_data: {e}")
             return []
+
+    def get_website_paths(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve every manga path together with its manga name and full URL
+
+        Returns:
+            List[Dict[str, Any]]: List of dictionaries with the manga_path_id, manga_id, manga_name and full_path
+        """
+        try:
+            with self.read_conn.cursor() as cur:
+                cur.execute("SELECT * FROM get_website_paths()")
+                result = cur.fetchall()
+                return [self.format_website_path_row(row) for row in result]
+        except Exception as e:
+            print(f"Error in get_website_paths: {e}")
+            return []
+
+    @staticmethod
+    def format_bookmark_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a row returned by get_manga_bookmarks() into the structure used by the bookmarks component.
+
+        Args:
+            row (tuple): Row from get_manga_bookmarks()
+
+        Returns:
+            Dict[str, Any]: Bookmark data for the frontend
+        """
+        timestamp = datetime.fromisoformat(str(row[3]))
+        formatted_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        return {
+            "id": row[0],
+            "title": row[1],
+            "link": row[2],
+            "lastUpdated": formatted_str,
+            "status": row[4]
+        }
+
+    @staticmethod
+    def format_website_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a row returned by get_supported_websites() into the structure used by the bookmarks component.
+
+        Args:
+            row (tuple): Row from get_supported_websites()
+
+        Returns:
+            Dict[str, Any]: Supported website data for the frontend
+        """
+        return {
+            "id": row[0],
+            "title": row[1],
+            "link": row[2],
+            "status": row[3],
+            "lastUpdated": row[4]
+        }
+
+    @staticmethod
+    def format_website_path_row(row: tuple) -> Dict[str, Any]:
+        """
+        Format a row returned by get_website_paths().
+
+        Args:
+            row (tuple): Row from get_website_paths()
+
+        Returns:
+            Dict[str, Any]: Manga path data
+        """
+        return {
+            "manga_path_id": row[0],
+            "manga_id": row[1],
+            "manga_name": row[2],
+            "full_path": row[3]
+        }
         
+    def get_bootstrap_json(self) -> str:
+        """
+        Method to retrieve the manga data, bookmarks data, supported websites and genres in a single round trip.
+        The payload is built as JSON inside PostgreSQL and returned as text so it can be sent without re-serialising.
+
+        Returns:
+            str: JSON object with "manga_data", "bookmarks_data", "supported_websites" and "genres" keys
+        """
+        try:
+            with self.read_conn.cursor() as cur:
+                cur.execute("SELECT get_bootstrap_data()::text")
+                return cur.fetchone()[0]
+        except Exception as e:
+            print(f"Error in get_bootstrap_json: {e}")
+            return json.dumps(EMPTY_BOOTSTRAP_DATA)
+
     def is_thumbnail_exists(self, manga_id: str, website_id: str, manga_path_id: str, thumbnail_url: str) -> bool:
         """
         Check if a thumbnail URL already exists in the database.
@@ -361,7 +954,7 @@ class MangaScraperDB:
         """
 
         try:
-            with self.conn.cursor() as cur:
+            with self._read_cursor() as cur:
                 cur.execute("SELECT check_thumbnail_exists(%s, %s, %s, %s)",
                             (manga_id, website_id, manga_path_id, thumbnail_url))
                 result = cur.fetchone()
@@ -381,7 +974,7 @@ class MangaScraperDB:
             chapter_url (str): Complete chapter url for the manga of interest
         """
         try:
-            with self.conn.cursor() as cur:
+            with self._read_cursor() as cur:
                 cur.execute("SELECT check_chapter_url_exists(%s, %s, %s, %s)",
                             (manga_id, website_id, manga_path_id, chapter_url))
                 result = cur.fetchone()
@@ -402,12 +995,17 @@ class MangaScraperDB:
         Returns:
             str: The manga path ID or None if not found.
         """
+        cached_manga_path_id = (self._pending_manga_path_ids.get(LookupCache.path_key(manga_id, website_id, manga_path))
+                                or self.lookup_cache.get_manga_path_id(manga_id, website_id, manga_path))
+        if cached_manga_path_id is not None:
+            return cached_manga_path_id
         try:
-            with self.conn.cursor() as cur:
+            with self._read_cursor() as cur:
                 cur.execute("SELECT get_manga_path_id(%s, %s, %s)",
                             (manga_id, website_id, manga_path))
                 result = cur.fetchone()
-                if result:
+                if result and result[0] is not None:
+                    self._cache_manga_path_id(manga_id, website_id, manga_path, result[0])
                     return result[0]
                 else:
                     return None
@@ -415,9 +1013,225 @@ class MangaScraperDB:
             print(f"Error in get_manga_path_id: {e}")
             return None
 
+    def load_lookup_caches(self) -> bool:
+        """
+        Load website_table and manga_path_table into the shared lookup cache.
+        Call once at the start of a run, afterwards get_website_id and get_manga_path_id are served from memory.
+
+        Returns:
+            bool: True if the cache was loaded
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT website_url, website_id FROM website_table")
+                website_ids = {website_url: str(website_id) for website_url, website_id in cur.fetchall()}
+                cur.execute("SELECT manga_id, website_id, manga_path, manga_path_id FROM manga_path_table")
+                manga_path_ids = {
+                    LookupCache.path_key(manga_id, website_id, manga_path): str(manga_path_id)
+                    for manga_id, website_id, manga_path, manga_path_id in cur.fetchall()
+                }
+            self.lookup_cache.load(website_ids, manga_path_ids)
+            return True
+        except Exception as e:
+            print(f"Error in load_lookup_caches: {e}")
+            return False
+
+    def delete_manga(self, manga_id: str):
+        """
+        Delete a manga and every related record by calling the stored proc, keeping the lookup cache consistent.
+        Errors are raised so the caller can report them per record.
+
+        Args:
+            manga_id (str): ID of the manga to delete
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("CALL delete_manga_record(%s)", (manga_id,))
+                self.conn.commit()
+                self.mark_write()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.lookup_cache.remove_manga(manga_id)
+
+    def create_refresh_run(self, max_attempts: int = 3) -> str:
+        """
+        Create a refresh run with one pending job per manga path for the refresh workers to claim.
+
+        Args:
+            max_attempts (int): Number of times a job is tried before it is marked as failed
+
+        Returns:
+            str: ID of the refresh run
+        """
+        run_id = str(uuid.uuid4())
+        self._execute_write("create_refresh_run",
+                            "CALL create_refresh_run(%s, %s)",
+                            (run_id, max_attempts))
+        return run_id
+
+    def claim_refresh_jobs(self, worker_id: str, batch_size: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        """
+        Claim a batch of refresh jobs under a lease. Jobs locked by other workers are skipped rather than waited on.
+
+        Args:
+            worker_id (str): Unique name of the claiming worker
+            batch_size (int): Maximum number of jobs to claim
+            lease_seconds (int): How long the jobs stay claimed without a heartbeat
+
+        Returns:
+            List[Dict[str, Any]]: The claimed jobs with their manga path details
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT * FROM claim_refresh_jobs(%s, %s, %s)",
+                            (worker_id, batch_size, lease_seconds))
+                result = cur.fetchall()
+                self.conn.commit()
+                return [
+                    {
+                        "job_id": row[0],
+                        "run_id": row[1],
+                        "manga_path_id": row[2],
+                        "manga_id": row[3],
+                        "manga_name": row[4],
+                        "full_path": row[5],
+                        "attempts": row[6]
+                    } for row in result
+                ]
+        except Exception as e:
+            print(f"Error in claim_refresh_jobs: {e}")
+            self.conn.rollback()
+            return []
+
+    def heartbeat_refresh_jobs(self, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Extend the lease on every job held by a worker.
+
+        Args:
+            worker_id (str): Unique name of the worker
+            lease_seconds (int): New lease length from now
+
+        Returns:
+            bool: True if the heartbeat was recorded
+        """
+        return self._execute_write("heartbeat_refresh_jobs",
+                                   "CALL heartbeat_refresh_jobs(%s, %s)",
+                                   (worker_id, lease_seconds))
+
+    def finish_refresh_job(self, job_id: str, worker_id: str, succeeded: bool, error: Optional[str] = None) -> bool:
+        """
+        Mark a claimed job as done, or release it for a retry if it failed and has attempts left.
+
+        Args:
+            job_id (str): ID of the job
+            worker_id (str): Unique name of the worker holding the lease
+            succeeded (bool): Whether the job was processed successfully
+            error (Optional[str]): Error message for failed jobs
+
+        Returns:
+            bool: True if the update was recorded
+        """
+        return self._execute_write("finish_refresh_job",
+                                   "CALL finish_refresh_job(%s, %s, %s, %s)",
+                                   (job_id, worker_id, succeeded, error))
+
+    def start_refresh_run(self, max_age_seconds: int = RESUMABLE_RUN_MAX_AGE_SECONDS) -> str:
+        """
+        Start an inline refresh run, resuming the latest run that crashed or stopped at its deadline if there is one.
+        Runs started longer ago than max_age_seconds are expired instead, as the series they checkpointed are
+        due for a refresh again.
+
+        Args:
+            max_age_seconds (int): Age up to which an unfinished run is resumed
+
+        Returns:
+            str: ID of the refresh run
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT get_resumable_refresh_run(%s)", (max_age_seconds,))
+                result = cur.fetchone()
+            run_id = str(result[0]) if result and result[0] is not None else str(uuid.uuid4())
+        except Exception as e:
+            print(f"Error in start_refresh_run: {e}")
+            self.conn.rollback()
+            run_id = str(uuid.uuid4())
+        self._execute_write("start_refresh_run",
+                            "CALL start_refresh_run(%s)",
+                            (run_id,))
+        return run_id
+
+    def get_refresh_checkpoints(self, run_id: str) -> Set[str]:
+        """
+        Manga paths a refresh run has already finished
+
+        Args:
+            run_id (str): ID of the refresh run
+
+        Returns:
+            Set[str]: The finished manga_path_ids
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT * FROM get_refresh_checkpoints(%s)", (run_id,))
+                return {str(row[0]) for row in cur.fetchall()}
+        except Exception as e:
+            print(f"Error in get_refresh_checkpoints: {e}")
+            return set()
+
+    def insert_refresh_checkpoints(self, run_id: str, manga_path_ids: List[str]) -> bool:
+        """
+        Record manga paths a refresh run has finished so a resumed run skips them
+
+        Args:
+            run_id (str): ID of the refresh run
+            manga_path_ids (List[str]): The finished manga_path_ids
+
+        Returns:
+            bool: True if the checkpoint was recorded
+        """
+        return self._execute_write("insert_refresh_checkpoints",
+                                   "CALL insert_refresh_checkpoints(%s, %s::uuid[])",
+                                   (run_id, manga_path_ids))
+
+    def get_last_completed_refresh_start(self) -> Optional[datetime]:
+        """
+        Start of the latest refresh run in which every series succeeded
+
+        Returns:
+            Optional[datetime]: The start time, or None if no run has completed or it could not be read
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT get_last_completed_refresh_start()")
+                result = cur.fetchone()
+                return result[0] if result else None
+        except Exception as e:
+            print(f"Error in get_last_completed_refresh_start: {e}")
+            self.conn.rollback()
+            return None
+
+    def finish_refresh_run(self, run_id: str, run_status: str) -> bool:
+        """
+        Close an inline refresh run
+
+        Args:
+            run_id (str): ID of the refresh run
+            run_status (str): "completed", or "partial" if it stopped at its deadline and should be resumed
+
+        Returns:
+            bool: True if the update was recorded
+        """
+        return self._execute_write("finish_refresh_run",
+                                   "CALL finish_refresh_run(%s, %s)",
+                                   (run_id, run_status))
+
     def close_connection(self):
         """
         Always remember to close the connection if not in use
         """
-        if self.conn:
-            self.conn.close()
+        if self._conn is not None:
+            self._conn.close()
+        if self._replica_conn is not None:
+            self._replica_conn.close()
@@ -0,0 +1,377 @@
+import asyncio
+import asyncpg # Async PostgreSQL driver. See: https://github.com/MagicStack/asyncpg
+import json
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from src.manga_scraper_db import MangaScraperDB, EMPTY_BOOTSTRAP_DATA, REPLICA_LAG_CHECK_SECONDS, REPLICA_LAG_QUERY
+
+# Rows fetched per round trip when streaming the frontend data from a server-side cursor
+FRONTEND_CHUNK_SIZE = 1000
+# Set for a request whose client wrote within read_your_writes_seconds, see main.route_reads.
+# Its reads skip the replicas and the read cache so the client always sees its own writes.
+read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+class AsyncMangaScraperDB:
+    """
+    Async counterpart of the MangaScraperDB read methods, backed by its own asyncpg connection pools.
+    Output matches MangaScraperDB exactly so the API routes can switch between the two freely.
+    Reads use a replica pool when replicas are configured, following the same rules as MangaScraperDB.read_conn.
+    """
+    def __init__(self, min_size: int = 1, max_size: int = 10, connect_timeout: float = 10):
+        """
+        The pool is only created on first use, so constructing this class never touches the database.
+
+        Args:
+            min_size (int): Minimum number of pooled connections, opened when the pool is created
+            max_size (int): Maximum number of pooled connections
+            connect_timeout (float): Seconds to wait for the database when opening a connection
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.connect_timeout = connect_timeout
+        self.pool: Optional[asyncpg.Pool] = None
+        self.replica_pool: Optional[asyncpg.Pool] = None
+        self.settings: Optional[Dict[str, Any]] = None
+        self._pool_lock = asyncio.Lock()
+        # Held while connecting to a replica. Reads arriving meanwhile use the primary instead of waiting.
+        self._replica_lock = asyncio.Lock()
+        self._replica: Optional[Dict[str, Any]] = None
+        self._replica_lag_checked_at = float("-inf")
+        self._replica_lag_ok = False
+
+    def load_settings(self) -> Dict[str, Any]:
+        """
+        Settings from src/secrets/db_config.json, read on first use. See MangaScraperDB.settings for the replica keys.
+        """
+        if self.settings is None:
+            creds_path = os.path.join(os.getcwd(),"src/secrets/db_config.json")
+            self.settings = MangaScraperDB.read_db_credentials(creds_path)
+        return self.settings
+
+    async def create_pool(self, parameters: Dict[str, Any]) -> asyncpg.Pool:
+        return await asyncpg.create_pool(
+            **parameters,
+            min_size= self.min_size,
+            max_size= self.max_size,
+            timeout= self.connect_timeout
+        )
+
+    async def get_pool(self) -> asyncpg.Pool:
+        """
+        Create the connection pool on first use and return it
+
+        Returns:
+            asyncpg.Pool: Connection pool to the PostgreSQL database
+        """
+        if self.pool is None:
+            async with self._pool_lock:
+                if self.pool is None:
+                    primary, _ = MangaScraperDB.connection_settings(self.load_settings())
+                    self.pool = await self.create_pool(primary)
+        return self.pool
+
+    async def get_read_pool(self) -> asyncpg.Pool:
+        """
+        Pool for read-only queries. The replica pool when a replica is configured, reachable and within
+        replica_max_lag_seconds, otherwise the primary pool. Requests flagged by read_from_primary use the primary.
+        Replicas are tried in order, skipping those that failed recently, see MangaScraperDB.replica_retry_at.
+
+        Returns:
+            asyncpg.Pool: Connection pool to read from
+        """
+        settings = self.load_settings()
+        if not settings.get("replicas") or read_from_primary.get():
+            return await self.get_pool()
+        if self.replica_pool is None:
+            if self._replica_lock.locked():
+                return await self.get_pool()
+            async with self._replica_lock:
+                if self.replica_pool is None:
+                    _, replicas = MangaScraperDB.connection_settings(settings)
+                    await self.connect_replica(replicas)
+            if self.replica_pool is None:
+                return await self.get_pool()
+        now = time.monotonic()
+        if now - self._replica_lag_checked_at >= REPLICA_LAG_CHECK_SECONDS:
+            self._replica_lag_checked_at = now
+            try:
+                lag = await self.replica_pool.fetchval(REPLICA_LAG_QUERY, timeout=self.connect_timeout)
+                self._replica_lag_ok = float(lag) <= settings.get("replica_max_lag_seconds", 5)
+            except Exception as e:
+                print(f"Error checking replica lag: {e}")
+                self._replica_lag_ok = False
+                # Dropped so the next read connects to another replica, or this one once it is back
+                if self._replica is not None:
+                    MangaScraperDB.replica_unreachable(self._replica)
+                self.replica_pool.terminate()
+                self.replica_pool = None
+        return self.replica_pool if self._replica_lag_ok else await self.get_pool()
+
+    async def connect_replica(self, replicas: List[Dict[str, Any]]):
+        """
+        Create the replica pool on the first replica that answers, marking those that do not as unreachable
+
+        Args:
+            replicas (List[Dict[str, Any]]): Connection parameters of each replica, see MangaScraperDB.connection_settings
+        """
+        for replica in MangaScraperDB.reachable_replicas(replicas):
+            try:
+                self.replica_pool = await self.create_pool(replica)
+                self._replica = replica
+                self._replica_lag_checked_at = float("-inf")
+                return
+            except Exception as e:
+                print(f"Error connecting to replica {replica['host']}:{replica['port']}: {e}")
+                MangaScraperDB.replica_unreachable(replica)
+
+    async def ping(self) -> bool:
+        """
+        Check the database answers on a pooled connection, creating the pool if needed
+
+        Returns:
+            bool: True if the database is reachable
+        """
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire(timeout=self.connect_timeout) as conn:
+                await conn.fetchval("SELECT 1")
+            return True
+        except Exception as e:
+            print(f"Error in ping: {e}")
+            return False
+
+    def read_your_writes_seconds(self) -> float:
+        """
+        How long after a write its client's reads use the primary, read_your_writes_seconds in db_config.json
+        """
+        return self.load_settings().get("read_your_writes_seconds", 10)
+
+    async def close(self):
+        """
+        Close every pooled connection. The pool is created again on next use.
+        """
+        async with self._pool_lock:
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+            if self.replica_pool is not None:
+                await self.replica_pool.close()
+                self.replica_pool = None
+
+    @staticmethod
+    def to_row(record: asyncpg.Record) -> tuple:
+        """
+        Convert an asyncpg record into the tuple psycopg2 would have returned.
+        psycopg2 returns UUID columns as strings, asyncpg returns uuid.UUID objects.
+
+        Args:
+            record (asyncpg.Record): Row returned by asyncpg
+
+        Returns:
+            tuple: Row values with UUIDs as strings
+        """
+        return tuple(str(value) if isinstance(value, uuid.UUID) else value for value in record)
+
+    async def _fetch(self, label: str, query: str, *args: Any) -> List[tuple]:
+        """
+        Run a read query on a pooled connection
+
+        Args:
+            label (str): Name of the calling method used in error messages
+            query (str): SQL query to run
+            args (Any): Query parameters
+
+        Returns:
+            List[tuple]: The rows, or an empty list if the query failed
+        """
+        try:
+            pool = await self.get_read_pool()
+            async with pool.acquire() as conn:
+                records = await conn.fetch(query, *args)
+            return [self.to_row(record) for record in records]
+        except Exception as e:
+            print(f"Error in {label}: {e}")
+            return []
+
+    async def _cached(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Serve a read from the shared read cache, loading and storing it on a miss
+
+        Args:
+            key (str): Name of the read
+            load (Callable[[], Awaitable[Any]]): Reads the value from the database
+
+        Returns:
+            Any: The value. Failed reads return empty results, which are never cached.
+        """
+        if read_from_primary.get():
+            # Another worker's cache may not have heard of this client's write yet
+            return await load()
+        value, generation = MangaScraperDB.read_cache.get(key)
+        if value is None:
+            value = await load()
+            if value:
+                MangaScraperDB.read_cache.put(key, value, generation)
+        return value
+
+    async def get_frontend_data(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve data in the format to present on the frontend.
+        """
+        async def load() -> List[Dict[str, Any]]:
+            rows = await self._fetch("get_frontend_data", "SELECT * FROM get_manga_data()")
+            return [MangaScraperDB.format_frontend_row(row) for row in rows]
+        return await self._cached("get_frontend_data", load)
+
+    async def iter_frontend_data(self, chunk_size: int = FRONTEND_CHUNK_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Read the get_frontend_data rows through a server-side cursor, a chunk at a time, so only one chunk
+        of a large library is held in memory. The pooled connection is held until iteration ends.
+        Errors are raised, as rows may already have been sent on.
+
+        Args:
+            chunk_size (int): Rows fetched from the server per round trip
+
+        Yields:
+            List[Dict[str, Any]]: Rows in the get_frontend_data format
+        """
+        pool = await self.get_read_pool()
+        async with pool.acquire() as conn:
+            # Cursors only live inside a transaction
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor("SELECT * FROM get_manga_data()")
+                while True:
+                    records = await cursor.fetch(chunk_size)
+                    if not records:
+                        break
+                    yield [MangaScraperDB.format_frontend_row(self.to_row(record)) for record in records]
+
+    async def get_bookmarks_data(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve data in the format to present on the frontend bookmarks component
+
+        Returns:
+            List[Dict[str, Any]]: List of dictionaries containing data to be presented to frontend in response
+        """
+        async def load() -> List[Dict[str, Any]]:
+            rows = await self._fetch("get_bookmarks_data", "SELECT * FROM get_manga_bookmarks()")
+            try:
+                return [MangaScraperDB.format_bookmark_row(row) for row in rows]
+            except Exception as e:
+                print(f"Error in get_bookmarks_data: {e}")
+                return []
+        return await self._cached("get_bookmarks_data", load)
+
+    async def get_frontend_data_by_genres(self, genres: List[str]) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve the frontend rows of the manga that have every one of the given genres
+        """
+        rows = await self._fetch("get_frontend_data_by_genres", "SELECT * FROM get_manga_data_by_genres($1::varchar[])", list(genres))
+        return [MangaScraperDB.format_frontend_row(row) for row in rows]
+
+    async def get_genres(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve every genre in the library with the number of manga that have it
+        """
+        async def load() -> List[Dict[str, Any]]:
+            rows = await self._fetch("get_genres", "SELECT * FROM get_genres()")
+            return [MangaScraperDB.format_genre_row(row) for row in rows]
+        return await self._cached("get_genres", load)
+
+    async def search_manga(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Ranked title search over manga names and their alternate names, served by trigram indexes.
+        """
+        rows = await self._fetch("search_manga", "SELECT * FROM search_manga($1, $2, $3)", query, limit, offset)
+        return [MangaScraperDB.format_search_row(row) for row in rows]
+
+    async def get_user_frontend_data(self, userid: str) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve the frontend rows of the manga a user follows
+        """
+        rows = await self._fetch("get_user_frontend_data", "SELECT * FROM get_user_manga_data($1::uuid)", userid)
+        return [MangaScraperDB.format_frontend_row(row) for row in rows]
+
+    async def get_user_bookmarks_data(self, userid: str) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve the bookmarks of the manga paths a user follows
+        """
+        rows = await self._fetch("get_user_bookmarks_data", "SELECT * FROM get_user_manga_bookmarks($1::uuid)", userid)
+        return [MangaScraperDB.format_bookmark_row(row) for row in rows]
+
+    async def _execute(self, label: str, query: str, *args: Any) -> bool:
+        """
+        Run a write statement on a pooled connection
+
+        Args:
+            label (str): Name of the calling method used in error messages
+            query (str): SQL statement to run
+            args (Any): Statement parameters
+
+        Returns:
+            bool: True if the statement succeeded
+        """
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(query, *args)
+            return True
+        except Exception as e:
+            print(f"Error in {label}: {e}")
+            return False
+
+    async def follow_manga_path(self, userid: str, manga_path_id: str) -> bool:
+        """
+        Make a user follow a manga path. Following a path twice is a no-op.
+        """
+        return await self._execute("follow_manga_path", "CALL follow_manga_path($1::uuid, $2::uuid, $3::uuid)",
+                                   str(uuid.uuid4()), userid, manga_path_id)
+
+    async def unfollow_manga_path(self, userid: str, manga_path_id: str) -> bool:
+        """
+        Stop a user following a manga path
+        """
+        return await self._execute("unfollow_manga_path", "CALL unfollow_manga_path($1::uuid, $2::uuid)",
+                                   userid, manga_path_id)
+
+    async def get_supported_websites(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve data in the format to present on the frontend bookmarks component
+        Specifically the supported websites section
+
+        Returns:
+            List[Dict[str, Any]]: List of dictionaries containing data to be presented to frontend in response
+        """
+        async def load() -> List[Dict[str, Any]]:
+            rows = await self._fetch("get_supported_websites", "SELECT * FROM get_supported_websites()")
+            return [MangaScraperDB.format_website_row(row) for row in rows]
+        return await self._cached("get_supported_websites", load)
+
+    async def get_website_paths(self) -> List[Dict[str, Any]]:
+        """
+        Method to retrieve every manga path together with its manga name and full URL
+
+        Returns:
+            List[Dict[str, Any]]: List of dictionaries with the manga_path_id, manga_id, manga_name and full_path
+        """
+        rows = await self._fetch("get_website_paths", "SELECT * FROM get_website_paths()")
+        return [MangaScraperDB.format_website_path_row(row) for row in rows]
+
+    async def get_bootstrap_json(self) -> str:
+        """
+        Method to retrieve the manga data, bookmarks data, supported websites and genres in a single round trip.
+
+        Returns:
+            str: JSON object with "manga_data", "bookmarks_data", "supported_websites" and "genres" keys
+        """
+        async def load() -> Optional[str]:
+            rows = await self._fetch("get_bootstrap_json", "SELECT get_bootstrap_data()::text")
+            return rows[0][0] if rows else None
+        bootstrap_json = await self._cached("get_bootstrap_json", load)
+        if bootstrap_json:
+            return bootstrap_json
+        return json.dumps(EMPTY_BOOTSTRAP_DATA)
@@ -1,11 +1,47 @@
-from typing import List, Dict, Any, Tuple
+import copy
+import csv
+import io
+import itertools
+import queue
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Tuple, Iterable, Iterator, Generator, Optional, Union
 from src.manga_scraper import MangaScraper, MangaKakalotScraper, vizScraper, webtoonScraper
 from data_models.manga_records import MangaList, MangaRecord
-from src.manga_scraper_db import MangaScraperDB
+from data_models.refresh_records import RefreshTarget, ScrapeResult
+from src.manga_scraper_db import MangaScraperDB, WriteFailed
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+from src.html_archive import HtmlArchive
+from src.single_flight import SingleFlight
+from src.scrape_scheduler import ScrapeScheduler, INTERACTIVE, MANUAL_REFRESH, BACKGROUND
+
+# Number of scraped records written per database transaction during a refresh.
+# Scraping runs ahead of the writer by at most two batches, which bounds memory regardless of library size.
+REFRESH_BATCH_SIZE = 25
+# Number of scrapes a refresh or import keeps queued in the scheduler at once
+SCRAPE_WINDOW = 16
 
 class MangaScraperService:
-    def __init__(self):
+    archive: Optional[HtmlArchive] = None
+    offline: bool = False
+
+    def __init__(self, archive: Optional[HtmlArchive] = None, offline: bool = False):
+        """
+        Args:
+            archive (Optional[HtmlArchive]): Archive the scrapers store every fetched page in
+            offline (bool): Scrape from the archive instead of the network
+        """
         self.ms_db = MangaScraperDB()
+        self.async_db = AsyncMangaScraperDB() # Used by the API read routes so queries do not block the event loop
+        self.archive = archive
+        self.offline = offline
+        # Concurrent inserts, imports and refreshes of the same page or search share one in-flight fetch
+        self.scrape_flight = SingleFlight()
+        # Every scrape of this service goes through one scheduler so interactive inserts jump ahead of refreshes
+        self.scheduler = ScrapeScheduler()
 
     def scrape_record(self, manga_list: MangaList) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
         """
@@ -20,24 +56,103 @@ class MangaScraperService:
         error_list = [] # List to store websites that are not supported
         output_list = []
         manga_list = self.get_new_record(manga_list)
-        ms = MangaScraper(manga_list)
-        mk_scraper = MangaKakalotScraper(manga_list)
-        for item in ms.manga_list:
-            item_base_url = ms.get_base_url(item.link)
-            if "viz" in item_base_url:
-                db_data = self.viz_scrape(item, manga_list)
-                output_list.append(db_data)
-            elif "webtoons" in item_base_url:
-                db_data = self.webtoon_scrape(item, manga_list, mk_scraper)
-                output_list.append(db_data)
-            elif "chapmanganato" in item_base_url:
-                db_data = self.mangakakalot_scrape(item, manga_list)
-                output_list.append(db_data)
-            else:
+        mk_scraper = MangaKakalotScraper(manga_list, archive=self.archive, offline=self.offline)
+        futures = [self.submit_scrape(item, manga_list, mk_scraper, INTERACTIVE) for item in manga_list]
+        for item, future in zip(manga_list, futures):
+            db_data = future.result()
+            if db_data is None:
                 error_list.append(item.link)
+            else:
+                output_list.append(db_data)
 
         return (output_list, error_list)
 
+    def submit_scrape(self, item: MangaRecord, manga_list: List[MangaRecord], mk_scraper: MangaKakalotScraper, priority: int) -> Future:
+        """
+        Queue a scrape of a single manga record on the shared scheduler.
+
+        Args:
+            item (MangaRecord): The manga record to scrape.
+            manga_list (List[MangaRecord]): The list of manga records the item belongs to.
+            mk_scraper (MangaKakalotScraper): Shared MangaKakalot scraper used for thumbnail lookups.
+            priority (int): INTERACTIVE, MANUAL_REFRESH or BACKGROUND.
+
+        Returns:
+            Future: Resolves to the result of scrape_item.
+        """
+        site = urlparse(item.link.strip()).netloc.lower()
+        return self.scheduler.submit(site, priority, lambda: self.scrape_item(item, manga_list, mk_scraper))
+
+    def iter_scheduled_scrapes(self, manga_list: List[MangaRecord], mk_scraper: MangaKakalotScraper, priority: int,
+                               max_in_flight: int = SCRAPE_WINDOW) -> Iterator[Tuple[int, Future]]:
+        """
+        Scrape a list of records on the shared scheduler, yielding each one as soon as it finishes.
+        Only max_in_flight scrapes are queued at a time, so a large run neither floods the scheduler nor holds
+        more than a window of results. Scrapes that have not started are cancelled if iteration stops early.
+
+        Args:
+            manga_list (List[MangaRecord]): The manga records to scrape.
+            mk_scraper (MangaKakalotScraper): Shared MangaKakalot scraper used for thumbnail lookups.
+            priority (int): INTERACTIVE, MANUAL_REFRESH or BACKGROUND.
+            max_in_flight (int): Maximum number of scrapes queued or running at once.
+
+        Yields:
+            Tuple[int, Future]: The index of the record in manga_list and its completed future, in completion order.
+        """
+        records = iter(enumerate(manga_list))
+        futures = {}
+        try:
+            for index, item in itertools.islice(records, max(1, max_in_flight)):
+                futures[self.submit_scrape(item, manga_list, mk_scraper, priority)] = index
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = futures.pop(future)
+                    for next_index, next_item in itertools.islice(records, 1):
+                        futures[self.submit_scrape(next_item, manga_list, mk_scraper, priority)] = next_index
+                    yield index, future
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def scrape_item(self, item: MangaRecord, manga_list: List[MangaRecord], mk_scraper: MangaKakalotScraper) -> Optional[Dict[str, Any]]:
+        """
+        Dispatch a single manga record to the scraper for its website.
+
+        Args:
+            item (MangaRecord): The manga record to scrape.
+            manga_list (List[MangaRecord]): The list of manga records the item belongs to.
+            mk_scraper (MangaKakalotScraper): Shared MangaKakalot scraper used for thumbnail lookups.
+
+        Returns:
+            Optional[Dict[str, Any]]: The scraped data for the manga, or None if the website is not supported.
+        """
+        db_data = self.scrape_flight.do(("record", self.normalize_link(item.link)),
+                                        lambda: self.scrape_item_uncoalesced(item, manga_list, mk_scraper))
+        # Callers sharing a flight get the same dict, each gets its own copy to modify
+        return dict(db_data) if db_data is not None else None
+
+    def scrape_item_uncoalesced(self, item: MangaRecord, manga_list: List[MangaRecord], mk_scraper: MangaKakalotScraper) -> Optional[Dict[str, Any]]:
+        """
+        Scrape a single manga record without sharing the fetch with concurrent callers. Use scrape_item instead.
+
+        Args:
+            item (MangaRecord): The manga record to scrape.
+            manga_list (List[MangaRecord]): The list of manga records the item belongs to.
+            mk_scraper (MangaKakalotScraper): Shared MangaKakalot scraper used for thumbnail lookups.
+
+        Returns:
+            Optional[Dict[str, Any]]: The scraped data for the manga, or None if the website is not supported.
+        """
+        item_base_url = MangaScraper.get_base_url(item.link)
+        if "viz" in item_base_url:
+            return self.viz_scrape(item, manga_list)
+        elif "webtoons" in item_base_url:
+            return self.webtoon_scrape(item, manga_list, mk_scraper)
+        elif "chapmanganato" in item_base_url:
+            return self.mangakakalot_scrape(item, manga_list)
+        return None
+
     def get_new_record(self, manga_list: MangaList) -> List[MangaRecord]:
         """
         Create the new records into a new list that we can iterate over and scrape.
@@ -64,7 +179,7 @@ class MangaScraperService:
         Returns:
             Dict[str, Any]: The scraped data for the manga.
         """
-        vs = vizScraper(manga_list)
+        vs = vizScraper(manga_list, archive=self.archive, offline=self.offline)
         return vs.create_record(item.link)
 
     def webtoon_scrape(self, item: Dict[str, Any], manga_list: List[MangaRecord], mk_scraper: MangaKakalotScraper) -> Dict[str, Any]:
@@ -79,11 +194,13 @@ class MangaScraperService:
         Returns:
             Dict[str, Any]: The scraped data for the manga.
         """
-        ws = webtoonScraper(manga_list)
+        ws = webtoonScraper(manga_list, archive=self.archive, offline=self.offline)
         db_data = ws.create_record(item.link)
 
         # Find manga link in MangaKakalot and extract the thumbnail URL
-        search_url = mk_scraper.find_manga_link(search_query=db_data["manga_name"])
+        search_query = db_data["manga_name"]
+        search_url = self.scrape_flight.do(("search", " ".join(search_query.lower().split())),
+                                           lambda: mk_scraper.find_manga_link(search_query=search_query))
         if search_url:
             db_data["manga_thumbnail_url"] = mk_scraper.extract_thumbnail(search_url)
         else:
@@ -101,57 +218,325 @@ class MangaScraperService:
         Returns:
             Dict[str, Any]: The scraped data for the manga.
         """
-        mk = MangaKakalotScraper(manga_list)
+        mk = MangaKakalotScraper(manga_list, archive=self.archive, offline=self.offline)
         base_url = mk.get_base_url(item.link)
         return mk.create_record(item.link, base_url)
 
-    def bulk_insert_record(self, output_list: List[Dict[str, Any]], refresh_data: bool) -> str:
+    def bulk_insert_record(self, output_list: List[Union[Dict[str, Any], ScrapeResult]], refresh_data: bool) -> Optional[str]:
         """
         Bulk insert records then close at the end
 
         Args:
-            output_list (List[Dict[str, Any]]): List of results to be inserted into the database
+            output_list (List[Union[Dict[str, Any], ScrapeResult]]): List of results to be inserted into the database.
+                                                                     Refreshed records are ScrapeResults from scrape_existing_records.
+            refresh_data (bool): Whether the records are refreshed ones rather than new additions.
+
+        Returns:
+            Optional[str]: For new additions "Success!" or the messages of the records that were not added.
+                           None when there was nothing to add, and for refreshed records, whose outcomes are
+                           reported per record by write_refresh_batch.
         """
         ms_db = MangaScraperDB()
+        if refresh_data:
+            # Refreshed records are written in micro-batches, one transaction per batch
+            for start in range(0, len(output_list), REFRESH_BATCH_SIZE):
+                self.write_refresh_batch(ms_db, output_list[start:start + REFRESH_BATCH_SIZE])
+            ms_db.close_connection()
+            return
+
+        # For new additions every record is attempted, a duplicate does not stop the rest of the list
+        messages = []
         for item in output_list:
-            manga_name = item["manga_name"]
-
-            # For new additions
-            if not(refresh_data):
-                similar_manga_id = ms_db.find_similar_manga(manga_name)
-                if similar_manga_id is None:
-                    manga_id = ms_db.insert_manga(manga_name=manga_name)
-                    website_id = ms_db.get_website_id(item["website_url"])
-                    manga_path = item["manga_path"]
-                    manga_path_id = ms_db.insert_manga_path(manga_id = manga_id, website_id = website_id, manga_path = manga_path)
-                    ms_db.insert_manga_chapter_url_store(record = item, manga_id = manga_id, website_id = website_id, manga_path_id = manga_path_id)
-                    ms_db.insert_manga_thumbnail(manga_id, website_id, manga_path_id, thumbnail_url=item["manga_thumbnail_url"])
-                    return "Success!"
-                else:
-                    return(f"Similar manga already exists in the database: {manga_name}. Record was not added. Please delete existing record if you wish to update with a new link.")
-            elif refresh_data:  
-                manga_id = ms_db.find_similar_manga(manga_name)
-                website_id = ms_db.get_website_id(item["website_url"])
-                manga_path = item["manga_path"]
+            similar_manga_id = ms_db.find_similar_manga(item["manga_name"])
+            messages.append(self.insert_new_record(ms_db, item, similar_manga_id))
+
+        ms_db.close_connection()
+        if not messages:
+            return None
+        failed_messages = [message for message in messages if message != "Success!"]
+        return " ".join(failed_messages) if failed_messages else "Success!"
+
+    def insert_new_record(self, ms_db: MangaScraperDB, item: Dict[str, Any], similar_manga_id: Optional[str]) -> str:
+        """
+        Insert a newly scraped manga unless a similar manga is already in the database.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection.
+            item (Dict[str, Any]): The scraped record.
+            similar_manga_id (Optional[str]): ID of a similar manga found in the database, if any.
+
+        Returns:
+            str: "Success!" or a message explaining why the record was not added.
+        """
+        manga_name = item["manga_name"]
+        if similar_manga_id is not None:
+            return(f"Similar manga already exists in the database: {manga_name}. Record was not added. Please delete existing record if you wish to update with a new link.")
 
-                manga_path_id = ms_db.get_manga_path_id(manga_id, website_id, manga_path)
+        website_id = ms_db.get_website_id(item["website_url"])
+        if website_id is None:
+            return f"Website {item['website_url']} of {manga_name} was not found in the database. Record was not added."
+        try:
+            # Every row of the manga is written, or none of them
+            with ms_db.savepoint():
+                manga_id = ms_db.insert_manga(manga_name=manga_name)
+                if manga_id is None:
+                    raise WriteFailed("Failed to store the manga")
+                manga_path = item["manga_path"]
+                manga_path_id = ms_db.insert_manga_path(manga_id = manga_id, website_id = website_id, manga_path = manga_path)
                 if manga_path_id is None:
-                # Insert new manga path if it doesn't exist
-                    print("manga_path_id is none")
-                    manga_path_id = ms_db.insert_manga_path(manga_id=manga_id, website_id=website_id, manga_path=manga_path)
+                    raise WriteFailed("Failed to store the manga path")
+                if ms_db.insert_manga_chapter_url_store(record = item, manga_id = manga_id, website_id = website_id, manga_path_id = manga_path_id) is None:
+                    raise WriteFailed("Failed to store the chapter URL")
+                if ms_db.insert_manga_thumbnail(manga_id, website_id, manga_path_id, thumbnail_url=item["manga_thumbnail_url"]) is None:
+                    raise WriteFailed("Failed to store the thumbnail")
+                if item.get("genres") and not ms_db.insert_manga_genres(manga_id, item["genres"]):
+                    raise WriteFailed("Failed to store the genres")
+        except WriteFailed as e:
+            return f"{e} of {manga_name}. Record was not added."
+        return "Success!"
+
+    def bulk_import(self, links: List[str], max_workers: int = SCRAPE_WINDOW, batch_size: int = REFRESH_BATCH_SIZE) -> List[Dict[str, str]]:
+        """
+        Import a whole list of manga links, e.g. an export from another tracker.
+        Links are deduplicated against each other and the library, scraped on the shared scheduler behind
+        interactive inserts and inserted in batched transactions as the scrapes complete.
 
-                chapter_url = item["chapter_url"]
-                if not ms_db.is_chapter_url_exists(manga_id, website_id, manga_path_id, chapter_url):
-                    print("new chapter url")
-                    ms_db.insert_manga_chapter_url_store(record=item, manga_id=manga_id, website_id=website_id, manga_path_id=manga_path_id)
+        Args:
+            links (List[str]): Manga page links to import.
+            max_workers (int): Maximum number of links queued for scraping at the same time.
+            batch_size (int): Number of records inserted per transaction.
 
-                # Check and insert new manga thumbnail
-                thumbnail_url = item["manga_thumbnail_url"]
-                if not ms_db.is_thumbnail_exists(manga_id, website_id, manga_path_id, thumbnail_url):
-                    print("new thumbnail url")
-                    ms_db.insert_manga_thumbnail(manga_id, website_id, manga_path_id, thumbnail_url=thumbnail_url)
+        Returns:
+            List[Dict[str, str]]: One result per submitted link with its "link", "status" and "detail".
+                                  Status is one of "added", "duplicate", "already_exists", "similar_exists",
+                                  "unsupported" or "error".
+        """
+        results = [{"link": link, "status": "", "detail": ""} for link in links]
 
-        ms_db.close_connection()
+        ms_db = MangaScraperDB()
+        ms_db.load_lookup_caches()
+        library_links = {self.normalize_link(row["full_path"]) for row in ms_db.get_website_paths()}
+        seen_links = set()
+        to_scrape = []
+        for index, link in enumerate(links):
+            normalized_link = self.normalize_link(link)
+            if normalized_link in seen_links:
+                results[index].update(status="duplicate", detail="Link appears earlier in the import")
+            elif normalized_link in library_links:
+                results[index].update(status="already_exists", detail="Link is already in the library")
+            else:
+                seen_links.add(normalized_link)
+                to_scrape.append((index, MangaRecord(id=f"new_{index}", link=link.strip(), status="Good", title="")))
+
+        manga_list = [item for _, item in to_scrape]
+        mk_scraper = MangaKakalotScraper(manga_list, archive=self.archive, offline=self.offline)
+        pending = []
+        try:
+            for position, future in self.iter_scheduled_scrapes(manga_list, mk_scraper, MANUAL_REFRESH, max_in_flight=max_workers):
+                index = to_scrape[position][0]
+                try:
+                    db_data = future.result()
+                except Exception as e:
+                    results[index].update(status="error", detail=str(e))
+                    continue
+                if db_data is None:
+                    results[index].update(status="unsupported", detail="Website not supported")
+                    continue
+                pending.append((index, db_data))
+                if len(pending) >= batch_size:
+                    self.write_import_batch(ms_db, pending, results)
+                    pending = []
+            if pending:
+                self.write_import_batch(ms_db, pending, results)
+        finally:
+            ms_db.close_connection()
+        return results
+
+    def write_import_batch(self, ms_db: MangaScraperDB, pending: List[Tuple[int, Dict[str, Any]]], results: List[Dict[str, str]]) -> None:
+        """
+        Insert one batch of imported records inside a single transaction and record the outcome of each.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection.
+            pending (List[Tuple[int, Dict[str, Any]]]): Index into results and scraped record for each link.
+            results (List[Dict[str, str]]): Per-link results, updated in place.
+        """
+        with ms_db.transaction():
+            similar_manga_ids, duplicate_indexes = ms_db.match_manga_batch([db_data["manga_name"] for _, db_data in pending])
+            for (index, db_data), similar_manga_id, duplicate_index in zip(pending, similar_manga_ids, duplicate_indexes):
+                if duplicate_index is not None:
+                    duplicate_link = results[pending[duplicate_index][0]]["link"]
+                    results[index].update(status="duplicate", detail=f"Same manga as {duplicate_link} earlier in the import")
+                    continue
+                try:
+                    message = self.insert_new_record(ms_db, db_data, similar_manga_id)
+                except Exception as e:
+                    results[index].update(status="error", detail=str(e))
+                    continue
+                if message == "Success!":
+                    results[index].update(status="added", detail=db_data["manga_name"])
+                elif similar_manga_id is not None:
+                    results[index].update(status="similar_exists", detail=message)
+                else:
+                    results[index].update(status="error", detail=message)
+
+    @staticmethod
+    def parse_import_csv(csv_text: str) -> List[str]:
+        """
+        Extract manga links from a CSV export. Uses the "link" or "url" column when there is a header,
+        otherwise the first value in each row that looks like a URL.
+
+        Args:
+            csv_text (str): Contents of the CSV file.
+
+        Returns:
+            List[str]: The links in file order.
+        """
+        rows = [row for row in csv.reader(io.StringIO(csv_text)) if row]
+        if not rows:
+            return []
+        header = [column.strip().lower() for column in rows[0]]
+        link_column = next((header.index(name) for name in ("link", "url") if name in header), None)
+        if link_column is not None:
+            return [row[link_column].strip() for row in rows[1:] if len(row) > link_column and row[link_column].strip()]
+        return [next(value.strip() for value in row if value.strip().startswith("http"))
+                for row in rows if any(value.strip().startswith("http") for value in row)]
+
+    @staticmethod
+    def normalize_link(link: str) -> str:
+        """
+        Normalise a manga link for duplicate detection, ignoring case in the domain, surrounding whitespace and trailing slashes.
+
+        Args:
+            link (str): Manga page link.
+
+        Returns:
+            str: The normalised link.
+        """
+        parsed_url = urlparse(link.strip())
+        normalized_url = parsed_url._replace(scheme=parsed_url.scheme.lower(), netloc=parsed_url.netloc.lower(), fragment="")
+        return normalized_url.geturl().rstrip('/')
+
+    def write_refresh_batch(self, ms_db: MangaScraperDB, batch: List[ScrapeResult],
+                            manga_ids: Optional[List[Optional[str]]] = None,
+                            overwrite: bool = False) -> List[Tuple[ScrapeResult, Optional[str], str]]:
+        """
+        Write one micro-batch of refreshed records inside a single transaction.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection used by the writer.
+            batch (List[ScrapeResult]): Scraped records to upsert.
+            manga_ids (Optional[List[Optional[str]]]): ID of the manga each record belongs to, when already known,
+                                                       e.g. from a refresh job. Otherwise records are matched by name.
+            overwrite (bool): Replace the stored chapter and thumbnail of each path, see overwrite_reparsed_record.
+
+        Returns:
+            List[Tuple[ScrapeResult, Optional[str], str]]: For each record, the record, its manga_id and
+                                                           "new_chapter", "unchanged" or "error".
+        """
+        outcomes = []
+        try:
+            with ms_db.transaction():
+                if manga_ids is None:
+                    manga_ids = ms_db.find_similar_manga_batch([item.manga_name for item in batch])
+                for item, manga_id in zip(batch, manga_ids):
+                    try:
+                        # A record whose writes fail is undone on its own, the rest of the batch is kept
+                        write_record = self.overwrite_reparsed_record if overwrite else self.upsert_refreshed_record
+                        with ms_db.savepoint():
+                            new_chapter = write_record(ms_db, item, manga_id)
+                        outcomes.append((item, manga_id, "new_chapter" if new_chapter else "unchanged"))
+                    except Exception as e:
+                        print(f"Error writing refreshed record {item.manga_path}: {e}")
+                        outcomes.append((item, manga_id, "error"))
+        except Exception as e:
+            # The transaction was rolled back, none of the batch was stored
+            print(f"Error committing refresh batch: {e}")
+            manga_ids = list(manga_ids or []) + [None] * (len(batch) - len(manga_ids or []))
+            return [(item, manga_id, "error") for item, manga_id in zip(batch, manga_ids)]
+        return outcomes
+
+    def upsert_refreshed_record(self, ms_db: MangaScraperDB, item: ScrapeResult, manga_id: Optional[str]) -> bool:
+        """
+        Upsert the chapter, thumbnail and genres of an existing manga from a refresh scrape.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection.
+            item (ScrapeResult): The scraped record.
+            manga_id (Optional[str]): ID of the matching manga in the database.
+
+        Returns:
+            bool: True if a new chapter URL was stored.
+
+        Raises:
+            WriteFailed: The manga or website is not in the database, or a write failed.
+        """
+        website_id = ms_db.get_website_id(item.website_url)
+        if manga_id is None or website_id is None:
+            raise WriteFailed("No matching manga or website in the database")
+        manga_path = item.manga_path
+
+        manga_path_id = ms_db.get_manga_path_id(manga_id, website_id, manga_path)
+        if manga_path_id is None:
+        # Insert new manga path if it doesn't exist
+            print("manga_path_id is none")
+            manga_path_id = ms_db.insert_manga_path(manga_id=manga_id, website_id=website_id, manga_path=manga_path)
+            if manga_path_id is None:
+                raise WriteFailed("Failed to store the manga path")
+
+        new_chapter = False
+        chapter_url = item.chapter_url
+        if not ms_db.is_chapter_url_exists(manga_id, website_id, manga_path_id, chapter_url):
+            print("new chapter url")
+            if ms_db.insert_manga_chapter_url_store(record=item.as_record(), manga_id=manga_id, website_id=website_id, manga_path_id=manga_path_id) is None:
+                raise WriteFailed("Failed to store the chapter URL")
+            new_chapter = True
+
+        # Check and insert new manga thumbnail
+        thumbnail_url = item.manga_thumbnail_url
+        if not ms_db.is_thumbnail_exists(manga_id, website_id, manga_path_id, thumbnail_url):
+            print("new thumbnail url")
+            if ms_db.insert_manga_thumbnail(manga_id, website_id, manga_path_id, thumbnail_url=thumbnail_url) is None:
+                raise WriteFailed("Failed to store the thumbnail")
+
+        # Genres already stored are skipped by the stored proc
+        if item.genres and not ms_db.insert_manga_genres(manga_id, list(item.genres)):
+            raise WriteFailed("Failed to store the genres")
+        return new_chapter
+
+    def overwrite_reparsed_record(self, ms_db: MangaScraperDB, item: ScrapeResult, manga_id: Optional[str]) -> bool:
+        """
+        Store a record re-parsed from the HTML archive over the stored one, correcting data a broken parser wrote.
+        The chapter of the path is overwritten and its thumbnail replaced. Genres are only added, as a manga's
+        genres are shared with its paths on other websites.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection.
+            item (ScrapeResult): The re-parsed record.
+            manga_id (Optional[str]): ID of the matching manga in the database.
+
+        Returns:
+            bool: True if the stored chapter URL changed.
+
+        Raises:
+            WriteFailed: The manga, website or manga path is not in the database, or a write failed.
+        """
+        website_id = ms_db.get_website_id(item.website_url)
+        if manga_id is None or website_id is None:
+            raise WriteFailed("No matching manga or website in the database")
+        manga_path_id = ms_db.get_manga_path_id(manga_id, website_id, item.manga_path)
+        if manga_path_id is None:
+            raise WriteFailed("No matching manga path in the database")
+
+        changed = not ms_db.is_chapter_url_exists(manga_id, website_id, manga_path_id, item.chapter_url)
+        # The chapter store keeps one row per manga path, the stored proc updates it in place
+        if ms_db.insert_manga_chapter_url_store(record=item.as_record(), manga_id=manga_id, website_id=website_id, manga_path_id=manga_path_id) is None:
+            raise WriteFailed("Failed to store the chapter URL")
+        if ms_db.replace_manga_thumbnail(manga_id, website_id, manga_path_id, item.manga_thumbnail_url) is None:
+            raise WriteFailed("Failed to store the thumbnail")
+        if item.genres and not ms_db.insert_manga_genres(manga_id, list(item.genres)):
+            raise WriteFailed("Failed to store the genres")
+        return changed
 
     def delete_record(self, manga_list: List[MangaRecord]) -> List[Dict[str, str]]:
         """
@@ -177,61 +562,336 @@ class MangaScraperService:
             # This frontend data is then sent as part of the response when updating records
             for item in delete_list:
                 try:
-                    with ms_db.conn.cursor() as cur:
-                        cur.execute("CALL delete_manga_record(%s)", (item.id,))
-                        ms_db.conn.commit()
+                    ms_db.delete_manga(item.id)
                 except Exception as e:
                     error_list.append({"id": item.id, "error": str(e)})
-                    ms_db.conn.rollback()
 
             ms_db.close_connection()
         return error_list
 
-    def refresh_backend_data(self) -> str:
+    def reparse_archive(self, max_workers: int = 8, batch_size: int = REFRESH_BATCH_SIZE) -> Dict[str, int]:
         """
-        This method pulls in the data and upserts any new data into bulk insert
+        Rebuild the scraped data of every manga in the library from the HTML archive, without any network traffic.
+        Used after fixing a parser for changed markup. Pages are parsed in parallel and written through the same
+        micro-batch writer as a refresh, overwriting the stored chapter and thumbnail of each path. Records are
+        dated with the time their page was fetched, not the time of the re-parse.
+
+        Args:
+            max_workers (int): Number of pages parsed at once.
+            batch_size (int): Number of records written per transaction.
+
+        Returns:
+            Dict[str, int]: Number of records per outcome ("new_chapter" where the stored chapter was corrected,
+                            "unchanged" or "error").
         """
+        if self.archive is None:
+            raise ValueError("Re-parsing requires an HTML archive")
+        offline_service = copy.copy(self)
+        offline_service.offline = True
+        offline_service.scrape_flight = SingleFlight() # Never share results with live network scrapes
+
         manga_list = self.get_websites_and_paths()
-        processed_data, error_list = self.scrape_existing_records(manga_list)
+        mk_scraper = MangaKakalotScraper(manga_list, archive=self.archive, offline=True)
+        counts = {"new_chapter": 0, "unchanged": 0, "error": 0}
+        ms_db = MangaScraperDB()
+        ms_db.load_lookup_caches()
+        batch = []
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(offline_service.scrape_item, item, manga_list, mk_scraper): item for item in manga_list}
+                for future in as_completed(futures):
+                    try:
+                        db_data = future.result()
+                    except Exception as e:
+                        print(f"Error re-parsing {futures[future].link}: {e}")
+                        db_data = None
+                    if db_data is None:
+                        counts["error"] += 1
+                        continue
+                    fetched_at = self.archive.latest_fetched_at(futures[future].link)
+                    if fetched_at is not None:
+                        db_data["date_checked"] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(fetched_at))
+                    batch.append(ScrapeResult.from_record(db_data))
+                    if len(batch) >= batch_size:
+                        for _, _, status in self.write_refresh_batch(ms_db, batch, overwrite=True):
+                            counts[status] += 1
+                        batch = []
+            if batch:
+                for _, _, status in self.write_refresh_batch(ms_db, batch, overwrite=True):
+                    counts[status] += 1
+        finally:
+            ms_db.close_connection()
+        return counts
+
+    def refresh_backend_data(self, batch_size: int = REFRESH_BATCH_SIZE, sweep: bool = True,
+                             deadline_seconds: Optional[float] = None) -> str:
+        """
+        This method pulls in the data and streams it into the database.
+        Scraping runs on a background thread while the writer flushes completed records in micro-batches,
+        so writes overlap with scraping and only a bounded number of records is held in memory.
 
-        # Handle the errors if needed
-        for error in error_list:
-            print(f"Error processing {error}")
+        Args:
+            batch_size (int): Number of records written per transaction.
+            sweep (bool): Only scrape series listed as updated since the last completed refresh by their website.
+            deadline_seconds (Optional[float]): Time budget for the run. Unfinished series are resumed by the next refresh.
 
-        self.bulk_insert_record(processed_data, refresh_data=True)
-        response = "Good"
+        Returns:
+            str: "Good" if every series was refreshed, "Partial" if the run stopped at its deadline.
+        """
+        events = self.iter_refresh_events(batch_size, sweep=sweep, deadline_seconds=deadline_seconds)
+        while True:
+            try:
+                event = next(events)
+            except StopIteration as finished:
+                run = finished.value
+                break
+            # Handle the errors if needed
+            if event["status"] == "error":
+                print(f"Error processing {event['link']}: {event['error']}")
+
+        response = "Good" if run["run_status"] == "completed" else "Partial"
         return response
 
-    def get_websites_and_paths(self) -> List[MangaRecord]:
+    def iter_refresh_events(self, batch_size: int = REFRESH_BATCH_SIZE, sweep: bool = True,
+                            deadline_seconds: Optional[float] = None) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """
+        Run a refresh and yield one event per manga as its result lands.
+        Scrape failures are yielded immediately, written records are yielded once their batch has been committed.
+
+        Every written batch is checkpointed in the database. A run that crashes, stops at its deadline with
+        everything finished so far committed, or failed on some series, is resumed by the next refresh, which
+        skips the checkpointed series. Only a run in which every series succeeded is completed, as the next
+        sweep only looks back to the start of the last completed run.
+
+        Args:
+            batch_size (int): Number of records written per transaction.
+            sweep (bool): Only scrape series listed as updated since the last completed refresh by their website.
+            deadline_seconds (Optional[float]): Time budget for the run, None to run until every series is done.
+
+        Yields:
+            Dict[str, Any]: Event with the manga path id, link, status ("new_chapter", "unchanged" or "error"),
+                            the frontend rows for new chapters and an error message if any.
+
+        Returns:
+            Dict[str, Any]: The run_id and run_status ("completed" or "partial") of the run.
+        """
+        deadline = time.monotonic() + deadline_seconds if deadline_seconds is not None else None
+        ms_db = MangaScraperDB()
+        run_id = ms_db.start_refresh_run()
+        finished_paths = ms_db.get_refresh_checkpoints(run_id)
+        manga_list = [item for item in self.get_websites_and_paths() if item.id not in finished_paths]
+        if finished_paths:
+            print(f"Resuming refresh run {run_id}, {len(finished_paths)} series already done")
+        if sweep:
+            manga_list = self.filter_updated_records(manga_list, ms_db.get_last_completed_refresh_start())
+        results = self.prefetch(self.iter_scrape_records(manga_list, priority=MANUAL_REFRESH),
+                                max_buffered=batch_size * 2, deadline=deadline)
+
+        ms_db.load_lookup_caches()
+        items, batch = [], []
+        run_status = "partial"
+        processed = 0
+        failed = 0
+        try:
+            for item, db_data, error in results:
+                processed += 1
+                if error is not None:
+                    failed += 1
+                    yield self.refresh_event(item, "error", error=error)
+                    continue
+                items.append(item)
+                batch.append(db_data)
+                if len(batch) >= batch_size:
+                    for event in self.flush_refresh_batch(ms_db, items, batch, run_id=run_id):
+                        failed += event["status"] == "error"
+                        yield event
+                    items, batch = [], []
+            if batch:
+                for event in self.flush_refresh_batch(ms_db, items, batch, run_id=run_id):
+                    failed += event["status"] == "error"
+                    yield event
+            # The scrape results stop early when the deadline passes
+            run_status = "completed" if processed == len(manga_list) and not failed else "partial"
+        finally:
+            results.close()
+            ms_db.finish_refresh_run(run_id, run_status)
+            ms_db.close_connection()
+        return {"run_id": run_id, "run_status": run_status}
+
+    def flush_refresh_batch(self, ms_db: MangaScraperDB, items: List[RefreshTarget], batch: List[ScrapeResult],
+                            run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Write a micro-batch and yield a refresh event for each record in it.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection used by the writer.
+            items (List[RefreshTarget]): Refresh targets the batch was scraped from.
+            batch (List[ScrapeResult]): Scraped records, in the same order as items.
+            run_id (Optional[str]): Refresh run the written records are checkpointed under.
+
+        Yields:
+            Dict[str, Any]: One refresh event per record.
+        """
+        outcomes = self.write_refresh_batch(ms_db, batch)
+        if run_id is not None:
+            ms_db.insert_refresh_checkpoints(run_id, [item.id for item, (_, _, status) in zip(items, outcomes) if status != "error"])
+        updated_ids = [manga_id for _, manga_id, status in outcomes if status == "new_chapter"]
+        rows_by_id = {}
+        for row in ms_db.get_frontend_data_by_ids(updated_ids) if updated_ids else []:
+            rows_by_id.setdefault(str(row["id"]), []).append(row)
+
+        for item, (_, manga_id, status) in zip(items, outcomes):
+            yield self.refresh_event(item, status, manga_id=manga_id,
+                                     records=rows_by_id.get(str(manga_id), []))
+
+    @staticmethod
+    def refresh_event(item: RefreshTarget, status: str, manga_id: Optional[str] = None,
+                      records: Optional[List[Dict[str, Any]]] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a refresh progress event for a single manga.
+
+        Args:
+            item (RefreshTarget): The refresh target.
+            status (str): "new_chapter", "unchanged" or "error".
+            manga_id (Optional[str]): ID of the manga the record was written to.
+            records (Optional[List[Dict[str, Any]]]): Updated rows in the get_frontend_data format.
+            error (Optional[str]): Error message for failed records.
+
+        Returns:
+            Dict[str, Any]: The event payload.
+        """
+        return {
+            "manga_path_id": item.id,
+            "manga_id": manga_id,
+            "title": item.title,
+            "link": item.link,
+            "status": status,
+            "records": records or [],
+            "error": error
+        }
+
+    @staticmethod
+    def prefetch(iterable: Iterable[Any], max_buffered: int, deadline: Optional[float] = None) -> Iterator[Any]:
+        """
+        Consume an iterable on a background thread, handing values over through a bounded queue.
+        The producer blocks once max_buffered values are waiting, so it never runs too far ahead of the consumer.
+
+        Args:
+            iterable (Iterable[Any]): Values to produce, e.g. a scraping generator.
+            max_buffered (int): Maximum number of values held between producer and consumer.
+            deadline (Optional[float]): time.monotonic() value after which iteration stops early, even while
+                                        the producer is stuck on a slow value.
+
+        Yields:
+            Any: Values from the iterable, in order.
+        """
+        buffer = queue.Queue(maxsize=max(1, max_buffered))
+        stop = threading.Event()
+        done = object()
+
+        def put(value: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    buffer.put(value, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for value in iterable:
+                    if not put((value, None)):
+                        return
+            except Exception as e:
+                put((done, e))
+                return
+            finally:
+                # Let a generator clean up, e.g. cancel queued scrapes, when the consumer stops early
+                if hasattr(iterable, "close"):
+                    iterable.close()
+            put((done, None))
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    stop.set() # Values produced before the deadline are still handed over
+                try:
+                    if deadline is None:
+                        value, error = buffer.get()
+                    else:
+                        value, error = buffer.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    return
+                if value is done:
+                    if error is not None:
+                        raise error
+                    return
+                yield value
+        finally:
+            stop.set()
+
+    def filter_updated_records(self, manga_list: List[RefreshTarget], since: Optional[datetime]) -> List[RefreshTarget]:
+        """
+        Change detection stage of a refresh. Crawls the latest-updates listing of each website once, back to the
+        start of the last completed refresh, and keeps only the series that appear on it, so full scrapes only run
+        for series that actually updated since. Websites without a listing, or whose listing cannot be read back
+        that far, keep all of their series, as do all websites when no refresh has completed yet.
+
+        Args:
+            manga_list (List[RefreshTarget]): Refresh targets from get_websites_and_paths.
+            since (Optional[datetime]): Start of the last completed refresh, None if unknown.
+
+        Returns:
+            List[RefreshTarget]: The refresh targets that need a full scrape.
+        """
+        listing_scrapers = {
+            "chapmanganato": MangaKakalotScraper(manga_list, archive=self.archive, offline=self.offline),
+            "webtoons": webtoonScraper(manga_list, archive=self.archive, offline=self.offline)
+        }
+        updated_keys = {}
+        filtered_list = []
+        for item in manga_list:
+            item_base_url = MangaScraper.get_base_url(item.link)
+            site = next((name for name in listing_scrapers if name in item_base_url), None)
+            if site is None:
+                filtered_list.append(item)
+                continue
+
+            if site not in updated_keys:
+                try:
+                    updated_keys[site] = listing_scrapers[site].get_updated_keys(since)
+                except Exception as e:
+                    print(f"Error reading latest updates for {site}: {e}")
+                    updated_keys[site] = None
+
+            if updated_keys[site] is None or listing_scrapers[site].listing_key(item.link) in updated_keys[site]:
+                filtered_list.append(item)
+
+        print(f"Latest updates sweep kept {len(filtered_list)} of {len(manga_list)} series")
+        return filtered_list
+
+    def get_websites_and_paths(self) -> List[RefreshTarget]:
         """
         Query the database to get a list of websites and their paths.
+        Refresh targets come from manga_path_table, so a path is scraped once however many users follow it
+        and the result reaches each follower through user_follow_table.
 
         Returns:
-            List[MangaRecord]: A list of MangaRecord objects with website data.
+            List[RefreshTarget]: One refresh target per manga path.
         """
         ms_db = MangaScraperDB()
         manga_list = []
 
-        try:
-            with ms_db.conn.cursor() as cur:
-                cur.execute("SELECT * FROM get_website_paths()")
-                rows = cur.fetchall()
-
-                for row in rows:
-                    manga_list.append(MangaRecord(
-                        id=str(row[0]),
-                        lastChecked="N/A",
-                        link=row[3],
-                        status='Good',
-                        title=row[2]  
-                    ))
-        except Exception as e:
-            print(f"Error querying websites: {e}")
+        for row in ms_db.get_website_paths():
+            manga_list.append(RefreshTarget(id=str(row["manga_path_id"]), link=row["full_path"], title=row["manga_name"]))
 
         ms_db.close_connection()
         return manga_list
 
-    def scrape_existing_records(self, manga_list: List[MangaRecord]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    def scrape_existing_records(self, manga_list: List[RefreshTarget]) -> Tuple[List[ScrapeResult], List[str]]:
         """
         Scrape existing records in the database and update them as necessary
 
@@ -240,20 +900,35 @@ class MangaScraperService:
         """
         error_list = [] # List to store websites that are not supported
         output_list = []
-        ms = MangaScraper(manga_list)
-        mk_scraper = MangaKakalotScraper(manga_list)
-        for item in ms.manga_list:
-            item_base_url = ms.get_base_url(item.link)
-            if "viz" in item_base_url:
-                db_data = self.viz_scrape(item, manga_list)
-                output_list.append(db_data)
-            elif "webtoons" in item_base_url:
-                db_data = self.webtoon_scrape(item, manga_list, mk_scraper)
-                output_list.append(db_data)
-            elif "chapmanganato" in item_base_url:
-                db_data = self.mangakakalot_scrape(item, manga_list)
-                output_list.append(db_data)
-            else:
+        for item, db_data, error in self.iter_scrape_records(manga_list):
+            if error is not None:
                 error_list.append(item.link)
+            else:
+                output_list.append(db_data)
 
-        return (output_list, error_list)
\ No newline at end of file
+        return (output_list, error_list)
+
+    def iter_scrape_records(self, manga_list: List[RefreshTarget], priority: int = BACKGROUND) -> Iterator[Tuple[RefreshTarget, Optional[ScrapeResult], Optional[str]]]:
+        """
+        Scrape existing records on the shared scheduler, yielding each result as soon as it is available.
+        A failure on one record is reported for that record instead of aborting the rest of the run.
+
+        Args:
+            manga_list (List[RefreshTarget]): Refresh targets from the backend.
+            priority (int): Scheduling class of the scrapes, MANUAL_REFRESH for refreshes started by a user.
+
+        Yields:
+            Tuple[RefreshTarget, Optional[ScrapeResult], Optional[str]]: The target, its scraped data and an error message if scraping failed.
+        """
+        mk_scraper = MangaKakalotScraper(manga_list, archive=self.archive, offline=self.offline)
+        for index, future in self.iter_scheduled_scrapes(manga_list, mk_scraper, priority):
+            item = manga_list[index]
+            try:
+                db_data = future.result()
+            except Exception as e:
+                yield item, None, str(e)
+                continue
+            if db_data is None:
+                yield item, None, "Website not supported"
+            else:
+                yield item, ScrapeResult.from_record(db_data), None
\ No newline at end of file
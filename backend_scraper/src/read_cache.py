@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ReadCache:
+    """
+    Process-wide cache of whole read results, e.g. the /get_data rows, shared by every request of an API worker.
+    It is only used while enabled, which the cache listener does once it is subscribed to database change
+    notifications, so a worker never serves results that other workers or refresh processes have changed.
+    Entries also expire after ttl_seconds, bounding staleness from replicas that lag behind the notification.
+    """
+    def __init__(self, ttl_seconds: float = 30):
+        """
+        Args:
+            ttl_seconds (float): Seconds an entry is served before it is read again
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generation = 0 # Bumped on every invalidation, results read before it are not stored
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Tuple[Optional[Any], int]:
+        """
+        Cached value for a key
+
+        Args:
+            key (str): Name of the cached read, e.g. "get_frontend_data"
+
+        Returns:
+            Tuple[Optional[Any], int]: The value or None if it is not cached, and the generation to pass to put
+        """
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                return entry[1], self._generation
+            self.misses += 1
+            return None, self._generation
+
+    def put(self, key: str, value: Any, generation: int):
+        """
+        Store a value read after get returned generation. Dropped if the cache was invalidated in between,
+        as the value may predate the change.
+        """
+        with self._lock:
+            if self.enabled and generation == self._generation:
+                self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self):
+        """
+        Drop every entry, e.g. when the library has changed
+        """
+        with self._lock:
+            self._entries = {}
+            self._generation += 1
+            self.invalidations += 1
+
+    def set_enabled(self, enabled: bool):
+        """
+        Turn caching on or off. Entries are dropped either way, as changes may have been missed while off.
+        """
+        with self._lock:
+            self.enabled = enabled
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit and invalidation counters
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,158 @@
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from typing import List, Dict, Any, Optional
+from data_models.refresh_records import RefreshTarget
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_service import MangaScraperService
+
+
+class RefreshWorker:
+    """
+    Worker that claims refresh jobs from refresh_job_table and processes them with the existing scrapers.
+    Any number of workers, on one machine or many, can drain the same run because claims use FOR UPDATE SKIP LOCKED.
+    A background thread heartbeats the worker's leases so long scrapes are not handed to another worker.
+    """
+    def __init__(self, worker_id: Optional[str] = None, batch_size: int = 10, lease_seconds: int = 300,
+                 heartbeat_seconds: int = 60, idle_sleep: float = 5.0, service: Optional[MangaScraperService] = None):
+        """
+        Args:
+            worker_id (Optional[str]): Unique name of the worker. Defaults to host, pid and a random suffix.
+            batch_size (int): Number of jobs claimed at a time
+            lease_seconds (int): How long claimed jobs stay reserved without a heartbeat
+            heartbeat_seconds (int): How often leases are extended, must be well below lease_seconds
+            idle_sleep (float): Seconds to wait before polling again when no jobs are available
+            service (Optional[MangaScraperService]): Service providing the scrape and write logic
+        """
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_sleep = idle_sleep
+        self.service = service or MangaScraperService()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Ask the worker to stop after its current batch
+        """
+        self._stop.set()
+
+    def run(self, stop_when_idle: bool = False) -> int:
+        """
+        Claim and process batches until stopped.
+
+        Args:
+            stop_when_idle (bool): Return as soon as there are no jobs to claim instead of polling
+
+        Returns:
+            int: Number of jobs processed by this worker
+        """
+        ms_db = MangaScraperDB()
+        ms_db.load_lookup_caches()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        processed = 0
+        try:
+            while not self._stop.is_set():
+                jobs = ms_db.claim_refresh_jobs(self.worker_id, self.batch_size, self.lease_seconds)
+                if not jobs:
+                    if stop_when_idle:
+                        break
+                    self._stop.wait(self.idle_sleep)
+                    continue
+                self.process_batch(ms_db, jobs)
+                processed += len(jobs)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            ms_db.close_connection()
+        return processed
+
+    def process_batch(self, ms_db: MangaScraperDB, jobs: List[Dict[str, Any]]) -> None:
+        """
+        Scrape a batch of claimed jobs, write the results as one micro-batch and finish each job.
+
+        Args:
+            ms_db (MangaScraperDB): Open database connection of this worker
+            jobs (List[Dict[str, Any]]): Jobs returned by claim_refresh_jobs
+        """
+        manga_list = [RefreshTarget(id=str(job["manga_path_id"]), link=job["full_path"], title=job["manga_name"]) for job in jobs]
+        jobs_by_path = {str(job["manga_path_id"]): job for job in jobs}
+
+        scraped_jobs, batch = [], []
+        for item, db_data, error in self.service.iter_scrape_records(manga_list):
+            job = jobs_by_path[item.id]
+            if error is not None:
+                ms_db.finish_refresh_job(job["job_id"], self.worker_id, succeeded=False, error=error)
+            else:
+                scraped_jobs.append(job)
+                batch.append(db_data)
+
+        if not batch:
+            return
+        # Jobs already know their manga, the scraped name is not matched again
+        outcomes = self.service.write_refresh_batch(ms_db, batch, manga_ids=[str(job["manga_id"]) for job in scraped_jobs])
+        for job, (_, _, status) in zip(scraped_jobs, outcomes):
+            if status == "error":
+                ms_db.finish_refresh_job(job["job_id"], self.worker_id, succeeded=False, error="Failed to write record")
+            else:
+                ms_db.finish_refresh_job(job["job_id"], self.worker_id, succeeded=True)
+
+    def _heartbeat_loop(self):
+        """
+        Periodically extend the leases of claimed jobs. Uses its own connection as the main one is busy writing.
+        """
+        ms_db = MangaScraperDB()
+        try:
+            while not self._stop.wait(self.heartbeat_seconds):
+                ms_db.heartbeat_refresh_jobs(self.worker_id, self.lease_seconds)
+        finally:
+            ms_db.close_connection()
+
+
+def run_worker(batch_size: int, lease_seconds: int, heartbeat_seconds: int, stop_when_idle: bool) -> None:
+    """
+    Entry point for a single worker process
+
+    Args:
+        batch_size (int): Number of jobs claimed at a time
+        lease_seconds (int): How long claimed jobs stay reserved without a heartbeat
+        heartbeat_seconds (int): How often leases are extended
+        stop_when_idle (bool): Exit once no jobs are left to claim
+    """
+    worker = RefreshWorker(batch_size=batch_size, lease_seconds=lease_seconds, heartbeat_seconds=heartbeat_seconds)
+    processed = worker.run(stop_when_idle=stop_when_idle)
+    print(f"Worker {worker.worker_id} processed {processed} jobs")
+
+
+if __name__ == "__main__":
+    # Run from the backend_scraper directory, e.g. to enqueue a run and drain it with four local workers:
+    #   python -m src.refresh_worker --enqueue --processes 4 --stop-when-idle
+    parser = argparse.ArgumentParser(description="Process refresh jobs from the PostgreSQL work queue")
+    parser.add_argument("--enqueue", action="store_true", help="Create a new refresh run before starting")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per job for an enqueued run")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes to start")
+    parser.add_argument("--batch-size", type=int, default=10, help="Jobs claimed per batch")
+    parser.add_argument("--lease-seconds", type=int, default=300, help="Lease length for claimed jobs")
+    parser.add_argument("--heartbeat-seconds", type=int, default=60, help="Interval between lease heartbeats")
+    parser.add_argument("--stop-when-idle", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    if args.enqueue:
+        ms_db = MangaScraperDB()
+        print(f"Created refresh run {ms_db.create_refresh_run(max_attempts=args.max_attempts)}")
+        ms_db.close_connection()
+
+    worker_args = (args.batch_size, args.lease_seconds, args.heartbeat_seconds, args.stop_when_idle)
+    if args.processes == 1:
+        run_worker(*worker_args)
+    else:
+        processes = [multiprocessing.Process(target=run_worker, args=worker_args) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
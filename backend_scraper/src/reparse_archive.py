@@ -0,0 +1,19 @@
+import argparse
+from src.html_archive import HtmlArchive
+from src.manga_scraper_service import MangaScraperService
+
+
+if __name__ == "__main__":
+    # Run from the backend_scraper directory after fixing a parser, e.g.:
+    #   python -m src.reparse_archive --archive-dir ./html_archive --workers 8
+    parser = argparse.ArgumentParser(description="Rebuild scraped data from archived pages without network traffic")
+    parser.add_argument("--archive-dir", required=True, help="Directory of the HTML archive")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pages parsed at once")
+    parser.add_argument("--batch-size", type=int, default=25, help="Records written per transaction")
+    args = parser.parse_args()
+
+    archive = HtmlArchive(args.archive_dir)
+    service = MangaScraperService(archive=archive)
+    counts = service.reparse_archive(max_workers=args.workers, batch_size=args.batch_size)
+    print(f"Re-parsed archive: {counts['new_chapter']} new chapters, {counts['unchanged']} unchanged, {counts['error']} errors")
+    archive.close()
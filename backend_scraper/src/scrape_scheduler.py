@@ -0,0 +1,135 @@
+import bisect
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+# Priority classes, lower runs first
+INTERACTIVE = 0 # A user waiting on the result, e.g. adding a manga through the modal
+MANUAL_REFRESH = 1 # Refreshes and imports started from the frontend
+BACKGROUND = 2 # Queue workers and other unattended runs
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", MANUAL_REFRESH: "manual_refresh", BACKGROUND: "background"}
+
+
+class ScrapeScheduler:
+    """
+    Runs scrapes on a shared thread pool, always starting the highest priority work first.
+    Each website gets its own concurrency limit, and part of the total and of each site's capacity is reserved for
+    interactive work, so a user adding a manga never waits behind a large refresh of the same site.
+    Work already running is never interrupted, it only loses its place in the queue.
+    """
+    def __init__(self, max_workers: int = 8, site_capacity: int = 4, reserved_interactive: int = 1):
+        """
+        Args:
+            max_workers (int): Scrapes running at once across all websites
+            site_capacity (int): Scrapes running at once against a single website
+            reserved_interactive (int): Slots, overall and per website, only interactive work may use
+        """
+        if not 0 <= reserved_interactive < min(max_workers, site_capacity):
+            raise ValueError("reserved_interactive must leave capacity for other work")
+        self.max_workers = max_workers
+        self.site_capacity = site_capacity
+        self.reserved_interactive = reserved_interactive
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+        self._lock = threading.Lock()
+        self._sequence = itertools.count() # Keeps first in, first out order within a priority
+        self._pending: List[Tuple[int, int, str, Callable[[], Any], Future]] = []
+        self._running_total = 0
+        self._running_by_site: Dict[str, int] = {}
+
+    def submit(self, site: str, priority: int, fn: Callable[[], Any]) -> Future:
+        """
+        Queue a scrape
+
+        Args:
+            site (str): Website the scrape fetches from, e.g. the netloc of the manga link
+            priority (int): INTERACTIVE, MANUAL_REFRESH or BACKGROUND
+            fn (Callable[[], Any]): Function performing the scrape
+
+        Returns:
+            Future: Resolves to the result of fn. Cancelling it before it starts removes it from the queue.
+        """
+        future = Future()
+        with self._lock:
+            bisect.insort(self._pending, (priority, next(self._sequence), site, fn, future), key=lambda entry: entry[:2])
+        self._dispatch()
+        return future
+
+    def _limits(self, priority: int) -> Tuple[int, int]:
+        """
+        Overall and per website concurrency available to a priority class
+        """
+        if priority == INTERACTIVE:
+            return self.max_workers, self.site_capacity
+        return self.max_workers - self.reserved_interactive, self.site_capacity - self.reserved_interactive
+
+    def _dispatch(self):
+        """
+        Start every queued scrape that has capacity, highest priority first
+        """
+        to_start = []
+        with self._lock:
+            remaining = []
+            for entry in self._pending:
+                priority, _, site, _, future = entry
+                if future.cancelled():
+                    continue
+                total_limit, site_limit = self._limits(priority)
+                if self._running_total < total_limit and self._running_by_site.get(site, 0) < site_limit:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    self._running_total += 1
+                    self._running_by_site[site] = self._running_by_site.get(site, 0) + 1
+                    to_start.append(entry)
+                else:
+                    remaining.append(entry)
+            self._pending = remaining
+
+        for entry in to_start:
+            self._executor.submit(self._run, entry)
+
+    def _run(self, entry: Tuple[int, int, str, Callable[[], Any], Future]):
+        """
+        Run a scrape on a pool thread and free its slot afterwards
+        """
+        _, _, site, fn, future = entry
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running_total -= 1
+                self._running_by_site[site] -= 1
+                if not self._running_by_site[site]:
+                    del self._running_by_site[site]
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current load of the scheduler
+
+        Returns:
+            Dict[str, Any]: Running scrapes overall and per website, and queued scrapes per priority class
+        """
+        with self._lock:
+            pending = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _, _, future in self._pending:
+                if not future.cancelled():
+                    pending[PRIORITY_NAMES[priority]] += 1
+            return {
+                "running": self._running_total,
+                "running_by_site": dict(self._running_by_site),
+                "pending": pending
+            }
+
+    def shutdown(self):
+        """
+        Cancel queued scrapes and wait for running ones to finish
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for entry in pending:
+            entry[4].cancel()
+        self._executor.shutdown(wait=True)
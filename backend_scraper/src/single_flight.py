@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """
+    A call in flight and the result its waiters will receive
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution.
+    The first caller for a key runs the function; callers arriving while it is running wait and receive the same
+    result, or the same exception. Nothing is cached: once a call finishes the next caller for the key runs it again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0 # Callers that joined a call already in flight instead of running their own
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the call already running under the same key
+
+        Args:
+            key (Hashable): Identity of the work, e.g. ("record", normalized URL)
+            fn (Callable[[], Any]): Function performing the work
+
+        Returns:
+            Any: The result of the shared call. It is the same object for every caller, copy it before mutating.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """
+        Number of keys currently being worked on
+        """
+        with self._lock:
+            return len(self._calls)
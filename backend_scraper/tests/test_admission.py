@@ -0,0 +1,67 @@
+import threading
+import pytest
+from src.admission import AdmissionRejected, InsertQueue, RefreshCoordinator, RefreshRun
+
+
+def test_insert_queue_rejects_when_full():
+    insert_queue = InsertQueue(max_running=1, max_queued=1, retry_after_seconds=7)
+    release = threading.Event()
+    running = insert_queue.submit(release.wait)
+    queued = insert_queue.submit(lambda: "inserted")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        insert_queue.submit(lambda: "inserted")
+    assert rejected.value.retry_after == 7
+    assert insert_queue.stats()["rejected"] == 1
+
+    release.set()
+    running.result(timeout=2)
+    assert queued.result(timeout=2) == "inserted"
+    # Finished jobs free their slots
+    assert insert_queue.submit(lambda: "inserted").result(timeout=2) == "inserted"
+
+
+def test_refresh_requests_join_the_run_in_flight():
+    coordinator = RefreshCoordinator()
+    release = threading.Event()
+    starts = []
+
+    def refresh():
+        starts.append(1)
+        yield {"manga_path_id": "1", "status": "unchanged"}
+        release.wait()
+        yield {"manga_path_id": "2", "status": "new_chapter"}
+        return {"run_id": "run", "run_status": "completed"}
+
+    first = coordinator.start_or_join(refresh)
+    second = coordinator.start_or_join(refresh)
+    assert second is first
+    release.set()
+
+    assert [event["manga_path_id"] for event in second.subscribe()] == ["1", "2"]
+    assert first.result.result(timeout=2)["run_status"] == "completed"
+    assert starts == [1]
+    assert coordinator.stats() == {"in_flight": False, "started": 1, "joined": 1}
+
+    # Once finished, the next request starts a new run
+    release.set()
+    coordinator.start_or_join(refresh).result.result(timeout=2)
+    assert starts == [1, 1]
+
+
+def test_finished_runs_keep_a_bounded_tail_and_are_released():
+    coordinator = RefreshCoordinator()
+
+    def refresh():
+        for index in range(10):
+            yield {"manga_path_id": str(index), "status": "unchanged"}
+        return {"run_id": "run", "run_status": "completed"}
+
+    run = coordinator.start_or_join(refresh)
+    assert len(list(run.subscribe())) == 10 # Returns once the run, and so its done callbacks, have finished
+    assert coordinator._current is None
+
+    late = RefreshRun(refresh(), max_replay=3)
+    late.start()
+    late.result.result(timeout=2)
+    assert [event["manga_path_id"] for event in late.subscribe()] == ["7", "8", "9"]
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+MANGA_ID = uuid.UUID("5f0c6a52-52c5-4a7b-9a51-0d2f1c3e4b6a")
+WEBSITE_ID = uuid.UUID("0b8e7f7e-3f1d-4c8e-8a0e-6f3c9b2d1a55")
+# Rows of each read as asyncpg returns them, UUID columns as uuid.UUID
+ROWS = {
+    "SELECT * FROM get_manga_data()": [
+        (MANGA_ID, "Solo Leveling", "https://chapmanganato.to/manga-1/chapter-2", datetime(2024, 1, 2, 15, 30),
+         "https://img.example.com/1.jpg", 200, "2")
+    ],
+    "SELECT * FROM get_manga_bookmarks()": [
+        (MANGA_ID, "Solo Leveling", "https://chapmanganato.to/manga-1", datetime(2024, 1, 2, 15, 30, 5), 200)
+    ],
+    "SELECT * FROM get_supported_websites()": [
+        (WEBSITE_ID, "Manganato", "https://chapmanganato.to/", 200, "2024-01-02")
+    ]
+}
+
+
+class FakeAcquire:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def fetch(self, query, *args):
+        return ROWS[query]
+
+
+class FakePool:
+    def acquire(self):
+        return FakeAcquire()
+
+
+class FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        # psycopg2 returns UUID columns as strings
+        self.rows = [tuple(str(value) if isinstance(value, uuid.UUID) else value for value in row) for row in ROWS[query]]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    closed = False
+
+    def cursor(self):
+        return FakeCursor()
+
+
+@pytest.fixture
+def both_layers():
+    settings = {"host": "primary", "database": "manga", "user": "manga", "password": "secret"}
+    ms_db = MangaScraperDB()
+    ms_db._settings = settings
+    ms_db._conn = FakeConnection()
+    async_db = AsyncMangaScraperDB()
+    async_db.settings = settings
+    async_db.pool = FakePool()
+    return ms_db, async_db
+
+
+def test_async_reads_return_the_same_rows_as_the_sync_reads(both_layers):
+    ms_db, async_db = both_layers
+    for method in ["get_frontend_data", "get_bookmarks_data", "get_supported_websites"]:
+        assert asyncio.run(getattr(async_db, method)()) == getattr(ms_db, method)(), method
+
+
+def test_get_data_rows_keep_their_keys_and_date_format(both_layers):
+    _, async_db = both_layers
+    assert asyncio.run(async_db.get_frontend_data()) == [{
+        "id": str(MANGA_ID),
+        "title": "Solo Leveling",
+        "link": "https://chapmanganato.to/manga-1/chapter-2",
+        "lastUpdated": "2024-01-02",
+        "imageUrl": "https://img.example.com/1.jpg",
+        "status": 200,
+        "chapter_number": "2"
+    }]
+    assert asyncio.run(async_db.get_bookmarks_data())[0]["lastUpdated"] == "2024-01-02 15:30:05"
@@ -0,0 +1,52 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+import main
+from src.cache_listener import CacheListener
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+BOOTSTRAP_DATA = {
+    "manga_data": [{"id": "m1", "title": "Solo Leveling", "link": "https://chapmanganato.to/manga-1/chapter-2",
+                    "lastUpdated": "2024-01-01", "imageUrl": "https://img.example.com/1.jpg", "status": 200,
+                    "chapter_number": "2"}],
+    "bookmarks_data": [{"id": "m1", "title": "Solo Leveling", "link": "https://chapmanganato.to/manga-1",
+                        "lastUpdated": "2024-01-01 00:00:00", "status": 200}],
+    "supported_websites": [{"id": "w1", "title": "Manganato", "link": "https://chapmanganato.to/", "status": 200,
+                            "lastUpdated": "2024-01-01"}],
+    "genres": [{"genre": "Action", "manga_count": 1}]
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def unreachable(self):
+        return False
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_bootstrap_data_is_sent_as_built_by_the_database(client, monkeypatch):
+    queries = []
+
+    async def fetch(self, label, query, *args):
+        queries.append(query)
+        return [(json.dumps(BOOTSTRAP_DATA),)]
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "_fetch", fetch)
+    response = client.get("/get_bootstrap_data")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == BOOTSTRAP_DATA
+    assert queries == ["SELECT get_bootstrap_data()::text"]
+
+
+def test_bootstrap_data_keeps_its_shape_when_the_database_fails(client, monkeypatch):
+    async def fetch(self, label, query, *args):
+        return []
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "_fetch", fetch)
+    assert client.get("/get_bootstrap_data").json() == {
+        "manga_data": [], "bookmarks_data": [], "supported_websites": [], "genres": []
+    }
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from src.cache_listener import apply_notification
+from src.lookup_cache import LookupCache
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+from src.read_cache import ReadCache
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    read_cache = ReadCache()
+    read_cache.set_enabled(True)
+    lookup_cache = LookupCache()
+    lookup_cache.load({}, {})
+    monkeypatch.setattr(MangaScraperDB, "read_cache", read_cache)
+    monkeypatch.setattr(MangaScraperDB, "lookup_cache", lookup_cache)
+    return read_cache, lookup_cache
+
+
+def test_read_cache_drops_results_read_before_an_invalidation():
+    cache = ReadCache()
+    cache.set_enabled(True)
+    _, generation = cache.get("get_frontend_data")
+    cache.invalidate() # A change is committed while the result is being read
+    cache.put("get_frontend_data", ["stale"], generation)
+    assert cache.get("get_frontend_data")[0] is None
+
+    _, generation = cache.get("get_frontend_data")
+    cache.put("get_frontend_data", ["fresh"], generation)
+    assert cache.get("get_frontend_data")[0] == ["fresh"]
+
+
+def test_read_cache_does_not_cache_while_disabled():
+    cache = ReadCache()
+    _, generation = cache.get("get_genres")
+    cache.put("get_genres", ["Action"], generation)
+    assert cache.get("get_genres")[0] is None
+
+
+def test_notifications_patch_the_lookup_cache_and_drop_cached_reads(caches):
+    read_cache, lookup_cache = caches
+    _, generation = read_cache.get("get_frontend_data")
+    read_cache.put("get_frontend_data", ["rows"], generation)
+
+    apply_notification({"table": "website_table", "op": "insert",
+                        "website_id": "w1", "website_url": "https://chapmanganato.to/"})
+    apply_notification({"table": "manga_path_table", "op": "insert", "manga_path_id": "p1",
+                        "manga_id": "m1", "website_id": "w1", "manga_path": "/manga-1"})
+    assert lookup_cache.get_website_id("https://chapmanganato.to/") == "w1"
+    assert lookup_cache.get_manga_path_id("m1", "w1", "/manga-1") == "p1"
+    assert read_cache.get("get_frontend_data")[0] is None
+
+    apply_notification({"table": "manga_table", "op": "delete", "manga_id": "m1"})
+    assert lookup_cache.get_manga_path_id("m1", "w1", "/manga-1") is None
+
+
+def test_cached_reads_are_served_until_a_write(caches, monkeypatch):
+    async_db = AsyncMangaScraperDB.__new__(AsyncMangaScraperDB)
+    queries = []
+
+    async def fetch(label, query, *args):
+        queries.append(label)
+        return [("Action", 3)]
+
+    monkeypatch.setattr(async_db, "_fetch", fetch)
+
+    assert asyncio.run(async_db.get_genres()) == [{"genre": "Action", "manga_count": 3}]
+    assert asyncio.run(async_db.get_genres()) == [{"genre": "Action", "manga_count": 3}]
+    assert queries == ["get_genres"]
+
+    MangaScraperDB().mark_write()
+    asyncio.run(async_db.get_genres())
+    assert queries == ["get_genres", "get_genres"]
@@ -0,0 +1,163 @@
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+from data_models.refresh_records import ScrapeResult
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_service import MangaScraperService
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(query)
+        if self.conn.status == TRANSACTION_STATUS_INERROR and not query.startswith("ROLLBACK TO SAVEPOINT"):
+            raise psycopg2.InternalError("current transaction is aborted")
+        if query.startswith("ROLLBACK TO SAVEPOINT"):
+            self.conn.status = TRANSACTION_STATUS_INTRANS
+        elif any(failing in query for failing in self.conn.failing):
+            self.conn.status = TRANSACTION_STATUS_INERROR
+            raise psycopg2.OperationalError("statement failed")
+
+    def fetchone(self):
+        return (False,)
+
+
+class FakeConnection:
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.statements = []
+        self.status = TRANSACTION_STATUS_INTRANS
+        self.closed = False
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_INTRANS
+
+
+def fake_db(failing=()):
+    ms_db = MangaScraperDB()
+    ms_db._settings = {"host": "primary", "database": "manga", "user": "manga", "password": "secret"}
+    ms_db._conn = FakeConnection(failing)
+    return ms_db
+
+
+def test_failed_read_in_transaction_does_not_abort_the_batch():
+    ms_db = fake_db(failing=("check_chapter_url_exists",))
+    with ms_db.transaction():
+        assert ms_db.is_chapter_url_exists("m1", "w1", "p1", "https://example.com/chapter-2") is False
+        assert ms_db.insert_manga_thumbnail("m1", "w1", "p1", "https://img.example.com/1.jpg")
+    assert ms_db._conn.commits == 1
+    assert "ROLLBACK TO SAVEPOINT manga_read; RELEASE SAVEPOINT manga_read" in ms_db._conn.statements
+
+
+def test_aborted_transaction_raises_instead_of_committing():
+    ms_db = fake_db()
+    with pytest.raises(psycopg2.InternalError):
+        with ms_db.transaction():
+            ms_db._conn.status = TRANSACTION_STATUS_INERROR # e.g. a statement run outside the savepoint helpers
+    assert ms_db._conn.commits == 0
+    assert ms_db._conn.rollbacks == 1
+
+
+def test_refresh_batch_is_reported_as_error_when_not_committed(monkeypatch):
+    ms_db = fake_db()
+    monkeypatch.setattr(ms_db, "find_similar_manga_batch", lambda names: ["m1"] * len(names))
+
+    def upsert(ms_db, item, manga_id):
+        ms_db._conn.status = TRANSACTION_STATUS_INERROR
+        return True
+
+    service = MangaScraperService.__new__(MangaScraperService)
+    monkeypatch.setattr(service, "upsert_refreshed_record", upsert)
+    item = ScrapeResult("Series", "/manga-1", "https://example.com/manga-1/chapter-2", "2024-01-01 00:00:00", 0, 200,
+                        "https://img.example.com/1.jpg", "https://example.com/", "2")
+    outcomes = service.write_refresh_batch(ms_db, [item, item])
+    assert [status for _, _, status in outcomes] == ["error", "error"]
+    assert ms_db._conn.commits == 0
+
+
+def new_record():
+    return {"manga_name": "Series", "manga_path": "/manga-1", "chapter_url": "https://example.com/manga-1/chapter-2",
+            "date_checked": "2024-01-01 00:00:00", "number_of_pages": 0, "chapter_url_status": 200,
+            "manga_thumbnail_url": "https://img.example.com/1.jpg", "website_url": "https://example.com/",
+            "chapter_number": "2", "genres": ["Action"]}
+
+
+def test_new_record_is_stored_in_one_transaction(monkeypatch):
+    ms_db = fake_db()
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: "w1")
+    service = MangaScraperService.__new__(MangaScraperService)
+    assert service.insert_new_record(ms_db, new_record(), None) == "Success!"
+    assert ms_db._conn.commits == 1
+
+
+def test_failed_write_undoes_the_whole_new_record(monkeypatch):
+    ms_db = fake_db(failing=("insert_manga_thumbnail",))
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: "w1")
+    service = MangaScraperService.__new__(MangaScraperService)
+    message = service.insert_new_record(ms_db, new_record(), None)
+    assert message == "Failed to store the thumbnail of Series. Record was not added."
+    assert ms_db._conn.commits == 0 and ms_db._conn.rollbacks == 1
+
+    # Inside a batch only the record is undone, the rest of the batch is still committed
+    ms_db = fake_db(failing=("insert_manga_thumbnail",))
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: "w1")
+    with ms_db.transaction():
+        assert service.insert_new_record(ms_db, new_record(), None) != "Success!"
+    assert "ROLLBACK TO SAVEPOINT manga_record; RELEASE SAVEPOINT manga_record" in ms_db._conn.statements
+    assert ms_db._conn.commits == 1
+
+
+def test_new_record_needs_a_known_website(monkeypatch):
+    ms_db = fake_db()
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: None)
+    service = MangaScraperService.__new__(MangaScraperService)
+    assert "was not found in the database" in service.insert_new_record(ms_db, new_record(), None)
+    assert not any("insert_manga" in statement for statement in ms_db._conn.statements)
+
+
+def test_refreshed_record_with_a_failed_write_is_an_error(monkeypatch):
+    ms_db = fake_db(failing=("insert_manga_chapter_url_store",))
+    monkeypatch.setattr(ms_db, "find_similar_manga_batch", lambda names: ["m1"] * len(names))
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: "w1")
+    monkeypatch.setattr(ms_db, "get_manga_path_id", lambda manga_id, website_id, manga_path: "p1")
+    service = MangaScraperService.__new__(MangaScraperService)
+    item = ScrapeResult("Series", "/manga-1", "https://example.com/manga-1/chapter-2", "2024-01-01 00:00:00", 0, 200,
+                        "https://img.example.com/1.jpg", "https://example.com/", "2")
+    outcomes = service.write_refresh_batch(ms_db, [item])
+    assert [status for _, _, status in outcomes] == ["error"]
+    assert "ROLLBACK TO SAVEPOINT manga_record; RELEASE SAVEPOINT manga_record" in ms_db._conn.statements
+    assert ms_db._conn.commits == 1
+
+
+def test_reparsed_record_overwrites_the_stored_chapter_and_thumbnail(monkeypatch):
+    ms_db = fake_db()
+    monkeypatch.setattr(ms_db, "get_website_id", lambda website_url: "w1")
+    monkeypatch.setattr(ms_db, "get_manga_path_id", lambda manga_id, website_id, manga_path: "p1")
+    monkeypatch.setattr(ms_db, "is_chapter_url_exists", lambda *args: True)
+    service = MangaScraperService.__new__(MangaScraperService)
+    item = ScrapeResult("Series", "/manga-1", "https://example.com/manga-1/chapter-2", "2024-01-01 00:00:00", 0, 200,
+                        "https://img.example.com/1.jpg", "https://example.com/", "2")
+    outcomes = service.write_refresh_batch(ms_db, [item], manga_ids=["m1"], overwrite=True)
+    assert [status for _, _, status in outcomes] == ["unchanged"]
+    assert any("insert_manga_chapter_url_store" in statement for statement in ms_db._conn.statements)
+    assert any("replace_manga_thumbnail" in statement for statement in ms_db._conn.statements)
@@ -0,0 +1,118 @@
+import time
+from datetime import datetime, timedelta
+import requests_mock
+from src.manga_scraper import MangaScraper, MangaKakalotScraper, SelectorWatcher, webtoonScraper
+
+KAKALOT_URL = "https://chapmanganato.com/manga-gv952204"
+
+KAKALOT_PAGE = (
+    '<html><body>'
+    '<div class="story-info-left"><span class="info-image"><img class="img-loading" src="https://thumb/1.jpg"></span></div>'
+    '<div class="story-info-right"><h1>Battle Through The Heavens</h1>'
+    '<table><tr><td class="table-label"><i class="info-genres"></i>Genres :</td>'
+    '<td class="table-value"><a class="a-h">Action</a> - <a class="a-h">Fantasy</a></td></tr></table></div>'
+    '<ul class="row-content-chapter"><li><a class="chapter-name text-nowrap" href="https://chapmanganato.com/manga-gv952204/chapter-10">Chapter 10</a></li></ul>'
+    '<div class="comments">' + "x" * 100000 + '</div>'
+    '</body></html>'
+)
+
+
+def test_selector_watcher_waits_for_closing_tag():
+    watcher = SelectorWatcher((("div", "class", "target"),))
+    watcher.feed('<div class="a target"><div>inner</div>')
+    assert not watcher.done
+    watcher.feed('</div>')
+    assert watcher.done
+
+
+def test_fetch_soup_stops_after_selectors():
+    scraper = MangaKakalotScraper([])
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, text=KAKALOT_PAGE)
+        soup, status_code = scraper.fetch_soup(KAKALOT_URL, scraper.record_selectors)
+    assert status_code == 200
+    assert soup.find('a', class_='chapter-name')['href'].endswith("chapter-10")
+    comments = soup.find('div', class_='comments')
+    assert comments is None or len(comments.text) < 100000
+
+
+def test_fetch_soup_reads_whole_page_when_selectors_missing():
+    scraper = MangaScraper([])
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, text=KAKALOT_PAGE)
+        soup, status_code = scraper.fetch_soup(KAKALOT_URL, (("div", "id", "missing"),))
+    assert status_code == 200
+    assert len(soup.find('div', class_='comments').text) == 100000
+
+
+def test_create_record_fetches_page_once():
+    scraper = MangaKakalotScraper([])
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, text=KAKALOT_PAGE)
+        m.get("https://chapmanganato.com/manga-gv952204/chapter-10", text="<html></html>")
+        record = scraper.create_record(KAKALOT_URL, "https://chapmanganato.com/")
+        page_requests = [request for request in m.request_history if request.url == KAKALOT_URL]
+    assert len(page_requests) == 1
+    assert record["manga_name"] == "Battle Through The Heavens"
+    assert record["manga_thumbnail_url"] == "https://thumb/1.jpg"
+    assert record["genres"] == ["Action", "Fantasy"]
+
+
+def test_fetch_soup_failure_status():
+    scraper = MangaScraper([])
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, status_code=404)
+        soup, status_code = scraper.fetch_soup(KAKALOT_URL)
+    assert soup is None
+    assert status_code == 404
+
+
+def test_fetch_soup_retries_after_a_transient_error():
+    scraper = MangaScraper([])
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, [{"status_code": 429}, {"text": KAKALOT_PAGE}])
+        assert scraper.fetch_soup(KAKALOT_URL) == (None, 429)
+        soup, status_code = scraper.fetch_soup(KAKALOT_URL)
+    assert status_code == 200
+    assert soup.find('h1').text == "Battle Through The Heavens"
+
+
+def test_webtoon_genre_comes_from_url():
+    scraper = webtoonScraper([])
+    assert scraper.extract_genres("https://www.webtoons.com/en/slice-of-life/my-series/list?title_no=1") == ["Slice of life"]
+    assert scraper.extract_genres("https://www.webtoons.com/en/list?title_no=1") == []
+
+
+def listing_page(entries):
+    items = "".join(
+        f'<div class="content-genres-item"><a class="genres-item-img" href="https://chapmanganato.to/{key}"></a>'
+        f'<p class="genres-item-view-time"><span class="genres-item-time">{updated}</span></p></div>'
+        for key, updated in entries
+    )
+    return f'<html><body><div class="panel-content-genres">{items}</div></body></html>'
+
+
+def test_updated_keys_page_back_to_the_last_refresh():
+    scraper = MangaKakalotScraper([])
+    with requests_mock.Mocker() as m:
+        m.get("https://manganato.com/genre-all/1", text=listing_page([("manga-a", "2 hours ago"), ("manga-b", "Jan 10,24")]))
+        m.get("https://manganato.com/genre-all/2", text=listing_page([("manga-c", "Jan 09,24"), ("manga-d", "Jan 05,24")]))
+        m.get("https://manganato.com/genre-all/3", text=listing_page([("manga-e", "Jan 01,24")]))
+        assert scraper.get_updated_keys(datetime(2024, 1, 9, 12)) == {"manga-a", "manga-b", "manga-c"}
+        assert m.call_count == 2
+        # The listing does not reach back far enough, or the last refresh is unknown: scrape every series
+        assert scraper.get_updated_keys(datetime(2024, 1, 9, 12), max_pages=1) is None
+        assert scraper.get_updated_keys(None) is None
+
+
+def test_webtoons_updated_keys_cover_every_weekday_since_the_last_refresh(monkeypatch):
+    scraper = webtoonScraper([])
+    schedule = "".join(
+        f'<div class="_list_{day}"><a href="https://www.webtoons.com/en/fantasy/series/list?title_no={index}"></a></div>'
+        for index, day in enumerate(["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"])
+    )
+    monkeypatch.setattr(time, "localtime", lambda: time.struct_time((2024, 1, 11, 12, 0, 0, 3, 11, 0))) # Thursday
+    with requests_mock.Mocker() as m:
+        m.get("https://www.webtoons.com/en/dailySchedule", text=f"<html><body>{schedule}</body></html>")
+        assert scraper.get_updated_keys(datetime.now() - timedelta(days=2)) == {"0", "1", "2", "3"}
+        assert scraper.get_updated_keys(datetime.now() - timedelta(days=8)) is None
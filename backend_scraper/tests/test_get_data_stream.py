@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+import main
+from src.cache_listener import CacheListener
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+
+def test_get_data_streams_chunks_as_one_json_array(monkeypatch):
+    async def unreachable(self):
+        return False
+
+    async def chunks(self, chunk_size=1000):
+        yield [{"id": "1", "title": "Battle Through The Heavens"}, {"id": "2", "title": "Solo Leveling"}]
+        yield [{"id": "3", "title": "Tower of God"}]
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    # The listener would connect to the database
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+    monkeypatch.setattr(AsyncMangaScraperDB, "iter_frontend_data", chunks)
+    with TestClient(main.app) as client:
+        response = client.get("/get_data", params={"stream": "true"})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == ["1", "2", "3"]
@@ -0,0 +1,80 @@
+import time
+import requests_mock
+from data_models.refresh_records import RefreshTarget
+from src.html_archive import HtmlArchive
+from src.manga_scraper import MangaKakalotScraper
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_service import MangaScraperService
+from src.single_flight import SingleFlight
+
+KAKALOT_URL = "https://chapmanganato.com/manga-gv952204"
+
+KAKALOT_PAGE = (
+    '<html><body>'
+    '<div class="story-info-left"><span class="info-image"><img class="img-loading" src="https://thumb/1.jpg"></span></div>'
+    '<div class="story-info-right"><h1>Battle Through The Heavens</h1></div>'
+    '<ul class="row-content-chapter"><li><a class="chapter-name" href="https://chapmanganato.com/manga-gv952204/chapter-10">Chapter 10</a></li></ul>'
+    '</body></html>'
+)
+
+
+def test_archive_deduplicates_and_returns_latest(tmp_path):
+    archive = HtmlArchive(str(tmp_path))
+    first = archive.put(KAKALOT_URL, b"<html>1</html>")
+    second = archive.put(KAKALOT_URL, b"<html>2</html>")
+    again = archive.put("https://chapmanganato.com/other", b"<html>1</html>")
+    assert first == again
+    assert len(list((tmp_path / "objects").rglob("*.zst"))) == 2
+    assert archive.latest(KAKALOT_URL) == (b"<html>2</html>", 200)
+    assert archive.latest("https://chapmanganato.com/missing") is None
+    assert archive.urls() == ["https://chapmanganato.com/manga-gv952204", "https://chapmanganato.com/other"]
+    archive.close()
+
+
+def test_offline_scraper_reads_archived_pages(tmp_path):
+    archive = HtmlArchive(str(tmp_path))
+    with requests_mock.Mocker() as m:
+        m.get(KAKALOT_URL, text=KAKALOT_PAGE)
+        m.get("https://chapmanganato.com/manga-gv952204/chapter-10", text="<html></html>")
+        online = MangaKakalotScraper([], archive=archive).create_record(KAKALOT_URL, "https://chapmanganato.com/")
+
+    with requests_mock.Mocker() as m: # No routes registered, any network request fails
+        offline = MangaKakalotScraper([], archive=archive, offline=True).create_record(KAKALOT_URL, "https://chapmanganato.com/")
+        assert not m.request_history
+
+    for key in ("manga_name", "chapter_url", "manga_thumbnail_url", "chapter_number"):
+        assert offline[key] == online[key]
+    archive.close()
+
+
+def test_reparse_overwrites_records_dated_by_their_fetch(tmp_path, monkeypatch):
+    archive = HtmlArchive(str(tmp_path))
+    monkeypatch.setattr(time, "time", lambda: 1704067200.0)
+    archive.put(KAKALOT_URL, KAKALOT_PAGE.encode("utf-8"))
+    monkeypatch.undo()
+    assert archive.latest_fetched_at(KAKALOT_URL) == 1704067200.0
+    assert archive.latest_fetched_at("https://chapmanganato.com/missing") is None
+
+    service = MangaScraperService.__new__(MangaScraperService)
+    service.archive = archive
+    service.offline = False
+    service.scrape_flight = SingleFlight()
+    written = []
+    monkeypatch.setattr(MangaScraperDB, "load_lookup_caches", lambda self: True)
+    monkeypatch.setattr(service, "get_websites_and_paths",
+                        lambda: [RefreshTarget(id="p1", link=KAKALOT_URL, title="Battle Through The Heavens")])
+    monkeypatch.setattr(service, "scrape_item", lambda item, manga_list, mk_scraper: {
+        "manga_name": "Battle Through The Heavens", "manga_path": "/manga-gv952204", "chapter_url": f"{KAKALOT_URL}/chapter-10",
+        "date_checked": "2030-01-01 00:00:00", "number_of_pages": 0, "chapter_url_status": 200,
+        "manga_thumbnail_url": "https://thumb/1.jpg", "website_url": "https://chapmanganato.com/", "chapter_number": "10"})
+
+    def write_refresh_batch(ms_db, batch, overwrite=False):
+        written.append((batch, overwrite))
+        return [(item, "m1", "new_chapter") for item in batch]
+
+    monkeypatch.setattr(service, "write_refresh_batch", write_refresh_batch)
+    assert service.reparse_archive() == {"new_chapter": 1, "unchanged": 0, "error": 0}
+    [(batch, overwrite)] = written
+    assert overwrite
+    assert batch[0].date_checked == time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(1704067200.0))
+    archive.close()
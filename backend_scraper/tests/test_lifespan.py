@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+import main
+from src.cache_listener import CacheListener
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+
+def test_app_starts_and_reports_not_ready_without_database(monkeypatch):
+    async def unreachable(self):
+        return False
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    # The listener would connect to the database
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+
+    # Importing main did not create the service, the lifespan does
+    assert main.manga_scraper_service is None
+    with TestClient(main.app) as client:
+        assert main.manga_scraper_service is not None
+        assert client.get("/healthz").json() == {"status": "ok"}
+        not_ready = client.get("/readyz")
+        assert not_ready.status_code == 503
+        assert not_ready.json() == {"status": "starting"}
+    # Shutdown releases the service with its connections
+    assert main.manga_scraper_service is None
@@ -0,0 +1,108 @@
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_INTRANS
+from src.lookup_cache import LookupCache
+from src.manga_scraper_db import MangaScraperDB
+
+WEBSITE_URL = "https://chapmanganato.to/"
+
+
+class FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return (None,)
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor()
+
+    def get_transaction_status(self):
+        return TRANSACTION_STATUS_INTRANS
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def fake_db():
+    ms_db = MangaScraperDB()
+    ms_db._settings = {"host": "primary", "database": "manga", "user": "manga", "password": "secret"}
+    ms_db._conn = FakeConnection()
+    return ms_db
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = LookupCache()
+    cache.load({"https://mangakakalot.com/": "w0"}, {("m0", "w0", "manga-0"): "p0"})
+    monkeypatch.setattr(MangaScraperDB, "lookup_cache", cache)
+    return cache
+
+
+def test_inserts_are_shared_only_once_their_transaction_commits(cache):
+    ms_db, other_db = fake_db(), fake_db()
+    with ms_db.transaction():
+        website_id = ms_db.insert_website(WEBSITE_URL, "200")
+        manga_path_id = ms_db.insert_manga_path("m1", website_id, "manga-1")
+        assert ms_db.get_website_id(WEBSITE_URL) == website_id
+        assert ms_db.get_manga_path_id("m1", website_id, "manga-1") == manga_path_id
+        assert cache.get_website_id(WEBSITE_URL) is None
+        assert other_db.get_website_id(WEBSITE_URL) is None
+    assert cache.get_website_id(WEBSITE_URL) == website_id
+    assert other_db.get_manga_path_id("m1", website_id, "manga-1") == manga_path_id
+
+
+def test_rollback_drops_only_the_transaction_inserts(cache):
+    ms_db = fake_db()
+    with pytest.raises(RuntimeError):
+        with ms_db.transaction():
+            website_id = ms_db.insert_website(WEBSITE_URL, "200")
+            ms_db.insert_manga_path("m1", website_id, "manga-1")
+            raise RuntimeError("batch failed")
+    assert ms_db._conn.rollbacks == 1
+    assert cache.loaded
+    assert cache.website_ids == {"https://mangakakalot.com/": "w0"}
+    assert cache.manga_path_ids == {("m0", "w0", "manga-0"): "p0"}
+    assert ms_db.get_website_id(WEBSITE_URL) is None
+
+
+def test_savepoint_rollback_keeps_the_rest_of_the_transaction(cache):
+    ms_db = fake_db()
+    with ms_db.transaction():
+        kept_path_id = ms_db.insert_manga_path("m1", "w0", "manga-1")
+        with pytest.raises(RuntimeError):
+            with ms_db.savepoint():
+                ms_db.insert_manga_path("m2", "w0", "manga-2")
+                raise RuntimeError("record failed")
+        assert ms_db.get_manga_path_id("m2", "w0", "manga-2") is None
+    assert cache.manga_path_ids == {("m0", "w0", "manga-0"): "p0", ("m1", "w0", "manga-1"): kept_path_id}
+
+
+def test_insert_outside_a_transaction_is_shared_straight_away(cache):
+    website_id = fake_db().insert_website(WEBSITE_URL, "200")
+    assert cache.get_website_id(WEBSITE_URL) == website_id
+
+
+def test_delete_removes_the_manga_paths(cache):
+    ms_db = fake_db()
+    ms_db.insert_manga_path("m1", "w0", "manga-1")
+    ms_db.delete_manga("m0")
+    assert ms_db._conn.commits == 2
+    assert cache.get_manga_path_id("m0", "w0", "manga-0") is None
+    assert cache.get_manga_path_id("m1", "w0", "manga-1") is not None
@@ -0,0 +1,31 @@
+import random
+import jellyfish
+from src.manga_matcher import match_manga_names
+
+
+def reference_match(manga_name, existing):
+    # The original find_similar_manga loop
+    for index, existing_name in enumerate(existing):
+        if jellyfish.jaro_similarity(manga_name.lower(), existing_name.lower()) > 0.85:
+            return index
+    return None
+
+def test_matches_jellyfish_threshold_semantics():
+    random.seed(0)
+    alphabet = "abcde fgh"
+    existing = ["".join(random.choices(alphabet, k=random.randint(0, 10))) for _ in range(200)]
+    incoming = ["".join(random.choices(alphabet, k=random.randint(0, 10))) for _ in range(200)]
+    existing_indexes, _ = match_manga_names(incoming, existing)
+    assert existing_indexes == [reference_match(name, existing) for name in incoming]
+
+def test_dedupes_within_the_incoming_batch():
+    existing = ["One Piece"]
+    incoming = ["Battle Through The Heavens", "one piece", "Battle Through the Heavens", "Solo Leveling"]
+    existing_indexes, duplicate_indexes = match_manga_names(incoming, existing)
+    assert existing_indexes == [None, 0, None, None]
+    assert duplicate_indexes == [None, None, 0, None]
+
+def test_empty_names_never_match():
+    existing_indexes, duplicate_indexes = match_manga_names(["", ""], [""])
+    assert existing_indexes == [None, None]
+    assert duplicate_indexes == [None, None]
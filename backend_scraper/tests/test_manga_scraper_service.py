@@ -0,0 +1,158 @@
+import time
+from datetime import datetime
+import pytest
+from src.manga_scraper_service import MangaScraperService
+
+
+def test_prefetch_preserves_order():
+    values = list(MangaScraperService.prefetch(iter(range(100)), max_buffered=4))
+    assert values == list(range(100))
+
+def test_prefetch_propagates_producer_errors():
+    def failing():
+        yield 1
+        raise ValueError("scrape failed")
+
+    results = MangaScraperService.prefetch(failing(), max_buffered=2)
+    assert next(results) == 1
+    with pytest.raises(ValueError, match="scrape failed"):
+        next(results)
+
+def test_prefetch_bounds_buffered_values():
+    produced = []
+    def producer():
+        for i in range(50):
+            produced.append(i)
+            yield i
+
+    results = MangaScraperService.prefetch(producer(), max_buffered=3)
+    assert next(results) == 0
+    time.sleep(0.2)
+    # One value handed out, at most three waiting in the queue and one blocked on put
+    assert len(produced) <= 5
+    results.close()
+
+def test_prefetch_stops_at_deadline_while_producer_hangs():
+    def hanging():
+        yield 1
+        yield 2
+        time.sleep(5)
+        yield 3
+
+    started = time.monotonic()
+    values = list(MangaScraperService.prefetch(hanging(), max_buffered=4, deadline=started + 0.3))
+    assert values == [1, 2]
+    assert time.monotonic() - started < 1
+
+def test_filter_updated_records_keeps_listed_and_unsupported_series(monkeypatch):
+    from data_models.refresh_records import RefreshTarget
+    from src.manga_scraper import MangaKakalotScraper, webtoonScraper
+
+    monkeypatch.setattr(MangaKakalotScraper, "get_updated_keys", lambda self, since: {"manga-gv952204"})
+    monkeypatch.setattr(webtoonScraper, "get_updated_keys", lambda self, since: None)
+    manga_list = [
+        RefreshTarget(id="1", link="https://chapmanganato.to/manga-gv952204", title="Battle Through The Heavens"),
+        RefreshTarget(id="2", link="https://chapmanganato.to/manga-ax951880", title="Tales of Demons and Gods"),
+        RefreshTarget(id="3", link="https://www.webtoons.com/en/fantasy/tower-of-god/list?title_no=95", title="Tower of God"),
+        RefreshTarget(id="4", link="https://www.viz.com/shonenjump/chapters/one-piece", title="One Piece"),
+    ]
+
+    service = MangaScraperService.__new__(MangaScraperService)
+    kept = service.filter_updated_records(manga_list, datetime(2024, 1, 1))
+    # Unlisted manganato series are skipped, an unreadable webtoons listing and unsupported sites fall back to scraping
+    assert [item.id for item in kept] == ["1", "3", "4"]
+
+def test_parse_import_csv_uses_link_column():
+    csv_text = "title,link\nOne Piece,https://www.viz.com/shonenjump/chapters/one-piece\nNo link,\n"
+    assert MangaScraperService.parse_import_csv(csv_text) == ["https://www.viz.com/shonenjump/chapters/one-piece"]
+
+def test_parse_import_csv_without_header():
+    csv_text = "Battle Through The Heavens,https://chapmanganato.to/manga-gv952204\nhttps://chapmanganato.to/manga-ax951880\n"
+    assert MangaScraperService.parse_import_csv(csv_text) == [
+        "https://chapmanganato.to/manga-gv952204",
+        "https://chapmanganato.to/manga-ax951880",
+    ]
+
+def test_normalize_link_ignores_case_and_trailing_slash():
+    assert MangaScraperService.normalize_link(" HTTPS://ChapManganato.to/manga-gv952204/ ") == "https://chapmanganato.to/manga-gv952204"
+
+class FakeRefreshDB:
+    """
+    The refresh run tables, with every run started as a new one
+    """
+    def __init__(self, run_dates):
+        self.run_dates = iter(run_dates)
+        self.runs = {}
+
+    def start_refresh_run(self):
+        run_id = f"run{len(self.runs)}"
+        self.runs[run_id] = {"created_at": next(self.run_dates), "run_status": "running"}
+        return run_id
+
+    def finish_refresh_run(self, run_id, run_status):
+        self.runs[run_id]["run_status"] = run_status
+
+    def get_last_completed_refresh_start(self):
+        return max((run["created_at"] for run in self.runs.values() if run["run_status"] == "completed"), default=None)
+
+    def get_refresh_checkpoints(self, run_id):
+        return set()
+
+    def insert_refresh_checkpoints(self, run_id, manga_path_ids):
+        pass
+
+    def load_lookup_caches(self):
+        pass
+
+    def close_connection(self):
+        pass
+
+
+def test_series_that_failed_are_still_swept_by_the_next_refresh(monkeypatch):
+    import src.manga_scraper_service as service_module
+    from data_models.refresh_records import RefreshTarget, ScrapeResult
+    from src.manga_scraper import MangaKakalotScraper
+
+    # Both series were listed as updated on Jan 2, after the last completed run started on Jan 1
+    listing = {"manga-1": datetime(2024, 1, 2), "manga-2": datetime(2024, 1, 2)}
+    monkeypatch.setattr(MangaKakalotScraper, "get_updated_keys",
+                        lambda self, since: {key for key, updated in listing.items() if since is None or updated >= since})
+    ms_db = FakeRefreshDB([datetime(2024, 1, 3), datetime(2024, 1, 4)])
+    ms_db.runs["run_before"] = {"created_at": datetime(2024, 1, 1), "run_status": "completed"}
+    monkeypatch.setattr(service_module, "MangaScraperDB", lambda: ms_db)
+
+    targets = [RefreshTarget(id=f"p{index}", link=f"https://chapmanganato.to/manga-{index}", title=f"Series {index}")
+               for index in (1, 2)]
+    failing, scraped = {"p2"}, []
+
+    def iter_scrape_records(manga_list, priority=None):
+        for item in manga_list:
+            scraped.append(item.id)
+            if item.id in failing:
+                yield item, None, "Timed out"
+            else:
+                yield item, ScrapeResult(item.title, item.link, f"{item.link}/chapter-2", "2024-01-02 00:00:00", 0, 200,
+                                         "https://img.example.com/1.jpg", "https://chapmanganato.to/", "2"), None
+
+    service = MangaScraperService.__new__(MangaScraperService)
+    service.archive, service.offline = None, False
+    monkeypatch.setattr(service, "get_websites_and_paths", lambda: targets)
+    monkeypatch.setattr(service, "iter_scrape_records", iter_scrape_records)
+    monkeypatch.setattr(service, "write_refresh_batch",
+                        lambda ms_db, batch: [(item, "m1", "unchanged") for item in batch])
+
+    def run_refresh():
+        events = service.iter_refresh_events(sweep=True)
+        while True:
+            try:
+                next(events)
+            except StopIteration as finished:
+                return finished.value
+
+    assert run_refresh()["run_status"] == "partial"
+    assert ms_db.get_last_completed_refresh_start() == datetime(2024, 1, 1)
+
+    failing.clear()
+    scraped.clear()
+    assert run_refresh()["run_status"] == "completed"
+    assert "p2" in scraped
@@ -0,0 +1,169 @@
+import os
+import uuid
+import psycopg2
+import pytest
+from data_models.refresh_records import ScrapeResult
+from src.manga_scraper_db import MangaScraperDB
+from src.refresh_worker import RefreshWorker
+
+# The queue procedures are exercised against a real PostgreSQL server when one is given, e.g.
+#   TEST_DATABASE_DSN="host=localhost dbname=manga_test user=postgres" python -m pytest tests/test_refresh_queue.py
+# Each test creates the schema in a throwaway PostgreSQL schema that is dropped afterwards.
+TEST_DATABASE_DSN = os.environ.get("TEST_DATABASE_DSN")
+DATABASE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "database")
+QUEUE_SCRIPTS = [
+    "create/create_manga_tables.sql",
+    "create/create_refresh_tables.sql",
+    "stored_procs/create_refresh_run.sql",
+    "stored_procs/claim_refresh_jobs.sql",
+    "stored_procs/heartbeat_refresh_jobs.sql",
+    "stored_procs/finish_refresh_job.sql",
+    "stored_procs/start_refresh_run.sql",
+    "stored_procs/get_resumable_refresh_run.sql",
+    "stored_procs/get_last_completed_refresh_start.sql"
+]
+
+
+def scrape_result(index):
+    return ScrapeResult(f"Series {index}", f"/manga-{index}", f"https://example.com/manga-{index}/chapter-2",
+                        "2024-01-01 00:00:00", 0, 200, f"https://img.example.com/{index}.jpg", "https://example.com/", "2")
+
+
+class FakeService:
+    def __init__(self, failing_paths=(), failing_writes=()):
+        self.failing_paths = failing_paths
+        self.failing_writes = failing_writes
+        self.written_manga_ids = None
+
+    def iter_scrape_records(self, manga_list):
+        for index, item in enumerate(manga_list):
+            if item.id in self.failing_paths:
+                yield item, None, "Website not supported"
+            else:
+                yield item, scrape_result(index), None
+
+    def write_refresh_batch(self, ms_db, batch, manga_ids=None):
+        self.written_manga_ids = manga_ids
+        return [(item, manga_id, "error" if manga_id in self.failing_writes else "unchanged")
+                for item, manga_id in zip(batch, manga_ids)]
+
+
+class FakeQueueDB:
+    def __init__(self):
+        self.finished = {}
+
+    def finish_refresh_job(self, job_id, worker_id, succeeded, error=None):
+        self.finished[job_id] = (succeeded, error)
+        return True
+
+
+def job(index):
+    return {"job_id": f"job{index}", "run_id": "run", "manga_path_id": f"path{index}", "manga_id": f"manga{index}",
+            "manga_name": f"Series {index}", "full_path": f"https://example.com/manga-{index}", "attempts": 1}
+
+
+def test_process_batch_writes_to_the_jobs_manga_and_finishes_every_job():
+    service = FakeService(failing_paths=("path1",), failing_writes=("manga2",))
+    worker = RefreshWorker(worker_id="worker", service=service)
+    ms_db = FakeQueueDB()
+    worker.process_batch(ms_db, [job(0), job(1), job(2)])
+
+    assert service.written_manga_ids == ["manga0", "manga2"]
+    assert ms_db.finished == {
+        "job0": (True, None),
+        "job1": (False, "Website not supported"),
+        "job2": (False, "Failed to write record")
+    }
+
+
+@pytest.fixture
+def queue_db():
+    if not TEST_DATABASE_DSN:
+        pytest.skip("Set TEST_DATABASE_DSN to run the refresh queue procedures against PostgreSQL")
+    schema = f"refresh_queue_test_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(TEST_DATABASE_DSN)
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema}, public;")
+        for script in QUEUE_SCRIPTS:
+            with open(os.path.join(DATABASE_DIR, script)) as f:
+                cur.execute(f.read())
+        website_id, manga_id = str(uuid.uuid4()), str(uuid.uuid4())
+        cur.execute("INSERT INTO website_table (website_id, website_url) VALUES (%s, 'https://example.com')", (website_id,))
+        cur.execute("INSERT INTO manga_table (manga_id, manga_name) VALUES (%s, 'Series')", (manga_id,))
+        for index in range(2):
+            cur.execute("INSERT INTO manga_path_table VALUES (%s, %s, %s, %s)",
+                        (str(uuid.uuid4()), manga_id, website_id, f"/manga-{index}"))
+    conn.commit()
+
+    ms_db = MangaScraperDB()
+    ms_db._conn = conn
+    try:
+        yield ms_db
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+def run_status(ms_db, run_id):
+    with ms_db.conn.cursor() as cur:
+        cur.execute("SELECT run_status FROM refresh_run_table WHERE run_id = %s", (run_id,))
+        status = cur.fetchone()[0]
+    ms_db.conn.commit()
+    return status
+
+
+def expire_leases(ms_db):
+    with ms_db.conn.cursor() as cur:
+        cur.execute("UPDATE refresh_job_table SET lease_expires_at = LOCALTIMESTAMP - interval '1 minute' "
+                    "WHERE job_status = 'claimed'")
+    ms_db.conn.commit()
+
+
+def test_claimed_jobs_are_not_claimed_twice_and_finishing_them_completes_the_run(queue_db):
+    run_id = queue_db.create_refresh_run(max_attempts=3)
+    first = queue_db.claim_refresh_jobs("worker1", 1, 300)
+    second = queue_db.claim_refresh_jobs("worker2", 5, 300)
+    assert len(first) == 1 and len(second) == 1
+    assert first[0]["manga_path_id"] != second[0]["manga_path_id"]
+    assert queue_db.claim_refresh_jobs("worker3", 5, 300) == []
+
+    # Only the lease owner can finish a job
+    queue_db.finish_refresh_job(first[0]["job_id"], "worker2", succeeded=True)
+    queue_db.finish_refresh_job(first[0]["job_id"], "worker1", succeeded=True)
+    assert run_status(queue_db, run_id) == "running"
+    queue_db.finish_refresh_job(second[0]["job_id"], "worker2", succeeded=True)
+    assert run_status(queue_db, run_id) == "completed"
+    assert queue_db.get_last_completed_refresh_start() is not None
+
+
+def test_expired_leases_are_reclaimed_then_failed_and_finish_the_run_as_partial(queue_db):
+    run_id = queue_db.create_refresh_run(max_attempts=2)
+    assert len(queue_db.claim_refresh_jobs("worker1", 5, 300)) == 2
+    expire_leases(queue_db)
+
+    reclaimed = queue_db.claim_refresh_jobs("worker2", 5, 300)
+    assert sorted(job["attempts"] for job in reclaimed) == [2, 2]
+    queue_db.finish_refresh_job(reclaimed[0]["job_id"], "worker2", succeeded=True)
+    expire_leases(queue_db) # worker2 dies holding its last job, which has no attempts left
+
+    assert queue_db.claim_refresh_jobs("worker3", 5, 300) == []
+    # The failed series was not refreshed, so the next sweep must not start from this run
+    assert run_status(queue_db, run_id) == "partial"
+    assert queue_db.get_last_completed_refresh_start() is None
+
+
+def test_only_recent_unfinished_inline_runs_are_resumed(queue_db):
+    crashed = queue_db.start_refresh_run()
+    assert queue_db.start_refresh_run() == crashed
+
+    with queue_db.conn.cursor() as cur:
+        cur.execute("UPDATE refresh_run_table SET created_at = LOCALTIMESTAMP - interval '2 days' WHERE run_id = %s",
+                    (crashed,))
+    queue_db.conn.commit()
+    fresh = queue_db.start_refresh_run(max_age_seconds=3600)
+    assert fresh != crashed
+    assert run_status(queue_db, crashed) == "expired"
+    assert queue_db.start_refresh_run(max_age_seconds=3600) == fresh
@@ -0,0 +1,22 @@
+from data_models.refresh_records import ScrapeResult
+
+RECORD = {
+    "manga_name": "Battle Through The Heavens",
+    "manga_path": "/manga-gv952204",
+    "chapter_url": "https://chapmanganato.com/manga-gv952204/chapter-10",
+    "date_checked": "2024-01-01 00:00:00",
+    "number_of_pages": 0,
+    "chapter_url_status": 200,
+    "manga_thumbnail_url": "https://thumb/1.jpg",
+    "website_url": "https://chapmanganato.com/",
+    "chapter_number": "10",
+    "genres": ["Action", "Fantasy"]
+}
+
+
+def test_scrape_result_round_trips_and_shares_website_urls():
+    first = ScrapeResult.from_record(RECORD)
+    second = ScrapeResult.from_record(dict(RECORD, website_url="".join(["https://chapmanganato.com", "/"])))
+    assert first.as_record() == RECORD
+    assert first.website_url is second.website_url
+    assert not hasattr(first, "__dict__")
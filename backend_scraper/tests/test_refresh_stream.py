@@ -0,0 +1,82 @@
+import json
+import threading
+import pytest
+from fastapi.testclient import TestClient
+import main
+from src.admission import RefreshCoordinator
+from src.cache_listener import CacheListener
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+from src.manga_scraper_service import MangaScraperService
+
+
+@pytest.fixture
+def app(monkeypatch):
+    async def unreachable(self):
+        return False
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+    monkeypatch.setattr(main, "refresh_coordinator", RefreshCoordinator())
+    return main.app
+
+
+def parse_events(body):
+    events = []
+    for message in body.strip().split("\n\n"):
+        name, data = message.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_refresh_stream_sends_each_event_then_the_summary(app, monkeypatch):
+    options = []
+
+    def iter_refresh_events(self, batch_size=5, sweep=True, deadline_seconds=None):
+        options.append((batch_size, sweep, deadline_seconds))
+        yield {"manga_path_id": "1", "status": "new_chapter", "rows": [{"id": "m1", "title": "Solo Leveling"}]}
+        yield {"manga_path_id": "2", "status": "error", "error": "Website not supported"}
+        return {"run_id": "run", "run_status": "completed"}
+
+    monkeypatch.setattr(MangaScraperService, "iter_refresh_events", iter_refresh_events)
+    with TestClient(app) as client:
+        response = client.get("/refresh_data/stream", params={"batch_size": 0, "sweep": "false"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert options == [(1, False, None)]
+    assert parse_events(response.text) == [
+        ("refresh", {"manga_path_id": "1", "status": "new_chapter", "rows": [{"id": "m1", "title": "Solo Leveling"}]}),
+        ("refresh", {"manga_path_id": "2", "status": "error", "error": "Website not supported"}),
+        ("done", {"run_id": "run", "run_status": "completed"})
+    ]
+
+
+def test_late_stream_replays_the_run_in_flight(app, monkeypatch):
+    release = threading.Event()
+
+    def iter_refresh_events(self, batch_size=5, sweep=True, deadline_seconds=None):
+        yield {"manga_path_id": "1", "status": "unchanged"}
+        release.wait(timeout=5)
+        yield {"manga_path_id": "2", "status": "unchanged"}
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(MangaScraperService, "iter_refresh_events", iter_refresh_events)
+    with TestClient(app) as client:
+        coordinator = main.refresh_coordinator
+        run = coordinator.start_or_join(lambda: main.manga_scraper_service.iter_refresh_events())
+        next(run.subscribe()) # The first event has been produced
+        start_or_join = coordinator.start_or_join
+
+        def join_then_release(start):
+            joined = start_or_join(start)
+            release.set()
+            return joined
+
+        monkeypatch.setattr(coordinator, "start_or_join", join_then_release)
+        response = client.get("/refresh_data/stream", params={"sweep": "false"})
+
+    assert coordinator.stats()["joined"] == 1
+    assert parse_events(response.text) == [
+        ("refresh", {"manga_path_id": "1", "status": "unchanged"}),
+        ("refresh", {"manga_path_id": "2", "status": "unchanged"}),
+        ("done", {"run_status": "error", "error": "database went away"})
+    ]
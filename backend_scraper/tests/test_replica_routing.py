@@ -0,0 +1,143 @@
+import asyncio
+import time
+from psycopg2 import OperationalError
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import AsyncMangaScraperDB, read_from_primary
+
+SETTINGS = {
+    "host": "primary", "database": "manga", "user": "manga", "password": "secret",
+    "replicas": [{"host": "replica", "port": 5433}],
+    "replica_max_lag_seconds": 5,
+    "read_your_writes_seconds": 10
+}
+
+
+class FakeCursor:
+    def __init__(self, lag):
+        self.lag = lag
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return (self.lag,)
+
+
+class FakeConnection:
+    def __init__(self, lag=0.0):
+        self.lag = lag
+        self.closed = False
+        self.autocommit = True
+
+    def cursor(self):
+        return FakeCursor(self.lag)
+
+
+class FakePool:
+    async def fetchval(self, query, timeout=None):
+        return 0.0
+
+
+def routed_db(replica_lag):
+    ms_db = MangaScraperDB()
+    ms_db._settings = SETTINGS
+    ms_db._conn = FakeConnection()
+    ms_db._replica_conn = FakeConnection(replica_lag)
+    return ms_db
+
+
+def test_connection_settings_inherit_from_primary():
+    primary, replicas = MangaScraperDB.connection_settings(SETTINGS)
+    assert primary["port"] == 5432
+    assert replicas == [dict(primary, host="replica", port=5433)]
+
+
+def test_reads_use_replica_unless_lagging_or_just_written():
+    ms_db = routed_db(replica_lag=0.5)
+    assert ms_db.read_conn is ms_db._replica_conn
+
+    # Another client's write does not move this client's reads
+    routed_db(replica_lag=0.5).mark_write()
+    assert ms_db.read_conn is ms_db._replica_conn
+
+    ms_db.mark_write()
+    assert ms_db.read_conn is ms_db._conn
+
+    lagging = routed_db(replica_lag=30)
+    assert lagging.read_conn is lagging._conn
+
+
+def test_async_reads_use_the_primary_only_for_flagged_requests():
+    async_db = AsyncMangaScraperDB()
+    async_db.settings = SETTINGS
+    async_db.pool, async_db.replica_pool = "primary pool", "replica pool"
+    async_db._replica_lag_checked_at, async_db._replica_lag_ok = time.monotonic(), True
+    assert asyncio.run(async_db.get_read_pool()) == "replica pool"
+
+    token = read_from_primary.set(True)
+    try:
+        assert asyncio.run(async_db.get_read_pool()) == "primary pool"
+    finally:
+        read_from_primary.reset(token)
+
+
+def test_unreachable_replicas_are_skipped_until_their_retry_time(monkeypatch):
+    monkeypatch.setattr(MangaScraperDB, "replica_retry_at", {})
+    settings = dict(SETTINGS, replicas=[{"host": "down"}, {"host": "replica"}])
+    attempts = []
+
+    def connect(self, parameters):
+        attempts.append(parameters["host"])
+        if parameters["host"] == "down":
+            raise OperationalError("could not connect")
+        return FakeConnection()
+
+    monkeypatch.setattr(MangaScraperDB, "_connect", connect)
+    ms_db = MangaScraperDB()
+    ms_db._settings = settings
+    ms_db._conn = FakeConnection()
+    assert ms_db.read_conn is ms_db._replica_conn
+    assert attempts == ["down", "replica"]
+
+    # Other instances, and the async pools, skip the replica that is down
+    async_db = AsyncMangaScraperDB()
+    async_db.settings = settings
+    async_db.pool = "primary pool"
+
+    async def create_pool(parameters):
+        attempts.append(parameters["host"])
+        return FakePool()
+
+    monkeypatch.setattr(async_db, "create_pool", create_pool)
+    assert isinstance(asyncio.run(async_db.get_read_pool()), FakePool)
+    assert attempts == ["down", "replica", "replica"]
+
+    MangaScraperDB.replica_unreachable(dict(settings, host="replica", port=5432))
+    other = MangaScraperDB()
+    other._settings = settings
+    other._conn = FakeConnection()
+    assert other.read_conn is other._conn
+    assert attempts == ["down", "replica", "replica"]
+
+
+def test_failed_replica_reads_leave_the_primary_alone():
+    class FailingCursor(FakeCursor):
+        def execute(self, query, params=None):
+            if "get_genres" in query or "get_manga_data_by_genres" in query:
+                raise OperationalError("canceling statement due to conflict with recovery")
+
+    class FailingReplica(FakeConnection):
+        def cursor(self):
+            return FailingCursor(self.lag)
+
+    ms_db = routed_db(replica_lag=0.5)
+    ms_db._replica_conn = FailingReplica()
+    # The fake primary has no rollback(), touching it would raise
+    assert ms_db.get_genres() == []
+    assert ms_db.get_frontend_data_by_genres(["Action"]) == []
@@ -0,0 +1,58 @@
+import threading
+import time
+from src.scrape_scheduler import ScrapeScheduler, INTERACTIVE, MANUAL_REFRESH, BACKGROUND
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_interactive_work_uses_reserved_capacity():
+    scheduler = ScrapeScheduler(max_workers=2, site_capacity=2, reserved_interactive=1)
+    release = threading.Event()
+    background = [scheduler.submit("chapmanganato.com", BACKGROUND, release.wait) for _ in range(3)]
+
+    wait_until(lambda: scheduler.stats()["running"] == 1)
+    assert scheduler.stats()["pending"]["background"] == 2
+
+    interactive = scheduler.submit("chapmanganato.com", INTERACTIVE, lambda: "added")
+    assert interactive.result(timeout=2) == "added"
+
+    release.set()
+    for future in background:
+        future.result(timeout=2)
+    scheduler.shutdown()
+
+
+def test_higher_priority_starts_first():
+    scheduler = ScrapeScheduler(max_workers=2, site_capacity=2, reserved_interactive=1)
+    release = threading.Event()
+    started = []
+    blocker = scheduler.submit("www.webtoons.com", BACKGROUND, release.wait)
+    wait_until(lambda: scheduler.stats()["running"] == 1)
+
+    later = scheduler.submit("www.webtoons.com", BACKGROUND, lambda: started.append("background"))
+    manual = scheduler.submit("www.webtoons.com", MANUAL_REFRESH, lambda: started.append("manual_refresh"))
+    release.set()
+    for future in (blocker, later, manual):
+        future.result(timeout=2)
+    assert started == ["manual_refresh", "background"]
+    scheduler.shutdown()
+
+
+def test_cancelled_work_never_runs():
+    scheduler = ScrapeScheduler(max_workers=2, site_capacity=2, reserved_interactive=1)
+    release = threading.Event()
+    ran = []
+    blocker = scheduler.submit("www.viz.com", BACKGROUND, release.wait)
+    wait_until(lambda: scheduler.stats()["running"] == 1)
+
+    queued = scheduler.submit("www.viz.com", BACKGROUND, lambda: ran.append(1))
+    assert queued.cancel()
+    release.set()
+    blocker.result(timeout=2)
+    scheduler.shutdown()
+    assert not ran
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import uuid
+import asyncpg
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+import main
+from src.cache_listener import CacheListener
+from src.manga_scraper_db import MangaScraperDB
+from src.manga_scraper_db_async import AsyncMangaScraperDB
+
+# search_manga is also run against a real PostgreSQL server when one is given, see test_refresh_queue.py
+TEST_DATABASE_DSN = os.environ.get("TEST_DATABASE_DSN")
+DATABASE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "database")
+SEARCH_SCRIPTS = [
+    "create/create_manga_tables.sql",
+    "stored_procs/search_manga.sql"
+]
+BATTLE_ID = "5f0c6a52-52c5-4a7b-9a51-0d2f1c3e4b6a"
+SOLO_ID = "9a3d1e7b-2c4f-4b8a-8e6d-1f2a3b4c5d6e"
+# search_manga rows, manga_id, manga_name, matched_name, score
+LIBRARY = [
+    (BATTLE_ID, "Battle Through The Heavens", "Battle Through The Heavens"),
+    (BATTLE_ID, "Battle Through The Heavens", "Doupo Cangqiong"),
+    (SOLO_ID, "Solo Leveling", "Solo Leveling")
+]
+
+
+def fake_search(query, limit):
+    # Substring matches only, enough to tell a name match from an alternate name match
+    rows = [(manga_id, manga_name, matched_name, 0.5) for manga_id, manga_name, matched_name in LIBRARY
+            if query.lower() in matched_name.lower()]
+    return rows[:limit]
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.queries.append(query)
+        self.rows = fake_search(params[0], params[1])
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def fake_db():
+    ms_db = MangaScraperDB()
+    ms_db._settings = {"host": "primary", "database": "manga", "user": "manga", "password": "secret"}
+    ms_db._conn = FakeConnection()
+    return ms_db
+
+
+def test_search_finds_names_and_alternate_names():
+    ms_db = fake_db()
+    assert ms_db.search_manga("solo") == [
+        {"manga_id": SOLO_ID, "manga_name": "Solo Leveling", "matched_name": "Solo Leveling", "score": 0.5}
+    ]
+    assert [row["manga_name"] for row in ms_db.search_manga("doupo")] == ["Battle Through The Heavens"]
+    assert ms_db._conn.queries == ["SELECT * FROM search_manga(%s, %s, %s)"] * 2
+
+
+def test_async_search_returns_the_same_rows():
+    class FakePool:
+        def acquire(self):
+            return self
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def fetch(self, query, q, limit, offset):
+            return [(uuid.UUID(row[0]),) + row[1:] for row in fake_search(q, limit)]
+
+    async_db = AsyncMangaScraperDB()
+    async_db.settings = {"host": "primary"}
+    async_db.pool = FakePool()
+    for query in ["solo", "doupo", "heavens"]:
+        assert asyncio.run(async_db.search_manga(query)) == fake_db().search_manga(query), query
+
+
+def test_find_similar_manga_matches_alternate_names():
+    ms_db = fake_db()
+    assert ms_db.find_similar_manga("Doupo Cangqiong") == BATTLE_ID
+    assert ms_db.find_similar_manga("solo leveling") == SOLO_ID
+    assert ms_db.find_similar_manga("Omniscient Reader") is None
+
+
+def test_search_endpoint_pages_through_the_results(monkeypatch):
+    calls = []
+
+    async def unreachable(self):
+        return False
+
+    async def search_manga(self, query, limit=20, offset=0):
+        calls.append((query, limit, offset))
+        return [{"manga_id": BATTLE_ID, "manga_name": "Battle Through The Heavens",
+                 "matched_name": "Doupo Cangqiong", "score": 0.5}]
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    monkeypatch.setattr(AsyncMangaScraperDB, "search_manga", search_manga)
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+    with TestClient(main.app) as client:
+        response = client.get("/search", params={"q": "doupo", "limit": 5, "offset": 10})
+        assert client.get("/search", params={"q": ""}).status_code == 422
+        assert client.get("/search", params={"q": "doupo", "limit": 101}).status_code == 422
+    assert response.json() == {"results": [{"manga_id": BATTLE_ID, "manga_name": "Battle Through The Heavens",
+                                            "matched_name": "Doupo Cangqiong", "score": 0.5}],
+                               "limit": 5, "offset": 10}
+    assert calls == [("doupo", 5, 10)]
+
+
+@pytest.fixture
+def search_schema():
+    if not TEST_DATABASE_DSN:
+        pytest.skip("Set TEST_DATABASE_DSN to run search_manga against PostgreSQL")
+    schema = f"search_test_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(TEST_DATABASE_DSN)
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema}, public;")
+        for script in SEARCH_SCRIPTS:
+            with open(os.path.join(DATABASE_DIR, script)) as f:
+                cur.execute(f.read())
+        cur.execute("INSERT INTO manga_table (manga_id, manga_name) VALUES (%s, 'Battle Through The Heavens'), "
+                    "(%s, 'Solo Leveling')", (BATTLE_ID, SOLO_ID))
+        cur.execute("INSERT INTO manga_name_mappings (manga_name_mapping_id, manga_id, manga_name) "
+                    "VALUES (%s, %s, 'Doupo Cangqiong')", (str(uuid.uuid4()), BATTLE_ID))
+    conn.commit()
+    try:
+        yield conn, schema
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+def test_search_manga_proc_finds_names_and_alternate_names(search_schema):
+    conn, schema = search_schema
+    ms_db = MangaScraperDB()
+    ms_db._conn = conn
+    ms_db._settings = {}
+    assert [row["manga_id"] for row in ms_db.search_manga("Solo Leveling")] == [SOLO_ID]
+    assert [(row["manga_id"], row["matched_name"]) for row in ms_db.search_manga("doupo")] == [
+        (BATTLE_ID, "Doupo Cangqiong")
+    ]
+    assert ms_db.find_similar_manga("Doupo Cangqiong") == BATTLE_ID
+
+    async def search(query):
+        async_db = AsyncMangaScraperDB()
+        async_db.settings = {}
+        async_db.pool = await asyncpg.create_pool(TEST_DATABASE_DSN, min_size=1, max_size=1,
+                                                  server_settings={"search_path": f"{schema}, public"})
+        try:
+            return await async_db.search_manga(query)
+        finally:
+            await async_db.pool.close()
+
+    assert [row["manga_id"] for row in asyncio.run(search("solo"))] == [SOLO_ID]
+    assert [row["matched_name"] for row in asyncio.run(search("Doupo Cangqiong"))] == ["Doupo Cangqiong"]
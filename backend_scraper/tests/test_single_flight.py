@@ -0,0 +1,42 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return {"chapter_url": "https://chapmanganato.com/manga-gv952204/chapter-10"}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "page", slow_fetch)
+        started.wait()
+        followers = [executor.submit(flight.do, "page", slow_fetch) for _ in range(3)]
+        while flight.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight = SingleFlight()
+
+    def failing_fetch():
+        raise ValueError("status code: 503")
+
+    with pytest.raises(ValueError):
+        flight.do("page", failing_fetch)
+    assert flight.do("page", lambda: "retried") == "retried"
@@ -0,0 +1,111 @@
+import asyncpg
+import pytest
+from fastapi.testclient import TestClient
+import main
+from src.cache_listener import CacheListener
+from src.manga_scraper_db_async import AsyncMangaScraperDB, read_from_primary
+
+USER_1 = "8c1e9a4e-0d6b-4f4e-9d4a-2f1b7c3e5a01"
+USER_2 = "8c1e9a4e-0d6b-4f4e-9d4a-2f1b7c3e5a02"
+PATH_1 = "3b7d2c9f-6a1e-4c8b-b5d2-9e0f1a2b3c01"
+PATH_2 = "3b7d2c9f-6a1e-4c8b-b5d2-9e0f1a2b3c02"
+FOLLOW_MANGA_PATH = AsyncMangaScraperDB.follow_manga_path
+
+
+@pytest.fixture
+def follows(monkeypatch):
+    follows = set()
+    primary_reads = []
+
+    async def unreachable(self):
+        return False
+
+    async def follow_manga_path(self, userid, manga_path_id):
+        follows.add((userid, manga_path_id))
+        return True
+
+    async def unfollow_manga_path(self, userid, manga_path_id):
+        follows.discard((userid, manga_path_id))
+        return True
+
+    async def get_user_frontend_data(self, userid):
+        primary_reads.append(read_from_primary.get())
+        return [{"id": manga_path_id, "title": "Solo Leveling"} for user, manga_path_id in sorted(follows) if user == userid]
+
+    async def get_user_bookmarks_data(self, userid):
+        return [{"manga_path_id": manga_path_id} for user, manga_path_id in sorted(follows) if user == userid]
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "ping", unreachable)
+    monkeypatch.setattr(AsyncMangaScraperDB, "load_settings", lambda self: {"read_your_writes_seconds": 10})
+    monkeypatch.setattr(CacheListener, "start", lambda self: None)
+    monkeypatch.setattr(CacheListener, "join", lambda self, timeout=None: None)
+    monkeypatch.setattr(AsyncMangaScraperDB, "follow_manga_path", follow_manga_path)
+    monkeypatch.setattr(AsyncMangaScraperDB, "unfollow_manga_path", unfollow_manga_path)
+    monkeypatch.setattr(AsyncMangaScraperDB, "get_user_frontend_data", get_user_frontend_data)
+    monkeypatch.setattr(AsyncMangaScraperDB, "get_user_bookmarks_data", get_user_bookmarks_data)
+    return follows, primary_reads
+
+
+def test_users_only_see_the_manga_they_follow(follows):
+    with TestClient(main.app) as client:
+        assert client.post(f"/users/{USER_1}/follow", json={"manga_path_id": PATH_1}).json() == {"followed": True}
+        assert client.post(f"/users/{USER_2}/follow", json={"manga_path_id": PATH_2}).json() == {"followed": True}
+
+        assert [row["id"] for row in client.get(f"/users/{USER_1}/get_data").json()] == [PATH_1]
+        assert client.get(f"/users/{USER_2}/get_bookmarks_data").json() == [{"manga_path_id": PATH_2}]
+
+        assert client.delete(f"/users/{USER_1}/follow/{PATH_1}").json() == {"unfollowed": True}
+        assert client.get(f"/users/{USER_1}/get_data").json() == []
+
+
+def test_follow_needs_a_manga_path(follows):
+    with TestClient(main.app) as client:
+        assert client.post(f"/users/{USER_1}/follow", json={}).status_code == 422
+    assert follows[0] == set()
+
+
+def test_only_the_client_that_followed_reads_from_the_primary(follows):
+    _, primary_reads = follows
+    with TestClient(main.app) as client:
+        response = client.post(f"/users/{USER_1}/follow", json={"manga_path_id": PATH_1})
+        assert main.READ_YOUR_WRITES_COOKIE in response.cookies
+        client.get(f"/users/{USER_1}/get_data")
+        # Any other client, without the cookie
+        client.cookies.clear()
+        client.get(f"/users/{USER_1}/get_data")
+    assert primary_reads == [True, False]
+
+
+def test_malformed_ids_are_rejected(follows):
+    with TestClient(main.app) as client:
+        assert client.get("/users/u1/get_data").status_code == 422
+        assert client.post(f"/users/{USER_1}/follow", json={"manga_path_id": "p1"}).status_code == 422
+        assert client.delete(f"/users/{USER_1}/follow/p1").status_code == 422
+    assert follows[0] == set()
+
+
+def test_following_an_unknown_manga_path_is_rejected(follows, monkeypatch):
+    class FakeConnection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def execute(self, query, *args):
+            # user_follow_table.manga_path_id references manga_path_table
+            raise asyncpg.ForeignKeyViolationError("insert or update on table \"user_follow_table\" violates foreign key constraint")
+
+    class FakePool:
+        def acquire(self):
+            return FakeConnection()
+
+    async def get_pool(self):
+        return FakePool()
+
+    monkeypatch.setattr(AsyncMangaScraperDB, "follow_manga_path", FOLLOW_MANGA_PATH)
+    monkeypatch.setattr(AsyncMangaScraperDB, "get_pool", get_pool)
+    with TestClient(main.app) as client:
+        response = client.post(f"/users/{USER_1}/follow", json={"manga_path_id": PATH_1})
+    assert response.json() == {"followed": False}
+    assert main.READ_YOUR_WRITES_COOKIE not in response.cookies
@@ -30,6 +30,10 @@ CREATE TABLE manga_genre_table (
     genre VARCHAR(100)
 );
 
+-- Inverted index from genre to manga, used to filter the library by genre in the database
+-- Also stops the same genre being stored twice for a manga
+CREATE UNIQUE INDEX manga_genre_genre_manga_idx ON manga_genre_table (genre, manga_id);
+
 CREATE TABLE manga_name_mappings (
     -- This table is used to map any manga that has different names
     -- Example is "Battle through the Heavens" which is also "Doupou Canqiong"
@@ -62,4 +66,10 @@ CREATE TABLE manga_thumbnail (
     website_id UUID REFERENCES website_table(website_id),
     manga_path_id UUID REFERENCES manga_path_table(manga_path_id),
     thumbnail_url VARCHAR(255)
-);
\ No newline at end of file
+);
+
+-- Trigram indexes for title search over manga names and their alternate names, see search_manga
+-- Requires the pg_trgm extension that ships with PostgreSQL
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX manga_table_name_trgm_idx ON manga_table USING GIN (lower(manga_name) gin_trgm_ops);
+CREATE INDEX manga_name_mappings_name_trgm_idx ON manga_name_mappings USING GIN (lower(manga_name) gin_trgm_ops);
@@ -0,0 +1,38 @@
+-- This script is to be ran after create_manga_tables.sql has been executed due to referencing
+
+CREATE TABLE refresh_run_table (
+    -- One row per refresh run, whether it is processed by one process or by many workers
+    run_id UUID PRIMARY KEY,
+    run_type VARCHAR(100), -- queue for worker runs, inline for runs processed by the API process
+    run_status VARCHAR(100), -- running, partial (stopped early or some series failed), completed (every series succeeded), or expired for inline runs too old to resume
+    created_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE refresh_job_table (
+    -- One row per manga path per refresh run
+    -- Workers claim pending rows with FOR UPDATE SKIP LOCKED and hold them under a lease
+    -- A claimed job whose lease expires without a heartbeat becomes claimable again
+    job_id UUID PRIMARY KEY,
+    run_id UUID REFERENCES refresh_run_table(run_id),
+    manga_path_id UUID REFERENCES manga_path_table(manga_path_id),
+    job_status VARCHAR(100), -- pending, claimed, done or failed
+    attempts INTEGER,
+    max_attempts INTEGER,
+    lease_owner VARCHAR(255),
+    lease_expires_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    last_error TEXT,
+    updated_at TIMESTAMP
+);
+
+CREATE INDEX refresh_job_claim_idx ON refresh_job_table (job_status, lease_expires_at);
+CREATE INDEX refresh_job_run_idx ON refresh_job_table (run_id);
+
+CREATE TABLE refresh_checkpoint_table (
+    -- Manga paths an inline refresh run has finished, so a restarted or timed out run can skip them
+    run_id UUID REFERENCES refresh_run_table(run_id),
+    manga_path_id UUID REFERENCES manga_path_table(manga_path_id),
+    completed_at TIMESTAMP,
+    PRIMARY KEY (run_id, manga_path_id)
+);
@@ -28,3 +28,14 @@ CREATE TABLE user_reading_history (
     pages_read INTEGER
 );
 
+CREATE TABLE user_follow_table (
+    -- The manga paths each user follows
+    -- Paths are scraped once per refresh however many users follow them, results fan out through this table
+    user_follow_id UUID PRIMARY KEY,
+    userid UUID REFERENCES user_table(userid),
+    manga_path_id UUID REFERENCES manga_path_table(manga_path_id),
+    followed_at TIMESTAMP,
+    UNIQUE (userid, manga_path_id)
+);
+
+CREATE INDEX user_follow_manga_path_idx ON user_follow_table (manga_path_id);
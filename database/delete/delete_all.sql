@@ -1,6 +1,10 @@
 -- Test script for deleting all records in database
 
 -- Start by deleting records from tables with foreign key dependencies
+DELETE FROM user_follow_table;
+DELETE FROM refresh_checkpoint_table;
+DELETE FROM refresh_job_table;
+DELETE FROM refresh_run_table;
 DELETE FROM manga_thumbnail;
 DELETE FROM manga_chapter_url_store;
 DELETE FROM manga_name_mappings;
@@ -0,0 +1,93 @@
+CREATE OR REPLACE FUNCTION claim_refresh_jobs(
+    p_worker_id VARCHAR,
+    p_batch_size INTEGER,
+    p_lease_seconds INTEGER
+)
+RETURNS TABLE(
+    job_id UUID,
+    run_id UUID,
+    manga_path_id UUID,
+    manga_id UUID,
+    manga_name VARCHAR,
+    full_path VARCHAR,
+    attempts INTEGER
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_expired_run_ids UUID[];
+BEGIN
+    -- Jobs whose lease ran out on their final attempt will never be retried
+    WITH expired AS (
+        UPDATE refresh_job_table j
+        SET 
+            job_status = 'failed',
+            last_error = COALESCE(j.last_error, 'Lease expired'),
+            lease_owner = NULL,
+            lease_expires_at = NULL,
+            updated_at = LOCALTIMESTAMP
+        WHERE 
+            j.job_status = 'claimed'
+            AND j.lease_expires_at < LOCALTIMESTAMP
+            AND j.attempts >= j.max_attempts
+        RETURNING j.run_id
+    )
+    SELECT array_agg(DISTINCT e.run_id) INTO v_expired_run_ids FROM expired e;
+
+    -- Failing a run's last jobs here finishes the run as partial, as finish_refresh_job would have
+    -- A separate statement so the jobs failed above are visible to the check
+    UPDATE refresh_run_table r
+    SET 
+        run_status = 'partial',
+        finished_at = LOCALTIMESTAMP
+    WHERE 
+        r.run_id = ANY(v_expired_run_ids)
+        AND r.run_status = 'running'
+        AND NOT EXISTS (
+            SELECT 1 FROM refresh_job_table j
+            WHERE j.run_id = r.run_id
+              AND j.job_status IN ('pending', 'claimed')
+        );
+
+    RETURN QUERY
+    WITH claimable AS (
+        -- SKIP LOCKED lets any number of workers claim disjoint batches without waiting on each other
+        SELECT j.job_id
+        FROM 
+            refresh_job_table j
+            INNER JOIN refresh_run_table r ON j.run_id = r.run_id
+        WHERE 
+            r.run_status = 'running'
+            AND j.attempts < j.max_attempts
+            AND (j.job_status = 'pending'
+                 OR (j.job_status = 'claimed' AND j.lease_expires_at < LOCALTIMESTAMP))
+        ORDER BY j.attempts, j.updated_at
+        LIMIT p_batch_size
+        FOR UPDATE OF j SKIP LOCKED
+    ), claimed AS (
+        UPDATE refresh_job_table j
+        SET 
+            job_status = 'claimed',
+            attempts = j.attempts + 1,
+            lease_owner = p_worker_id,
+            lease_expires_at = LOCALTIMESTAMP + make_interval(secs => p_lease_seconds),
+            heartbeat_at = LOCALTIMESTAMP,
+            updated_at = LOCALTIMESTAMP
+        FROM claimable c
+        WHERE j.job_id = c.job_id
+        RETURNING j.job_id, j.run_id, j.manga_path_id, j.attempts
+    )
+    SELECT 
+        c.job_id,
+        c.run_id,
+        c.manga_path_id,
+        mp.manga_id,
+        mt.manga_name,
+        CAST(wt.website_url || mp.manga_path AS VARCHAR) AS full_path,
+        c.attempts
+    FROM 
+        claimed c
+        INNER JOIN manga_path_table mp ON c.manga_path_id = mp.manga_path_id
+        INNER JOIN website_table wt ON mp.website_id = wt.website_id
+        INNER JOIN manga_table mt ON mp.manga_id = mt.manga_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,41 @@
+CREATE OR REPLACE PROCEDURE create_refresh_run(
+    p_run_id UUID,
+    p_max_attempts INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO refresh_run_table (
+        run_id,
+        run_type,
+        run_status,
+        created_at
+    ) VALUES (
+        p_run_id,
+        'queue',
+        'running',
+        LOCALTIMESTAMP
+    );
+
+    -- One job per manga path currently in the library
+    INSERT INTO refresh_job_table (
+        job_id,
+        run_id,
+        manga_path_id,
+        job_status,
+        attempts,
+        max_attempts,
+        updated_at
+    )
+    SELECT 
+        gen_random_uuid(),
+        p_run_id,
+        mp.manga_path_id,
+        'pending',
+        0,
+        p_max_attempts,
+        LOCALTIMESTAMP
+    FROM 
+        manga_path_table mp;
+END;
+$$;
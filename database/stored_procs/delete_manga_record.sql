@@ -7,9 +7,19 @@ BEGIN
     DELETE FROM manga_genre_table WHERE manga_id = p_manga_id;
     DELETE FROM manga_name_mappings WHERE manga_id = p_manga_id;
     DELETE FROM manga_thumbnail WHERE manga_id = p_manga_id;
+    DELETE FROM refresh_job_table WHERE manga_path_id IN (
+        SELECT manga_path_id FROM manga_path_table WHERE manga_id = p_manga_id
+    );
+    DELETE FROM refresh_checkpoint_table WHERE manga_path_id IN (
+        SELECT manga_path_id FROM manga_path_table WHERE manga_id = p_manga_id
+    );
+    DELETE FROM user_follow_table WHERE manga_path_id IN (
+        SELECT manga_path_id FROM manga_path_table WHERE manga_id = p_manga_id
+    );
     DELETE FROM manga_path_table WHERE manga_id = p_manga_id;
 
     -- Finally, delete from the manga_table
     DELETE FROM manga_table WHERE manga_id = p_manga_id;
+    PERFORM notify_manga_change('manga_table', 'delete', jsonb_build_object('manga_id', p_manga_id));
 END;
 $$;
@@ -0,0 +1,54 @@
+CREATE OR REPLACE PROCEDURE finish_refresh_job(
+    p_job_id UUID,
+    p_worker_id VARCHAR,
+    p_succeeded BOOLEAN,
+    p_error TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_run_id UUID;
+BEGIN
+    -- Only the current lease owner may finish a job, a worker whose lease expired has lost it
+    -- Failed jobs go back to pending until they run out of attempts
+    UPDATE refresh_job_table
+    SET 
+        job_status = CASE 
+            WHEN p_succeeded THEN 'done'
+            WHEN attempts >= max_attempts THEN 'failed'
+            ELSE 'pending'
+        END,
+        last_error = CASE WHEN p_succeeded THEN NULL ELSE p_error END,
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        updated_at = LOCALTIMESTAMP
+    WHERE 
+        job_id = p_job_id
+        AND lease_owner = p_worker_id
+        AND job_status = 'claimed'
+    RETURNING run_id INTO v_run_id;
+
+    -- Close the run once nothing is left to process
+    -- A run with failed jobs is only partial, the next sweep must still look back to before it
+    IF v_run_id IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM refresh_job_table
+        WHERE run_id = v_run_id
+          AND job_status IN ('pending', 'claimed')
+    ) THEN
+        UPDATE refresh_run_table
+        SET 
+            run_status = CASE 
+                WHEN EXISTS (
+                    SELECT 1 FROM refresh_job_table
+                    WHERE run_id = v_run_id
+                      AND job_status = 'failed'
+                ) THEN 'partial'
+                ELSE 'completed'
+            END,
+            finished_at = LOCALTIMESTAMP
+        WHERE 
+            run_id = v_run_id
+            AND run_status = 'running';
+    END IF;
+END;
+$$;
@@ -0,0 +1,16 @@
+CREATE OR REPLACE PROCEDURE finish_refresh_run(
+    p_run_id UUID,
+    p_run_status VARCHAR
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- completed runs are never resumed, partial runs are picked up by the next inline refresh
+    UPDATE refresh_run_table
+    SET 
+        run_status = p_run_status,
+        finished_at = LOCALTIMESTAMP
+    WHERE 
+        run_id = p_run_id;
+END;
+$$;
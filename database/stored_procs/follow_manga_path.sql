@@ -0,0 +1,23 @@
+CREATE OR REPLACE PROCEDURE follow_manga_path(
+    p_user_follow_id UUID,
+    p_userid UUID,
+    p_manga_path_id UUID
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Following a path twice keeps the original follow
+    INSERT INTO user_follow_table (
+        user_follow_id,
+        userid,
+        manga_path_id,
+        followed_at
+    ) VALUES (
+        p_user_follow_id,
+        p_userid,
+        p_manga_path_id,
+        LOCALTIMESTAMP
+    )
+    ON CONFLICT (userid, manga_path_id) DO NOTHING;
+END;
+$$;
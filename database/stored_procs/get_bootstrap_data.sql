@@ -0,0 +1,48 @@
+CREATE OR REPLACE FUNCTION get_bootstrap_data()
+RETURNS JSON AS $$
+BEGIN
+    -- Builds the initial frontend payloads in one statement so they share a single snapshot
+    -- Field names and date formats match get_frontend_data, get_bookmarks_data, get_supported_websites and get_genres
+    RETURN json_build_object(
+        'manga_data', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'id', d.id,
+                'title', d.title,
+                'link', d.chapter,
+                'lastUpdated', to_char(d.lastUpdated, 'YYYY-MM-DD'),
+                'imageUrl', d.imageUrl,
+                'status', d.status,
+                'chapter_number', d.chapter_number
+            )), '[]'::json)
+            FROM get_manga_data() d
+        ),
+        'bookmarks_data', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'id', b.manga_id,
+                'title', b.manga_name,
+                'link', b.full_url,
+                'lastUpdated', to_char(b.date_checked, 'YYYY-MM-DD HH24:MI:SS'),
+                'status', b.website_status
+            )), '[]'::json)
+            FROM get_manga_bookmarks() b
+        ),
+        'supported_websites', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'id', w.website_id,
+                'title', w.website_name,
+                'link', w.website_url,
+                'status', w.website_status,
+                'lastUpdated', w.date_checked
+            )), '[]'::json)
+            FROM get_supported_websites() w
+        ),
+        'genres', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'genre', g.genre,
+                'manga_count', g.manga_count
+            )), '[]'::json)
+            FROM get_genres() g
+        )
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
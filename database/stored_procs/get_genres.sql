@@ -0,0 +1,18 @@
+CREATE OR REPLACE FUNCTION get_genres()
+RETURNS TABLE(
+    genre VARCHAR,
+    manga_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        mg.genre,
+        COUNT(*) AS manga_count
+    FROM 
+        manga_genre_table mg
+    GROUP BY 
+        mg.genre
+    ORDER BY 
+        mg.genre;
+END;
+$$ LANGUAGE plpgsql;
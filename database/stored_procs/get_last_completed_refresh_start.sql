@@ -0,0 +1,13 @@
+CREATE OR REPLACE FUNCTION get_last_completed_refresh_start()
+RETURNS TIMESTAMP AS $$
+DECLARE
+    result TIMESTAMP;
+BEGIN
+    -- Start of the latest run in which every series succeeded, inline or queued
+    -- Latest-updates sweeps only need to look back this far
+    SELECT MAX(created_at) INTO result 
+    FROM refresh_run_table 
+    WHERE run_status = 'completed';
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
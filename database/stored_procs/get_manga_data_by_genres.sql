@@ -0,0 +1,36 @@
+CREATE OR REPLACE FUNCTION get_manga_data_by_genres(p_genres VARCHAR[])
+RETURNS TABLE(
+    id UUID,
+    title VARCHAR,
+    chapter VARCHAR,
+    lastUpdated TIMESTAMP,
+    imageUrl VARCHAR,
+    status VARCHAR,
+    chapter_number INTEGER
+) AS $$
+BEGIN
+    -- Same rows as get_manga_data(), restricted to manga that have every one of the given genres
+    -- The genre lookup is served by the (genre, manga_id) index on manga_genre_table
+    RETURN QUERY
+    SELECT 
+        m.manga_id AS id,
+        m.manga_name AS title,
+        mc.chapter_url AS chapterLink,
+        mc.date_checked AS lastUpdated,
+        mt.thumbnail_url AS imageUrl,
+        mc.chapter_url_status AS status,
+        mc.chapter_number as chapter_number
+    FROM 
+        manga_table m
+        JOIN manga_chapter_url_store mc ON m.manga_id = mc.manga_id
+        LEFT JOIN manga_thumbnail mt ON m.manga_id = mt.manga_id
+    WHERE 
+        m.manga_id IN (
+            SELECT mg.manga_id
+            FROM manga_genre_table mg
+            WHERE mg.genre = ANY(p_genres)
+            GROUP BY mg.manga_id
+            HAVING COUNT(DISTINCT mg.genre) = (SELECT COUNT(DISTINCT g) FROM unnest(p_genres) AS g)
+        );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,12 @@
+CREATE OR REPLACE FUNCTION get_refresh_checkpoints(p_run_id UUID)
+RETURNS TABLE(manga_path_id UUID) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        rc.manga_path_id
+    FROM 
+        refresh_checkpoint_table rc
+    WHERE 
+        rc.run_id = p_run_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,17 @@
+CREATE OR REPLACE FUNCTION get_resumable_refresh_run(p_max_age_seconds INTEGER)
+RETURNS UUID AS $$
+DECLARE
+    result UUID;
+BEGIN
+    -- Latest inline run that crashed (still running) or stopped at its deadline (partial)
+    -- Older runs are not resumed, their checkpoints would skip series that are due again
+    SELECT run_id INTO result 
+    FROM refresh_run_table 
+    WHERE run_type = 'inline' 
+      AND run_status IN ('running', 'partial')
+      AND created_at > LOCALTIMESTAMP - make_interval(secs => p_max_age_seconds)
+    ORDER BY created_at DESC 
+    LIMIT 1;
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
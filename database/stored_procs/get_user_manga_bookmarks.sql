@@ -0,0 +1,26 @@
+CREATE OR REPLACE FUNCTION get_user_manga_bookmarks(p_userid UUID)
+RETURNS TABLE(
+    manga_id UUID,
+    manga_name VARCHAR,
+    full_url VARCHAR,
+    date_checked TIMESTAMP,
+    website_status VARCHAR
+) AS $$
+BEGIN
+    -- Same rows as get_manga_bookmarks(), restricted to the paths the user follows
+    RETURN QUERY
+    SELECT 
+        m.manga_id,
+        m.manga_name,
+        CAST(w.website_url || p.manga_path AS VARCHAR) AS full_url,
+        w.date_checked,
+        w.website_status
+    FROM 
+        user_follow_table uf
+        JOIN manga_path_table p ON uf.manga_path_id = p.manga_path_id
+        JOIN manga_table m ON m.manga_id = p.manga_id
+        JOIN website_table w ON p.website_id = w.website_id
+    WHERE 
+        uf.userid = p_userid;
+END;
+$$ LANGUAGE plpgsql;
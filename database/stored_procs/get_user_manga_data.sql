@@ -0,0 +1,34 @@
+CREATE OR REPLACE FUNCTION get_user_manga_data(p_userid UUID)
+RETURNS TABLE(
+    id UUID,
+    title VARCHAR,
+    chapter VARCHAR,
+    lastUpdated TIMESTAMP,
+    imageUrl VARCHAR,
+    status VARCHAR,
+    chapter_number INTEGER
+) AS $$
+BEGIN
+    -- Same rows as get_manga_data(), restricted to the manga the user follows
+    RETURN QUERY
+    SELECT 
+        m.manga_id AS id,
+        m.manga_name AS title,
+        mc.chapter_url AS chapterLink,
+        mc.date_checked AS lastUpdated,
+        mt.thumbnail_url AS imageUrl,
+        mc.chapter_url_status AS status,
+        mc.chapter_number as chapter_number
+    FROM 
+        manga_table m
+        JOIN manga_chapter_url_store mc ON m.manga_id = mc.manga_id
+        LEFT JOIN manga_thumbnail mt ON m.manga_id = mt.manga_id
+    WHERE 
+        m.manga_id IN (
+            SELECT mp.manga_id
+            FROM user_follow_table uf
+            JOIN manga_path_table mp ON uf.manga_path_id = mp.manga_path_id
+            WHERE uf.userid = p_userid
+        );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,17 @@
+CREATE OR REPLACE PROCEDURE heartbeat_refresh_jobs(
+    p_worker_id VARCHAR,
+    p_lease_seconds INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Extend the lease on every job the worker is still holding
+    UPDATE refresh_job_table
+    SET 
+        lease_expires_at = LOCALTIMESTAMP + make_interval(secs => p_lease_seconds),
+        heartbeat_at = LOCALTIMESTAMP
+    WHERE 
+        lease_owner = p_worker_id
+        AND job_status = 'claimed';
+END;
+$$;
@@ -55,5 +55,7 @@ BEGIN
             p_date_checked
         );
     END IF;
+    PERFORM notify_manga_change('manga_chapter_url_store', 'upsert',
+        jsonb_build_object('manga_id', p_manga_id, 'manga_path_id', p_manga_path_id));
 END;
 $$;
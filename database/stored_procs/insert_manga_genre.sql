@@ -14,6 +14,11 @@ BEGIN
         p_manga_genre_id,
         p_manga_id,
         p_genre
-    );
+    )
+    ON CONFLICT (genre, manga_id) DO NOTHING;
+    -- Only when the genre was added, the manga may already have it
+    IF FOUND THEN
+        PERFORM notify_manga_change('manga_genre_table', 'insert', jsonb_build_object('manga_id', p_manga_id));
+    END IF;
 END;
 $$;
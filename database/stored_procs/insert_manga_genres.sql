@@ -0,0 +1,26 @@
+CREATE OR REPLACE PROCEDURE insert_manga_genres(
+    p_manga_id UUID,
+    p_genres VARCHAR[]
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- All genres of a manga in one call, genres the manga already has are skipped
+    INSERT INTO manga_genre_table (
+        manga_genre_id,
+        manga_id,
+        genre
+    )
+    SELECT DISTINCT ON (genre)
+        gen_random_uuid(),
+        p_manga_id,
+        genre
+    FROM 
+        unnest(p_genres) AS genre
+    ON CONFLICT (genre, manga_id) DO NOTHING;
+    -- Only when a genre was added, re-sending a manga's known genres on every refresh changes nothing
+    IF FOUND THEN
+        PERFORM notify_manga_change('manga_genre_table', 'insert', jsonb_build_object('manga_id', p_manga_id));
+    END IF;
+END;
+$$;
@@ -18,5 +18,6 @@ BEGIN
         p_manga_id,
         p_manga_name
     );
+    PERFORM notify_manga_change('manga_name_mappings', 'insert', jsonb_build_object('manga_id', p_manga_id));
 END;
 $$;
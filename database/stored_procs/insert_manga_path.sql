@@ -18,5 +18,8 @@ BEGIN
         p_website_id,
         p_manga_path
     );
+    PERFORM notify_manga_change('manga_path_table', 'insert',
+        jsonb_build_object('manga_path_id', p_manga_path_id, 'manga_id', p_manga_id,
+                           'website_id', p_website_id, 'manga_path', p_manga_path));
 END;
 $$;
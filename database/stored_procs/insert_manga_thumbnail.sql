@@ -21,5 +21,7 @@ BEGIN
         p_manga_path_id,
         p_thumbnail_url
     );
+    PERFORM notify_manga_change('manga_thumbnail', 'insert',
+        jsonb_build_object('manga_id', p_manga_id, 'manga_path_id', p_manga_path_id));
 END;
 $$;
@@ -0,0 +1,22 @@
+CREATE OR REPLACE PROCEDURE insert_refresh_checkpoints(
+    p_run_id UUID,
+    p_manga_path_ids UUID[]
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- A manga path finished twice, e.g. after resuming, keeps its first checkpoint
+    INSERT INTO refresh_checkpoint_table (
+        run_id,
+        manga_path_id,
+        completed_at
+    )
+    SELECT 
+        p_run_id,
+        manga_path_id,
+        LOCALTIMESTAMP
+    FROM 
+        unnest(p_manga_path_ids) AS manga_path_id
+    ON CONFLICT (run_id, manga_path_id) DO NOTHING;
+END;
+$$;
@@ -21,5 +21,7 @@ BEGIN
         p_website_status,
         p_date_checked
     );
+    PERFORM notify_manga_change('website_table', 'insert',
+        jsonb_build_object('website_id', p_website_id, 'website_url', p_website_url));
 END;
 $$;
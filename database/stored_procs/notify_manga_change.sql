@@ -0,0 +1,14 @@
+CREATE OR REPLACE FUNCTION notify_manga_change(
+    p_table TEXT,
+    p_operation TEXT,
+    p_details JSONB
+) RETURNS VOID AS $$
+BEGIN
+    -- Sent on the manga_changes channel when the calling transaction commits, and dropped if it rolls back
+    -- Every API worker listens on it to keep its caches coherent, see backend_scraper/src/cache_listener.py
+    PERFORM pg_notify(
+        'manga_changes',
+        (jsonb_build_object('table', p_table, 'op', p_operation) || p_details)::text
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,31 @@
+CREATE OR REPLACE PROCEDURE replace_manga_thumbnail(
+    p_manga_thumbnail_id UUID,
+    p_manga_id UUID,
+    p_website_id UUID,
+    p_manga_path_id UUID,
+    p_thumbnail_url VARCHAR
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Used when re-parsing archived pages, the thumbnail parsed now replaces whatever is stored for the path
+    DELETE FROM manga_thumbnail
+    WHERE manga_path_id = p_manga_path_id;
+
+    INSERT INTO manga_thumbnail (
+        manga_thumbnail_id,
+        manga_id,
+        website_id,
+        manga_path_id,
+        thumbnail_url
+    ) VALUES (
+        p_manga_thumbnail_id,
+        p_manga_id,
+        p_website_id,
+        p_manga_path_id,
+        p_thumbnail_url
+    );
+    PERFORM notify_manga_change('manga_thumbnail', 'replace',
+        jsonb_build_object('manga_id', p_manga_id, 'manga_path_id', p_manga_path_id));
+END;
+$$;
@@ -0,0 +1,65 @@
+CREATE OR REPLACE FUNCTION search_manga(
+    p_query VARCHAR,
+    p_limit INTEGER,
+    p_offset INTEGER
+)
+RETURNS TABLE(
+    manga_id UUID,
+    manga_name VARCHAR,
+    matched_name VARCHAR,
+    score REAL
+) AS $$
+DECLARE
+    v_query TEXT := lower(trim(p_query));
+    -- Substring pattern with LIKE wildcards in the query escaped
+    v_pattern TEXT := '%' || replace(replace(replace(lower(trim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    -- Matches on the manga name or any alternate name, ranked by trigram similarity
+    -- Both conditions are served by the trigram GIN indexes on lower(manga_name)
+    -- A manga matching on several names is returned once with its best score
+    RETURN QUERY
+    WITH candidates AS (
+        SELECT 
+            m.manga_id,
+            m.manga_name AS matched_name,
+            similarity(lower(m.manga_name), v_query) AS score
+        FROM 
+            manga_table m
+        WHERE 
+            lower(m.manga_name) % v_query
+            OR lower(m.manga_name) LIKE v_pattern
+        UNION ALL
+        SELECT 
+            nm.manga_id,
+            nm.manga_name AS matched_name,
+            similarity(lower(nm.manga_name), v_query) AS score
+        FROM 
+            manga_name_mappings nm
+        WHERE 
+            lower(nm.manga_name) % v_query
+            OR lower(nm.manga_name) LIKE v_pattern
+    ),
+    best AS (
+        SELECT DISTINCT ON (c.manga_id)
+            c.manga_id,
+            c.matched_name,
+            c.score
+        FROM 
+            candidates c
+        ORDER BY 
+            c.manga_id, c.score DESC
+    )
+    SELECT 
+        b.manga_id,
+        m.manga_name,
+        b.matched_name,
+        b.score
+    FROM 
+        best b
+        JOIN manga_table m ON m.manga_id = b.manga_id
+    ORDER BY 
+        b.score DESC, m.manga_name
+    LIMIT p_limit
+    OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,32 @@
+CREATE OR REPLACE PROCEDURE start_refresh_run(p_run_id UUID)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Create an inline run, or mark a resumed run as running again
+    INSERT INTO refresh_run_table (
+        run_id,
+        run_type,
+        run_status,
+        created_at
+    ) VALUES (
+        p_run_id,
+        'inline',
+        'running',
+        LOCALTIMESTAMP
+    )
+    ON CONFLICT (run_id) DO UPDATE
+    SET 
+        run_status = 'running',
+        finished_at = NULL;
+
+    -- Any other unfinished inline run is abandoned, so it can never be resumed later
+    UPDATE refresh_run_table
+    SET 
+        run_status = 'expired',
+        finished_at = LOCALTIMESTAMP
+    WHERE 
+        run_type = 'inline'
+        AND run_status IN ('running', 'partial')
+        AND run_id <> p_run_id;
+END;
+$$;
@@ -0,0 +1,13 @@
+CREATE OR REPLACE PROCEDURE unfollow_manga_path(
+    p_userid UUID,
+    p_manga_path_id UUID
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM user_follow_table 
+    WHERE 
+        userid = p_userid 
+        AND manga_path_id = p_manga_path_id;
+END;
+$$;
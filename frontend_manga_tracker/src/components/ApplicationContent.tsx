@@ -21,6 +21,7 @@ export const ApplicationContent: React.FC = () => {
   >([]);
   const [searchTerm, setSearchTerm] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [isRefreshing, setIsRefreshing] = useState(false);
   const [sortAlphabetOption, setSortAlpabetOption] = useState("none");
   const [sortDateOption, setSortDateOption] = useState("none");
 
@@ -130,18 +131,13 @@ export const ApplicationContent: React.FC = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await axios.get("http://192.168.8.167:8000/get_data"); //"http://192.168.8.167:8000/get_data"
-        setMangaData(response.data);
-
-        const bookmarksResponse = await axios.get(
-          "http://192.168.8.167:8000/get_bookmarks_data" //"http://192.168.8.167:8000/get_bookmarks_data"
-        );
-        setBookmarksData(bookmarksResponse.data);
-
-        const supportedWebsiteResponse = await axios.get(
-          "http://192.168.8.167:8000/get_supported_websites" //"http://192.168.8.167:8000/get_supported_websites"
+        // Manga data, bookmarks and supported websites all come from one request
+        const response = await axios.get(
+          "http://192.168.8.167:8000/get_bootstrap_data" //"http://192.168.8.167:8000/get_bootstrap_data"
         );
-        setSupportedWebsitesData(supportedWebsiteResponse.data);
+        setMangaData(response.data.manga_data);
+        setBookmarksData(response.data.bookmarks_data);
+        setSupportedWebsitesData(response.data.supported_websites);
       } catch (error) {
         console.error("Error fetching data:", error);
       }
@@ -150,15 +146,44 @@ export const ApplicationContent: React.FC = () => {
     fetchData();
   }, [refreshData]);
 
-  const handleRefreshClick = async () => {
-    setIsLoading(true); // Start loading
-    try {
-      await axios.get("http://192.168.8.167:8000/refresh_data");
-      setRefreshData(!refreshData);
-    } catch (error) {
+  const handleRefreshClick = () => {
+    setIsLoading(true); // Start loading until the stream is open
+    setIsRefreshing(true);
+    const eventSource = new EventSource(
+      "http://192.168.8.167:8000/refresh_data/stream"
+    );
+
+    eventSource.onopen = () => {
+      setIsLoading(false);
+    };
+
+    // Patch the cards of each manga as soon as its refresh result lands
+    eventSource.addEventListener("refresh", (event) => {
+      const refreshEvent = JSON.parse((event as MessageEvent).data);
+      if (refreshEvent.status === "error") {
+        console.error(
+          `Error refreshing ${refreshEvent.link}:`,
+          refreshEvent.error
+        );
+      } else if (refreshEvent.records.length > 0) {
+        setMangaData((previous) => [
+          ...previous.filter((manga) => manga.id !== refreshEvent.manga_id),
+          ...refreshEvent.records,
+        ]);
+      }
+    });
+
+    eventSource.addEventListener("done", () => {
+      eventSource.close();
+      setIsRefreshing(false);
+    });
+
+    eventSource.onerror = (error) => {
       console.error("Error refreshing data:", error);
-    }
-    setIsLoading(false); // Stop loading
+      eventSource.close();
+      setIsLoading(false);
+      setIsRefreshing(false);
+    };
   };
 
   return (
@@ -188,7 +213,10 @@ export const ApplicationContent: React.FC = () => {
         )}
         <AlphabetFilter onSortChange={handleSortChange} disabled={isLoading} />
         <DateFilter onSortChange={handleDateChange} disabled={isLoading} />
-        <RefreshButton onClick={handleRefreshClick} disabled={isLoading} />
+        <RefreshButton
+          onClick={handleRefreshClick}
+          disabled={isLoading || isRefreshing}
+        />
       </div>
 
       <div className="flex flex-col md:flex-row gap-4 md:gap-8">